@@ -6,6 +6,138 @@ import random
 import time
 
 
+# Flight pattern registry: pattern type -> FlightPattern subclass
+FLIGHT_PATTERNS = {}
+
+
+def register_flight_pattern(name, pattern_cls=None):
+    """Register a FlightPattern subclass under name (usable as a class decorator)."""
+    def decorator(cls):
+        FLIGHT_PATTERNS[name] = cls
+        return cls
+    return decorator(pattern_cls) if pattern_cls is not None else decorator
+
+
+class FlightPattern:
+    """Movement strategy for one enemy.
+
+    Parameters are read from the pattern config once, in __init__, so move() only
+    does the arithmetic each frame. Unknown pattern types use this base class and
+    just fall straight down.
+    """
+    # Circling patterns leave the screen on purpose and must not be killed there
+    kill_offscreen = True
+
+    def __init__(self, params):
+        pass
+
+    def move(self, enemy):
+        enemy.rect.y += enemy.speed
+
+
+@register_flight_pattern("linear")
+class LinearPattern(FlightPattern):
+    # direction -> (dx, dy); unknown directions don't move
+    DIRECTIONS = {"down": (0, 1), "up": (0, -1), "left": (-1, 0), "right": (1, 0)}
+    default_direction = "down"
+
+    def __init__(self, params):
+        self.speed_multiplier = params.get("speed_multiplier", 1.0)
+        self.dx, self.dy = self.DIRECTIONS.get(params.get("direction", self.default_direction), (0, 0))
+
+    def move(self, enemy):
+        speed = enemy.speed * self.speed_multiplier
+        if self.dy:
+            enemy.rect.y += self.dy * speed
+        if self.dx:
+            enemy.rect.x += self.dx * speed
+
+
+@register_flight_pattern("linear_diagonal")
+class LinearDiagonalPattern(LinearPattern):
+    DIRECTIONS = {"down_left": (-0.5, 1), "down_right": (0.5, 1)}
+    default_direction = "down_left"
+
+
+@register_flight_pattern("sinusoidal")
+class SinusoidalPattern(FlightPattern):
+    amplitude = 150
+    frequency = 0.1
+    vertical_speed_multiplier = 1.0
+
+    def __init__(self, params):
+        self.amplitude = params.get("amplitude", self.amplitude)
+        self.frequency = params.get("frequency", self.frequency)
+        self.vertical_speed_multiplier = params.get("vertical_speed_multiplier", self.vertical_speed_multiplier)
+
+    def move(self, enemy):
+        rect = enemy.rect
+        rect.x = enemy.base_x + math.sin(enemy.time * self.frequency) * self.amplitude
+        rect.y += enemy.speed * self.vertical_speed_multiplier
+
+
+@register_flight_pattern("zigzag")
+class ZigzagPattern(SinusoidalPattern):
+    amplitude = 120
+    frequency = 0.3
+
+
+@register_flight_pattern("wave")
+class WavePattern(SinusoidalPattern):
+    amplitude = 100
+    frequency = 0.15
+    vertical_speed_multiplier = 0.8
+
+
+@register_flight_pattern("circular")
+class CircularPattern(FlightPattern):
+    kill_offscreen = False
+
+    def __init__(self, params):
+        self.angular_speed = params.get("angular_speed", 0.05)
+        self.radius = params.get("radius", 80)
+
+    def move(self, enemy):
+        enemy.angle += self.angular_speed
+        enemy.rect.x = enemy.base_x + math.cos(enemy.angle) * self.radius
+        enemy.rect.y = enemy.base_y + math.sin(enemy.angle) * self.radius
+
+
+@register_flight_pattern("spiral")
+class SpiralPattern(FlightPattern):
+    kill_offscreen = False
+
+    def __init__(self, params):
+        self.radius_growth = params.get("radius_growth", 2)
+        self.angular_speed = params.get("angular_speed", 0.1)
+
+    def move(self, enemy):
+        enemy.angle += self.angular_speed
+        radius = enemy.time * self.radius_growth
+        enemy.rect.x = enemy.base_x + math.cos(enemy.angle) * radius
+        enemy.rect.y = enemy.base_y + math.sin(enemy.angle) * radius
+
+
+@register_flight_pattern("approach_player")
+class ApproachPlayerPattern(FlightPattern):
+    def __init__(self, params):
+        self.speed_multiplier = params.get("speed_multiplier", 1.0)
+
+    def move(self, enemy):
+        if not enemy.player_target:
+            # No target yet: fall straight down
+            enemy.rect.y += enemy.speed
+            return
+        rect = enemy.rect
+        speed = enemy.speed * self.speed_multiplier
+        dx = enemy.player_target.rect.centerx - rect.centerx
+        dy = enemy.player_target.rect.centery - rect.centery
+        distance = math.sqrt(dx*dx + dy*dy)
+        if distance > 0:
+            rect.x += (dx / distance) * speed
+            rect.y += (dy / distance) * speed
+
+
 class Enemy(pygame.sprite.Sprite):
     def __init__(self, x, y, w=40, h=28, color=(220, 60, 60), flight_pattern=None, screen_width=1000, screen_height=700, pattern_config=None):
         super().__init__()
@@ -24,6 +156,7 @@ class Enemy(pygame.sprite.Sprite):
         self.player_target = None
         self.pattern_config = pattern_config or {}
         self.pattern_params = self._get_pattern_params()
+        self._bind_flight_pattern()
         # Shooting parameters (can be configured by the caller)
         self.last_shot_time = 0.0
         self.shot_interval = 3.0  # seconds between shots by default
@@ -37,6 +170,13 @@ class Enemy(pygame.sprite.Sprite):
             return self.pattern_config[self.flight_pattern].copy()
         return {}
 
+    def _bind_flight_pattern(self):
+        """Build the pattern strategy from pattern_params (once, not every frame)"""
+        pattern_type = self.pattern_params.get("type", self.flight_pattern)
+        self.pattern = FLIGHT_PATTERNS.get(pattern_type, FlightPattern)(self.pattern_params)
+        self._move = self.pattern.move
+        self._kill_offscreen = self.pattern.kill_offscreen
+
     def set_flight_pattern(self, pattern_name, **kwargs):
         """Set the flight pattern for this enemy"""
         self.flight_pattern = pattern_name
@@ -48,6 +188,7 @@ class Enemy(pygame.sprite.Sprite):
         if 'pattern_config' in kwargs:
             self.pattern_config = kwargs['pattern_config']
             self.pattern_params = self._get_pattern_params()
+        self._bind_flight_pattern()
 
     def set_shooter(self, callback, interval=3.0, bullet_speed=6, bullet_tipo="normal"):
         """Register a callback to spawn bullets.
@@ -80,110 +221,33 @@ class Enemy(pygame.sprite.Sprite):
     def update(self, dt=1.0):
         """Update enemy position based on flight pattern and configuration"""
         self.time += dt
-        pattern_type = self.pattern_params.get("type", self.flight_pattern)
-
-        if pattern_type == "linear":
-            direction = self.pattern_params.get("direction", "down")
-            speed_mult = self.pattern_params.get("speed_multiplier", 1.0)
-            effective_speed = self.speed * speed_mult
-            
-            if direction == "down":
-                self.rect.y += effective_speed
-            elif direction == "up":
-                self.rect.y -= effective_speed
-            elif direction == "left":
-                self.rect.x -= effective_speed
-            elif direction == "right":
-                self.rect.x += effective_speed
-
-        elif pattern_type == "linear_diagonal":
-            direction = self.pattern_params.get("direction", "down_left")
-            speed_mult = self.pattern_params.get("speed_multiplier", 1.0)
-            effective_speed = self.speed * speed_mult
-            
-            if direction == "down_left":
-                self.rect.y += effective_speed
-                self.rect.x -= effective_speed * 0.5
-            elif direction == "down_right":
-                self.rect.y += effective_speed
-                self.rect.x += effective_speed * 0.5
-
-        elif pattern_type == "sinusoidal":
-            amplitude = self.pattern_params.get("amplitude", 150)
-            frequency = self.pattern_params.get("frequency", 0.1)
-            v_speed_mult = self.pattern_params.get("vertical_speed_multiplier", 1.0)
-            
-            self.rect.x = self.base_x + math.sin(self.time * frequency) * amplitude
-            self.rect.y += self.speed * v_speed_mult
-
-        elif pattern_type == "zigzag":
-            amplitude = self.pattern_params.get("amplitude", 120)
-            frequency = self.pattern_params.get("frequency", 0.3)
-            v_speed_mult = self.pattern_params.get("vertical_speed_multiplier", 1.0)
-            
-            self.rect.x = self.base_x + math.sin(self.time * frequency) * amplitude
-            self.rect.y += self.speed * v_speed_mult
-
-        elif pattern_type == "circular":
-            angular_speed = self.pattern_params.get("angular_speed", 0.05)
-            radius = self.pattern_params.get("radius", 80)
-            
-            self.angle += angular_speed
-            self.rect.x = self.base_x + math.cos(self.angle) * radius
-            self.rect.y = self.base_y + math.sin(self.angle) * radius
-
-        elif pattern_type == "spiral":
-            radius_growth = self.pattern_params.get("radius_growth", 2)
-            angular_speed = self.pattern_params.get("angular_speed", 0.1)
-            
-            self.angle += angular_speed
-            radius = self.time * radius_growth
-            self.rect.x = self.base_x + math.cos(self.angle) * radius
-            self.rect.y = self.base_y + math.sin(self.angle) * radius
-
-        elif pattern_type == "wave":
-            amplitude = self.pattern_params.get("amplitude", 100)
-            frequency = self.pattern_params.get("frequency", 0.15)
-            v_speed_mult = self.pattern_params.get("vertical_speed_multiplier", 0.8)
-            
-            self.rect.x = self.base_x + math.sin(self.time * frequency) * amplitude
-            self.rect.y += self.speed * v_speed_mult
-
-        elif pattern_type == "approach_player" and self.player_target:
-            speed_mult = self.pattern_params.get("speed_multiplier", 1.0)
-            effective_speed = self.speed * speed_mult
-            
-            dx = self.player_target.rect.centerx - self.rect.centerx
-            dy = self.player_target.rect.centery - self.rect.centery
-            distance = math.sqrt(dx*dx + dy*dy)
-            if distance > 0:
-                self.rect.x += (dx / distance) * effective_speed
-                self.rect.y += (dy / distance) * effective_speed
-        else:
-            self.rect.y += self.speed
+        self._move(self)
 
         self._handle_screen_wrapping()
-        # Try to shoot after movement
-        try:
-            self._try_shoot()
-        except Exception:
-            pass
+        # Try to shoot after movement (skipped outright for enemies that never shoot)
+        if self.shooter_callback:
+            try:
+                self._try_shoot()
+            except Exception:
+                pass
 
     def _handle_screen_wrapping(self):
         """Handle screen wrapping for enemies"""
-        if self.rect.right < 0:
-            self.rect.left = self.screen_width
-        elif self.rect.left > self.screen_width:
-            self.rect.right = 0
-
-        if self.rect.bottom < 0:
-            self.rect.top = self.screen_height
-        elif self.rect.top > self.screen_height:
-            self.rect.bottom = 0
-
-        pattern_type = self.pattern_params.get("type", self.flight_pattern)
-        if pattern_type not in ["circular", "spiral"]:
-            if self.rect.top > self.screen_height + 100 or self.rect.bottom < -100:
+        rect = self.rect
+        width = self.screen_width
+        height = self.screen_height
+        if rect.right < 0:
+            rect.left = width
+        elif rect.left > width:
+            rect.right = 0
+
+        if rect.bottom < 0:
+            rect.top = height
+        elif rect.top > height:
+            rect.bottom = 0
+
+        if self._kill_offscreen:
+            if rect.top > height + 100 or rect.bottom < -100:
                 self.kill()
-            if self.rect.right < 0 or self.rect.left > self.screen_width:
+            if rect.right < 0 or rect.left > width:
                 self.kill()
@@ -0,0 +1,56 @@
+"""Benchmark del envío de correos por lotes frente a uno por llamada.
+
+Usa ProveedorSimulado (cada llamada tarda lo mismo que un viaje de red, por defecto
+50 ms) detrás de EmailSender, así que mide lo que cambia con el batching: el número
+de llamadas al proveedor. Imprime además las estadísticas por lote del EmailBatcher.
+
+Uso:
+    python benchmarks/bench_email_batching.py [correos] [latencia_ms]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("PUBLIC_URL", "http://localhost:5000")
+
+from services.email_batcher import EmailBatcher
+from services.email_sender import EmailSender, ProveedorSimulado
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1e3
+    remitente = {"email": "bench@example.com", "name": "Bench"}
+    destinos = [(f"piloto{i}@example.com", f"token-{i}") for i in range(count)]
+    print(f"{count} correos, {latency * 1e3:.0f} ms por llamada al proveedor")
+
+    # Uno por llamada, con tantos hilos como conexiones del pool
+    proveedor = ProveedorSimulado(latencia=latency)
+    sender = EmailSender("bench", remitente, pool_size=4, tx_api=proveedor)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda d: sender.enviar_correo_confirmacion(*d), destinos))
+    elapsed = time.perf_counter() - start
+    print(f"  uno por llamada: {elapsed:6.2f}s  {count / elapsed:8.0f} correos/s  "
+          f"{proveedor.llamadas} llamadas")
+
+    proveedor = ProveedorSimulado(latencia=latency)
+    batcher = EmailBatcher(EmailSender("bench", remitente, pool_size=4, tx_api=proveedor), pool_size=4)
+    start = time.perf_counter()
+    futures = [batcher.submit("confirmacion", *d) for d in destinos]
+    for future in futures:
+        future.result()
+    elapsed = time.perf_counter() - start
+    stats = batcher.stats()
+    batcher.close()
+    print(f"  por lotes:       {elapsed:6.2f}s  {count / elapsed:8.0f} correos/s  "
+          f"{proveedor.llamadas} llamadas")
+    print(f"    lotes={stats['batches']} tamaño medio={stats['avg_batch_size']:.1f} "
+          f"latencia p50={stats['latency_p50_ms']:.1f} ms p95={stats['latency_p95_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
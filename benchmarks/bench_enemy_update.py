@@ -0,0 +1,38 @@
+"""Microbenchmark de Enemy.update por patrón de vuelo.
+
+Mide el costo de una llamada a update() para cada patrón registrado en
+FLIGHT_PATTERNS y cuántos enemigos caben en un frame de 60 FPS solo moviéndolos.
+Usa el driver de video "dummy" de SDL, así que no abre ventana.
+
+Uso:
+    python benchmarks/bench_enemy_update.py [llamadas]
+"""
+import os
+import sys
+import timeit
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Jugabilidad", "Base"))
+
+from gameplay_module.enemy import FLIGHT_PATTERNS, Enemy
+
+
+class _Target:
+    def __init__(self, rect):
+        self.rect = rect
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    frame_us = 1e6 / 60
+    print(f"{'patrón':<18}{'us/update':>10}{'enemigos/frame':>16}")
+    for name in FLIGHT_PATTERNS:
+        # Pantalla enorme para que ningún enemigo se envuelva ni muera durante la medición
+        enemy = Enemy(500, 300, flight_pattern=name, screen_width=10 ** 9, screen_height=10 ** 9)
+        enemy.player_target = _Target(enemy.rect.move(200, 300))
+        per_call = min(timeit.repeat(enemy.update, number=calls, repeat=5)) / calls * 1e6
+        print(f"{name:<18}{per_call:>10.2f}{int(frame_us / per_call):>16d}")
+
+
+if __name__ == "__main__":
+    main()
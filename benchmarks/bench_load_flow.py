@@ -0,0 +1,240 @@
+"""Prueba de carga del flujo de registro y confirmación de services/server.py.
+
+Para cada tamaño de roster (por defecto 10.000, 100.000 y 1.000.000):
+  1. genera en una carpeta temporal players.json con N jugadores y
+     pending_players.json con N registros pendientes (escritos por partes, sin
+     tenerlos en memoria),
+  2. arranca la app de services/server.py en un proceso aparte con DATA_DIR apuntando
+     a esa carpeta y EMAIL_SENDER=local (LocalEmailSender, sin Brevo ni red), más una
+     ruta POST /registro propia de la prueba (producción no registra por HTTP),
+  3. lanza a la vez POST /registro (jugadores nuevos) y GET /confirmar (tokens de los
+     pendientes generados) desde varios hilos con el cliente de pruebas de Flask,
+  4. informa el arranque, latencias p50/p95/p99 por ruta, rendimiento total y el
+     pico de memoria (RSS) del proceso.
+
+Cada tamaño corre en su propio proceso para que el pico de RSS sea solo suyo.
+bcrypt usa GALACTATEC_BCRYPT_ROUNDS=--rounds (4 por defecto) para que lo medido sea
+sobre todo la capa de datos; con --rounds 12 se mide el costo real de producción.
+
+Uso:
+    python benchmarks/bench_load_flow.py [--sizes 10000,100000,1000000] [--ops 200]
+        [--workers 16] [--storage json|journal|lazy] [--rounds 4]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+PASSWORD = "Galacta#2024tec"
+
+
+# ------------------------------ DATOS SINTÉTICOS -----------------------------
+def synthesize(data_dir: str, size: int, rounds: int):
+    """Escribe players.json y pending_players.json con size registros cada uno."""
+    from src.core.password_hasher import PasswordHasher
+
+    hasher = PasswordHasher(rounds=rounds, max_workers=0)
+    password_hash = hasher.hash(PASSWORD)
+    hasher.close()
+    now = time.time()
+
+    with open(os.path.join(data_dir, "players.json"), "w", encoding="utf-8") as f:
+        f.write("{")
+        for i in range(size):
+            pid = str(uuid.uuid4())
+            record = {
+                "id": pid,
+                "alias": f"piloto_{i}",
+                "full_name": f"Piloto {i}",
+                "email": f"piloto{i}@example.com",
+                "password_hash": password_hash,
+                "profile_picture": "",
+                "spaceship_image": "",
+                "favorite_music": [],
+            }
+            f.write(("," if i else "") + json.dumps(pid) + ":" + json.dumps(record))
+        f.write("}")
+
+    with open(os.path.join(data_dir, "pending_players.json"), "w", encoding="utf-8") as f:
+        f.write("[")
+        for i in range(size):
+            record = {
+                "id": str(uuid.uuid4()),
+                "alias": f"pendiente_{i}",
+                "full_name": f"Pendiente {i}",
+                "email": f"pendiente{i}@example.com",
+                "password_hash": password_hash,
+                "profile_picture": "",
+                "spaceship_image": "",
+                "favorite_music": [],
+                "token": f"token-{i}",
+                "confirmed": False,
+                "created_at": now,
+            }
+            f.write(("," if i else "") + json.dumps(record))
+        f.write("]")
+
+
+# ------------------------------- MEDICIÓN -------------------------------------
+def percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss está en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def add_registro_route(app, player_service):
+    """POST /registro solo para la carga: el servidor de producción no registra por HTTP."""
+    from flask import jsonify, request
+
+    @app.route("/registro", methods=["POST"])
+    def registro():
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"error": "Se esperaba un objeto JSON"}), 400
+        try:
+            jugador_data = player_service.registrar_jugador(
+                alias=data.get("alias", ""),
+                full_name=data.get("full_name", ""),
+                email=data.get("email", ""),
+                password=data.get("password", ""),
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"alias": jugador_data["alias"]}), 201
+
+
+def run_child(size: int, ops: int, workers: int, result_path: str):
+    """Arranca el servidor sobre DATA_DIR y ejecuta la carga (proceso hijo)."""
+    start = time.perf_counter()
+    from services import server
+    from services.bootstrap import AppServices
+    services = AppServices(scores=True)
+    app = server.create_app(services)
+    add_registro_route(app, services.player_service)
+    startup = time.perf_counter() - start
+    rss_after_startup = peak_rss_mb()
+
+    requests = [("registro", i) for i in range(ops)]
+    requests += [("confirmar", i) for i in random.sample(range(size), min(ops, size))]
+    random.shuffle(requests)
+
+    local = threading.local()
+    latencies = {"registro": [], "confirmar": []}
+    errors = {"registro": 0, "confirmar": 0}
+    lock = threading.Lock()
+
+    def call(request):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+        kind, i = request
+        began = time.perf_counter()
+        if kind == "registro":
+            response = client.post("/registro", json={
+                "alias": f"carga_{i}", "full_name": f"Carga {i}",
+                "email": f"carga{i}@example.com", "password": PASSWORD,
+            })
+            ok = response.status_code == 201
+        else:
+            response = client.get(f"/confirmar?token=token-{i}")
+            ok = response.status_code == 200
+        elapsed = time.perf_counter() - began
+        with lock:
+            latencies[kind].append(elapsed)
+            if not ok:
+                errors[kind] += 1
+
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(call, requests))
+    wall = time.perf_counter() - began
+
+    services.email_outbox.wait_idle(timeout=30)
+    services.close()
+
+    result = {
+        "size": size,
+        "startup_s": startup,
+        "rss_startup_mb": rss_after_startup,
+        "wall_s": wall,
+        "throughput": len(requests) / wall,
+        "peak_rss_mb": peak_rss_mb(),
+        "routes": {
+            kind: {
+                "count": len(values),
+                "errors": errors[kind],
+                "p50_ms": percentile(values, 0.50) * 1e3,
+                "p95_ms": percentile(values, 0.95) * 1e3,
+                "p99_ms": percentile(values, 0.99) * 1e3,
+            }
+            for kind, values in latencies.items()
+        },
+        "emails": len(services.email_sender.enviados),
+    }
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+def report(result: dict):
+    print(f"N = {result['size']}")
+    print(f"  arranque {result['startup_s']:7.2f}s  RSS tras arrancar {result['rss_startup_mb']:8.1f} MB")
+    for kind, stats in result["routes"].items():
+        print(f"  {kind:<10} {stats['count']:6d} peticiones  errores {stats['errors']:4d}  "
+              f"p50 {stats['p50_ms']:8.1f} ms  p95 {stats['p95_ms']:8.1f} ms  p99 {stats['p99_ms']:8.1f} ms")
+    print(f"  total {result['wall_s']:7.2f}s  {result['throughput']:8.1f} peticiones/s  "
+          f"correos {result['emails']}  pico RSS {result['peak_rss_mb']:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de registro y confirmación.")
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--ops", type=int, default=200, help="peticiones por ruta y tamaño")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--storage", choices=["json", "journal", "lazy"], default="json")
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        size, result_path = args.child.split(":", 1)
+        run_child(int(size), args.ops, args.workers, result_path)
+        return
+
+    print(f"almacenamiento={args.storage} ops/ruta={args.ops} hilos={args.workers} bcrypt rounds={args.rounds}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as data_dir:
+            start = time.perf_counter()
+            synthesize(data_dir, size, args.rounds)
+            print(f"(datos de N = {size} generados en {time.perf_counter() - start:.1f}s)")
+
+            result_path = os.path.join(data_dir, "resultado.json")
+            env = dict(os.environ, DATA_DIR=data_dir, EMAIL_SENDER="local", PLAYER_STORAGE=args.storage,
+                       PUBLIC_URL="http://localhost:5000", GALACTATEC_BCRYPT_ROUNDS=str(args.rounds),
+                       GALACTATEC_LOG_LEVEL="WARNING")
+            # Solo se muestran los logs de advertencias del servidor
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--child", f"{size}:{result_path}",
+                            "--ops", str(args.ops), "--workers", str(args.workers)],
+                           env=env, cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+            with open(result_path, encoding="utf-8") as f:
+                report(json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark de carga y búsquedas de PlayerRepository.
+
+Genera un players.json sintético de N jugadores y mide:
+  - tiempo de carga del repositorio
+  - búsquedas por alias / email (índices) frente a un recorrido lineal
+  - validate_alias_email para un alias/email libres
+  - search_players() por prefijo de alias o nombre (20 resultados)
+
+Uso:
+    python benchmarks/bench_player_lookup.py [N ...]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data.persistence import PlayerRepository
+
+LOOKUPS = 2000
+
+
+def make_roster(n: int) -> dict:
+    roster = {}
+    for i in range(n):
+        pid = str(uuid.uuid4())
+        roster[pid] = {
+            "id": pid,
+            "alias": f"piloto_{i}",
+            "full_name": f"Piloto {i}",
+            "email": f"piloto{i}@example.com",
+            "password_hash": "$2b$12$" + "x" * 53,
+            "profile_picture": "",
+            "spaceship_image": "",
+            "favorite_music": [],
+        }
+    return roster
+
+
+def linear_alias_scan(repo: PlayerRepository, alias: str):
+    # Comportamiento anterior: recorrer todos los jugadores
+    for p in repo._players.values():
+        if p.alias == alias:
+            return p
+    return None
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def run(n: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "players.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(make_roster(n), f)
+
+        start = time.perf_counter()
+        repo = PlayerRepository(str(path))
+        load_s = time.perf_counter() - start
+
+        aliases = [f"piloto_{random.randrange(n)}" for _ in range(LOOKUPS)]
+        emails = [f"PILOTO{random.randrange(n)}@example.com" for _ in range(LOOKUPS)]
+
+        alias_s = timed(lambda: [repo.get_player_by_alias(a) for a in aliases])
+        email_s = timed(lambda: [repo.get_player_by_email(e) for e in emails])
+        validate_s = timed(lambda: [repo.validate_alias_email(f"nuevo_{i}", f"nuevo{i}@example.com")
+                                    for i in range(LOOKUPS)])
+        # El recorrido lineal se mide con menos consultas para que termine en tiempo razonable
+        scan_n = max(1, min(LOOKUPS, 2_000_000 // n))
+        scan_s = timed(lambda: [linear_alias_scan(repo, a) for a in aliases[:scan_n]])
+        prefixes = [a[:random.randint(3, len(a))] for a in aliases]
+        search_s = timed(lambda: [repo.search_players(p, 20) for p in prefixes])
+
+    per = lambda total, count: total / count * 1e6
+    print(f"{n:>9} | carga {load_s:8.3f} s | alias {per(alias_s, LOOKUPS):7.2f} us"
+          f" | email {per(email_s, LOOKUPS):7.2f} us | validar {per(validate_s, LOOKUPS):7.2f} us"
+          f" | scan lineal {per(scan_s, scan_n):10.2f} us | prefijo {per(search_s, LOOKUPS):7.2f} us")
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    print("jugadores | tiempos por operación")
+    for size in sizes:
+        run(size)
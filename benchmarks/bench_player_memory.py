@@ -0,0 +1,117 @@
+"""Benchmark de memoria y asignaciones del roster de jugadores.
+
+Con N jugadores (por defecto 1.000.000) mide:
+  - memoria de N objetos Player con __slots__ frente a una clase equivalente con __dict__
+  - memoria asignada y tiempo de get_all_dict(): la primera llamada arma la vista
+    serializada, las siguientes la reutilizan
+  - lo mismo tras modificar un jugador (solo se vuelve a serializar ese registro; la
+    foto de solo lectura que se entrega sí se rehace)
+
+Uso:
+    python benchmarks/bench_player_memory.py [N]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.player import Player
+from src.data.persistence import PlayerRepository
+from src.data.storage import PlayerStorage
+
+
+class DictPlayer:
+    """Player como era antes: los mismos campos en un __dict__ por instancia."""
+
+    def __init__(self, data: dict):
+        self._id = data["id"]
+        self._alias = data["alias"]
+        self._full_name = data["full_name"]
+        self._email = data["email"]
+        self._password_hash = data["password_hash"]
+        self._profile_picture = data["profile_picture"]
+        self._spaceship_image = data["spaceship_image"]
+        self._favorite_music = data["favorite_music"]
+        self._uniqueness_validator = None
+
+
+class MemoryStorage(PlayerStorage):
+    """Backend en memoria para medir el repositorio sin disco."""
+
+    def __init__(self, records: dict):
+        self.records = records
+
+    def load_players(self):
+        return self.records
+
+    def save_players(self, changed, snapshot):
+        pass
+
+    def add_pending(self, record):
+        pass
+
+    def get_pending(self, token):
+        return None
+
+    def remove_pending(self, token):
+        pass
+
+
+def make_records(n: int) -> dict:
+    records = {}
+    for i in range(n):
+        pid = str(uuid.uuid4())
+        records[pid] = {
+            "id": pid,
+            "alias": f"piloto_{i}",
+            "full_name": f"Piloto {i}",
+            "email": f"piloto{i}@example.com",
+            "password_hash": "$2b$12$" + "x" * 53,
+            "profile_picture": "",
+            "spaceship_image": "",
+            "favorite_music": [],
+        }
+    return records
+
+
+def measure(label: str, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<42} {current / 1e6:9.1f} MB retenidos  {peak / 1e6:9.1f} MB pico  {elapsed:7.3f}s")
+    return result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"N = {n}")
+    records = make_records(n)
+
+    # Solo el objeto: los textos ya existen en records y no cuentan
+    slotted = measure("Player (__slots__)", lambda: [Player.from_dict(r) for r in records.values()])
+    del slotted
+    plain = measure("Player con __dict__", lambda: [DictPlayer(r) for r in records.values()])
+    del plain
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rel = os.path.relpath(tmp, Path(__file__).resolve().parent.parent)
+        repo = PlayerRepository(storage=MemoryStorage(records), pending_file_path=rel + "/pending.json")
+        measure("get_all_dict() primera llamada", repo.get_all_dict)
+        measure("get_all_dict() siguiente llamada", repo.get_all_dict)
+        player = next(iter(repo._players.values()))
+        player._full_name = "Renombrado"
+        repo.update_player_info(player)
+        measure("get_all_dict() tras modificar 1 jugador", repo.get_all_dict)
+        repo.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark del formato binario frente al JSON actual.
+
+Para jugadores (players.json, indent=2) y Salón de la Fama (hall_of_fame.json con
+difficulty_name) genera N registros sintéticos y mide tamaño en disco y tiempo de
+guardado y carga de cada formato.
+
+Uso:
+    python benchmarks/bench_snapshot_format.py [N ...]   (por defecto 10000 100000 1000000)
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data import binary_snapshot
+from src.data.hall_of_fame import HallOfFameEntry
+
+
+def make_players(n: int) -> dict:
+    roster = {}
+    for i in range(n):
+        pid = str(uuid.uuid4())
+        roster[pid] = {
+            "id": pid,
+            "alias": f"piloto_{i}",
+            "full_name": f"Piloto Número {i}",
+            "email": f"piloto{i}@example.com",
+            "password_hash": "$2b$12$" + "x" * 53,
+            "profile_picture": f"assets/profiles/{i}.png",
+            "spaceship_image": "assets/ships/default.png",
+            "favorite_music": ["track_1.mp3", "track_7.mp3"],
+        }
+    return roster
+
+
+def make_entries(n: int) -> list:
+    entries = []
+    for i in range(n):
+        entry = HallOfFameEntry(f"piloto_{i}", random.randint(0, 1_000_000), random.randint(0, 2),
+                                f"2025-{random.randint(1, 12):02d}-{random.randint(1, 28):02d} 12:00:00")
+        entries.append(entry.to_dict())
+    return entries
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench(label: str, directory: Path, json_data, kind: int, records: list):
+    json_path = directory / f"{label}.json"
+    bin_path = directory / f"{label}.bin"
+
+    def save_json():
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(json_data, f, indent=2, ensure_ascii=False)
+
+    def load_json():
+        with open(json_path, "r", encoding="utf-8") as f:
+            json.load(f)
+
+    json_save = timed(save_json)
+    json_load = timed(load_json)
+    bin_save = timed(lambda: binary_snapshot.write_snapshot(bin_path, kind, records))
+    bin_load = timed(lambda: binary_snapshot.read_snapshot(bin_path))
+
+    json_size = json_path.stat().st_size
+    bin_size = bin_path.stat().st_size
+    print(f"  {label:<13} JSON {json_size / 1e6:9.2f} MB  guardar {json_save:7.2f}s  cargar {json_load:7.2f}s")
+    print(f"  {'':<13} bin  {bin_size / 1e6:9.2f} MB  guardar {bin_save:7.2f}s  cargar {bin_load:7.2f}s"
+          f"  ({bin_size / json_size:.0%} del tamaño)")
+    json_path.unlink()
+    bin_path.unlink()
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        for n in sizes:
+            print(f"N = {n}")
+            players = make_players(n)
+            bench("jugadores", directory, players, binary_snapshot.KIND_PLAYERS, list(players.values()))
+            del players
+            entries = make_entries(n)
+            bench("salon", directory, entries, binary_snapshot.KIND_HALL_OF_FAME, entries)
+            del entries
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Microbenchmark de los validadores de registro.
+
+Compara los validadores actuales (patrones precompilados, contraseña en una sola
+pasada) con la versión anterior (re.match/re.search con el patrón en cada llamada),
+y mide validate_registrations() sobre un lote.
+
+Uso:
+    python benchmarks/bench_validators.py [llamadas]
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.validators import Validator
+
+
+def old_validate_password_strength(password: str):
+    if len(password) < 7:
+        raise ValueError("La contraseña debe tener al menos 7 caracteres.")
+    if not re.search(r'[A-Z]', password):
+        raise ValueError("La contraseña debe contener al menos una mayúscula.")
+    if not re.search(r'[a-z]', password):
+        raise ValueError("La contraseña debe contener al menos una minúscula.")
+    if not re.search(r'[0-9]', password):
+        raise ValueError("La contraseña debe contener al menos un número.")
+    if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+        raise ValueError("La contraseña debe contener al menos un símbolo especial.")
+
+
+def old_validate_email(email: str):
+    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    if not re.match(pattern, email):
+        raise ValueError("Formato de email invalido.")
+
+
+def old_validate_alias(alias: str):
+    if not alias or len(alias) < 3:
+        raise ValueError("El alias debe tener al menos 3 caracteres.")
+    if not re.match(r'^[a-zA-Z0-9_-]+$', alias):
+        raise ValueError("El alias solo puede contener letras, números, guiones y guines bajos.")
+
+
+CASES = [
+    ("contraseña", old_validate_password_strength, Validator.validate_password_strength, "Galacta#2024tec"),
+    ("email", old_validate_email, Validator.validate_email, "piloto.estelar@example.com"),
+    ("alias", old_validate_alias, Validator.validate_alias, "piloto_estelar"),
+]
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"{calls} llamadas por validador (µs por llamada)")
+    for label, old, new, value in CASES:
+        old_time = timeit.timeit(lambda: old(value), number=calls) / calls * 1e6
+        new_time = timeit.timeit(lambda: new(value), number=calls) / calls * 1e6
+        print(f"  {label:<11} antes {old_time:6.2f}  ahora {new_time:6.2f}  ({old_time / new_time:.1f}x)")
+
+    batch = [{"alias": f"piloto_{i}", "email": f"piloto{i}@example.com", "password": "Galacta#2024tec"}
+             for i in range(10_000)]
+    batch[10]["password"] = "corta"
+    batch[20]["alias"] = "piloto_1"
+    elapsed = timeit.timeit(lambda: Validator.validate_registrations(batch), number=5) / 5
+    errors = Validator.validate_registrations(batch)
+    print(f"  validate_registrations({len(batch)} registros): {elapsed * 1e3:.1f} ms, "
+          f"{len(errors)} con errores")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Servidor de confirmación como aplicación ASGI (sin framework).
+
+Rutas:
+    GET  /                      estado del servidor
+    GET  /confirmar?token=...   confirma un registro pendiente (enlace del correo)
+    GET  /metrics               métricas en formato de texto de Prometheus
+    POST /registro              registra un jugador; cuerpo JSON con alias, full_name,
+                                email, password y opcionalmente profile_picture,
+                                spaceship_image y favorite_music
+
+Los manejadores usan las versiones async de PlayerService, así que el event loop no
+se bloquea con bcrypt, disco ni Brevo. Las dependencias se arman igual que en
+services/server.py (ver services/bootstrap.py). Se ejecuta con cualquier servidor ASGI
+que acepte fábricas, p. ej.:
+    uvicorn services.asgi_app:create_app --factory --port 5000
+"""
+import asyncio
+import json
+import os
+import sys
+from typing import Optional
+from urllib.parse import parse_qs
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(repo_root)
+
+from src.core.telemetry import PROMETHEUS_CONTENT_TYPE, REGISTRY, configure_logging
+from services.bootstrap import AppServices
+
+MAX_BODY = 64 * 1024
+
+
+async def _respond(send, status: int, body, content_type: str = "text/plain; charset=utf-8"):
+    if not isinstance(body, (bytes, str)):
+        body = json.dumps(body, ensure_ascii=False)
+        content_type = "application/json"
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type.encode("ascii")),
+                    (b"content-length", str(len(body)).encode("ascii"))],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _read_body(receive) -> bytes:
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise ConnectionError("Cliente desconectado")
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY:
+            raise ValueError("Cuerpo demasiado grande")
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def home(services, scope, receive, send):
+    await _respond(send, 200, "Servidor ASGI funcionando")
+
+
+async def metrics(services, scope, receive, send):
+    await _respond(send, 200, REGISTRY.render(), PROMETHEUS_CONTENT_TYPE)
+
+
+async def confirmar(services, scope, receive, send):
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    token = (query.get("token") or [None])[0]
+    if not token:
+        await _respond(send, 400, "Token no proporcionado")
+        return
+    try:
+        jugador = await services.player_service.confirmar_jugador_async(token)
+    except ValueError as e:
+        await _respond(send, 400, str(e))
+        return
+    await _respond(send, 200, f"Correo de {jugador.email} confirmado correctamente")
+
+
+async def registro(services, scope, receive, send):
+    try:
+        data = json.loads(await _read_body(receive) or b"{}")
+        if not isinstance(data, dict):
+            raise ValueError("Se esperaba un objeto JSON")
+        jugador_data = await services.player_service.registrar_jugador_async(
+            alias=data.get("alias", ""),
+            full_name=data.get("full_name", ""),
+            email=data.get("email", ""),
+            password=data.get("password", ""),
+            profile_picture=data.get("profile_picture", ""),
+            spaceship_image=data.get("spaceship_image", ""),
+            favorite_music=data.get("favorite_music"),
+        )
+    except ValueError as e:
+        # json.JSONDecodeError también es ValueError
+        await _respond(send, 400, {"error": str(e)})
+        return
+    except ConnectionError:
+        return
+    # Ni el token (llega por correo) ni el hash salen en la respuesta
+    await _respond(send, 201, {"alias": jugador_data["alias"], "email": jugador_data["email"],
+                               "estado": "pendiente de confirmación"})
+
+
+ROUTES = {
+    ("GET", "/"): home,
+    ("GET", "/confirmar"): confirmar,
+    ("GET", "/metrics"): metrics,
+    ("POST", "/registro"): registro,
+}
+
+
+async def _lifespan(services, receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            # Cerrar espera hilos y escribe a disco: fuera del event loop
+            await asyncio.to_thread(services.close)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+def create_app(services: Optional[AppServices] = None):
+    """Crea la aplicación ASGI. Sin `services` arma las dependencias desde el entorno."""
+    # Logs en JSON por stderr (nivel en GALACTATEC_LOG_LEVEL)
+    configure_logging()
+    if services is None:
+        services = AppServices()
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            await _lifespan(services, receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        handler = ROUTES.get((scope["method"], scope["path"]))
+        if handler is None:
+            allowed = [method for method, path in ROUTES if path == scope["path"]]
+            if allowed:
+                await _respond(send, 405, "Método no permitido")
+            else:
+                await _respond(send, 404, "No encontrado")
+            return
+        await handler(services, scope, receive, send)
+
+    app.services = services
+    return app
+
+
+if __name__ == "__main__":
+    try:
+        import uvicorn
+    except ImportError:
+        print("Instale un servidor ASGI (p. ej. pip install uvicorn) y ejecute: "
+              "uvicorn services.asgi_app:create_app --factory --port 5000")
+    else:
+        uvicorn.run(create_app(), host="0.0.0.0", port=5000)
@@ -0,0 +1,114 @@
+"""Arma las dependencias de los servidores (services/server.py y services/asgi_app.py).
+
+Variables de entorno:
+    DATA_DIR              carpeta de datos, relativa a la raíz del proyecto o absoluta
+                          (por defecto data). Los benchmarks de carga la apuntan a datos
+                          sintéticos.
+    PLAYER_STORAGE        backend de jugadores: json (por defecto), journal, lazy, binary
+                          (players.bin) o sqlite (players.db).
+    PLAYER_COMMIT_DELAY   segundos de escritura agrupada (sin definir = cada cambio se
+                          guarda en el momento).
+    PLAYER_REFRESH_INTERVAL  cada cuántos segundos (como mucho) las lecturas incorporan lo
+                          que escribieron otros procesos o workers (por defecto 1; 0 = siempre).
+    EMAIL_SENDER          local: los correos se guardan en correos_locales.jsonl (sin Brevo).
+    BREVO_API_KEY, EMAIL_REMITENTE   credenciales y remitente de Brevo.
+"""
+import os
+from pathlib import Path
+from typing import Optional
+
+from src.core.telemetry import REGISTRY
+from src.data.hall_of_fame import HallOfFameRepository
+from src.data.leaderboard import LeaderboardEngine
+from src.data.persistence import PlayerRepository
+from src.data.sqlite_storage import SQLitePlayerStorage
+from services.email_batcher import EmailBatcher
+from services.email_outbox import EmailOutbox
+from services.email_sender import EmailSender, LocalEmailSender
+from services.player_service import PlayerService
+from services.score_service import ScoreService
+
+repo_root = Path(__file__).resolve().parent.parent
+
+PLAYER_STORAGES = ("json", "journal", "lazy", "binary", "sqlite")
+
+
+def resolve_data_dir(data_dir=None) -> Path:
+    """Ruta absoluta de la carpeta de datos (argumento, DATA_DIR o data/)."""
+    return repo_root / (data_dir or os.getenv("DATA_DIR", "data"))
+
+
+def build_repository(data_dir: Path, player_storage: str, commit_delay: Optional[float] = None,
+                     refresh_interval: Optional[float] = 1.0) -> PlayerRepository:
+    if player_storage not in PLAYER_STORAGES:
+        raise ValueError(f"PLAYER_STORAGE inválido: {player_storage!r} (opciones: {', '.join(PLAYER_STORAGES)})")
+    pending = data_dir / "pending_players.json"
+    if player_storage == "sqlite":
+        return PlayerRepository(storage=SQLitePlayerStorage(data_dir / "players.db"),
+                                pending_file_path=pending, commit_delay=commit_delay,
+                                refresh_interval=refresh_interval)
+    players = data_dir / ("players.bin" if player_storage == "binary" else "players.json")
+    return PlayerRepository(players, pending_file_path=pending, commit_delay=commit_delay,
+                            refresh_interval=refresh_interval,
+                            journal=player_storage == "journal", lazy=player_storage == "lazy",
+                            binary=player_storage == "binary")
+
+
+def build_email_sender(data_dir: Path):
+    if os.getenv("EMAIL_SENDER") == "local":
+        return LocalEmailSender(data_dir / "correos_locales.jsonl")
+    return EmailSender(
+        api_key=os.getenv("BREVO_API_KEY"),
+        remitente={"email": os.getenv("EMAIL_REMITENTE", "melmontoya245@gmail.com"), "name": "Battle for Saturn"}
+        )
+
+
+class AppServices:
+    """Dependencias de un servidor: repositorio, correo (outbox + lotes) y, si se piden, scores.
+
+    close() las cierra en orden: primero lo que encola trabajo (scores, outbox) y al
+    final el repositorio.
+    """
+
+    def __init__(self, data_dir=None, player_storage: Optional[str] = None, scores: bool = False):
+        self.data_dir = resolve_data_dir(data_dir)
+        self.player_storage = player_storage or os.getenv("PLAYER_STORAGE", "json")
+        commit_delay = os.getenv("PLAYER_COMMIT_DELAY")
+        # Varios workers comparten data_dir: las lecturas se ponen al día periódicamente
+        # (la unicidad se vuelve a comprobar al escribir, ver PlayerStorage)
+        refresh_interval = float(os.getenv("PLAYER_REFRESH_INTERVAL", "1"))
+
+        self.repo = build_repository(self.data_dir, self.player_storage,
+                                     float(commit_delay) if commit_delay else None, refresh_interval)
+        self.email_sender = build_email_sender(self.data_dir)
+        # Los correos se encolan en el outbox y se entregan por lotes (con reintentos).
+        # Cada worker usa su propio archivo y adopta los de workers que ya no están.
+        self.email_batcher = EmailBatcher(self.email_sender)
+        self.email_outbox = EmailOutbox.open_for_worker(self.email_batcher, self.data_dir / "email_outbox.json")
+        self.player_service = PlayerService(self.repo, self.email_outbox)
+        REGISTRY.gauge("galactatec_email_outbox_pending", "Correos esperando entrega en el outbox.",
+                       self.email_outbox.pending_count)
+
+        self.leaderboard: Optional[LeaderboardEngine] = None
+        self.hall_of_fame: Optional[HallOfFameRepository] = None
+        self.score_service: Optional[ScoreService] = None
+        if scores:
+            # Los scores se acumulan en memoria y se fusionan al Salón de la Fama cada
+            # segundo; el leaderboard guarda el historial y los rankings por dificultad,
+            # por jugador y por día/semana
+            self.leaderboard = LeaderboardEngine(self.data_dir / "score_history.jsonl")
+            self.hall_of_fame = HallOfFameRepository(self.data_dir / "hall_of_fame.json",
+                                                     leaderboard=self.leaderboard)
+            self.score_service = ScoreService(self.hall_of_fame)
+            REGISTRY.gauge("galactatec_scores_pending", "Scores esperando fusionarse al ranking.",
+                           self.score_service.pending_count)
+
+    def close(self):
+        """Fusiona y entrega lo pendiente y cierra todo. Bloquea: en asyncio, usar to_thread."""
+        if self.score_service is not None:
+            self.score_service.close()
+            self.leaderboard.close()
+        self.email_outbox.close()
+        self.email_batcher.close()
+        self.player_service.close()
+        self.repo.close()
@@ -0,0 +1,179 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from src.core.telemetry import REGISTRY
+
+BATCH_SECONDS = REGISTRY.histogram("galactatec_email_batch_seconds",
+                                   "Duración del envío de cada lote de correos.", ["kind"])
+BATCH_MESSAGES = REGISTRY.counter("galactatec_email_batch_messages_total",
+                                  "Correos enviados en lotes por tipo y resultado.", ["kind", "result"])
+
+
+class EmailBatcher:
+    """Agrupa los correos que llegan en una ventana corta y los envía por lotes.
+
+    Cada llamada a submit() espera como máximo `window` segundos a que lleguen más
+    correos del mismo tipo (o a juntar `max_batch`) y el lote sale con una sola
+    llamada a sender.enviar_lote() (messageVersions en Brevo). Los lotes se envían en
+    un pool de `pool_size` hilos, el mismo tamaño que el pool de conexiones HTTP del
+    EmailSender, así que nunca hay más llamadas abiertas que conexiones reutilizables.
+
+    Si un lote falla se reenvía cada correo por separado y solo fallan los que vuelven
+    a fallar: una dirección rechazada no arrastra al resto del lote.
+
+    Expone enviar_correo_confirmacion / enviar_codigo_recuperacion (bloqueantes, como
+    EmailSender) y submit() que retorna un Future; EmailOutbox usa este último.
+    """
+
+    def __init__(self, sender, window: float = 0.05, max_batch: int = 50, pool_size: int = 4,
+                 max_pending: int = 10_000, stats_size: int = 1000):
+        self.sender = sender
+        self.window = window
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="email-batch")
+        self._cond = threading.Condition()
+        # tipo -> (momento del primer mensaje, [(destinatario, valor, future)])
+        self._open: Dict[str, Tuple[float, list]] = {}
+        self._pending = 0
+        self._closed = False
+
+        self._stats_lock = threading.Lock()
+        self._batches = deque(maxlen=stats_size)
+        self._totals = {"batches": 0, "messages": 0, "failed_batches": 0, "failed_messages": 0,
+                        "split_batches": 0}
+
+        self._flusher = threading.Thread(target=self._run, name="email-batcher", daemon=True)
+        self._flusher.start()
+
+    # ------------------------------- ENVÍO --------------------------------
+    def enviar_correo_confirmacion(self, destinatario, token):
+        return self.submit("confirmacion", destinatario, token).result()
+
+    def enviar_codigo_recuperacion(self, destinatario, codigo):
+        return self.submit("recuperacion", destinatario, codigo).result()
+
+    def submit(self, kind: str, destinatario: str, valor) -> Future:
+        """Añade el correo al lote abierto de su tipo. Se bloquea si hay max_pending en espera."""
+        future = Future()
+        with self._cond:
+            while self._pending >= self.max_pending and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                raise RuntimeError("EmailBatcher cerrado")
+            opened_at, items = self._open.setdefault(kind, (time.monotonic(), []))
+            items.append((destinatario, valor, future))
+            self._pending += 1
+            self._cond.notify_all()
+        return future
+
+    def _take_ready(self, force: bool = False) -> List[Tuple[str, list]]:
+        # Requiere el lock
+        now = time.monotonic()
+        ready = []
+        for kind, (opened_at, items) in list(self._open.items()):
+            while len(items) >= self.max_batch:
+                ready.append((kind, items[:self.max_batch]))
+                del items[:self.max_batch]
+            if items and (force or now - opened_at >= self.window):
+                ready.append((kind, items))
+                del self._open[kind]
+            elif not items:
+                del self._open[kind]
+        return ready
+
+    def _run(self):
+        while True:
+            with self._cond:
+                ready = self._take_ready(force=self._closed)
+                if not ready:
+                    if self._closed:
+                        return
+                    if self._open:
+                        first = min(opened_at for opened_at, _ in self._open.values())
+                        self._cond.wait(max(0.0, first + self.window - time.monotonic()))
+                    else:
+                        self._cond.wait()
+                    continue
+            for kind, items in ready:
+                self._pool.submit(self._send, kind, items)
+
+    def _send(self, kind: str, items: list):
+        error = self._send_batch(kind, [(destinatario, valor) for destinatario, valor, _ in items])
+        if error is None:
+            errors = [None] * len(items)
+        elif len(items) == 1:
+            errors = [error]
+        else:
+            # El proveedor rechaza la llamada entera aunque el problema sea un solo correo:
+            # se reintenta cada uno como lote de uno
+            with self._stats_lock:
+                self._totals["split_batches"] += 1
+            errors = [self._send_batch(kind, [(destinatario, valor)]) for destinatario, valor, _ in items]
+
+        with self._cond:
+            self._pending -= len(items)
+            self._cond.notify_all()
+        for (_, _, future), item_error in zip(items, errors):
+            if item_error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(item_error)
+
+    def _send_batch(self, kind: str, messages: list) -> Optional[Exception]:
+        """Una llamada a sender.enviar_lote(). Retorna el error, o None si salió."""
+        start = time.perf_counter()
+        error = None
+        try:
+            self.sender.enviar_lote(kind, messages)
+        except Exception as exc:
+            error = exc
+        self._record(kind, len(messages), time.perf_counter() - start, error)
+        return error
+
+    # ---------------------------- ESTADÍSTICAS ----------------------------
+    def _record(self, kind: str, size: int, latency: float, error: Optional[Exception]):
+        BATCH_SECONDS.observe(latency, kind=kind)
+        BATCH_MESSAGES.inc(size, kind=kind, result="ok" if error is None else "error")
+        with self._stats_lock:
+            self._batches.append({
+                "kind": kind,
+                "size": size,
+                "latency_ms": latency * 1e3,
+                "throughput": size / latency if latency > 0 else float(size),
+                "ok": error is None,
+            })
+            self._totals["batches"] += 1
+            self._totals["messages"] += size
+            if error is not None:
+                self._totals["failed_batches"] += 1
+                self._totals["failed_messages"] += size
+
+    def batch_stats(self) -> List[dict]:
+        """Latencia (ms) y rendimiento (correos/s) de los últimos lotes enviados."""
+        with self._stats_lock:
+            return [dict(batch) for batch in self._batches]
+
+    def stats(self) -> dict:
+        """Totales y resumen de los últimos lotes: tamaño medio, p50/p95 de latencia y correos/s."""
+        with self._stats_lock:
+            summary = dict(self._totals)
+            recent = list(self._batches)
+        if recent:
+            latencies = sorted(batch["latency_ms"] for batch in recent)
+            summary["avg_batch_size"] = sum(batch["size"] for batch in recent) / len(recent)
+            summary["latency_p50_ms"] = latencies[len(latencies) // 2]
+            summary["latency_p95_ms"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            summary["throughput"] = sum(batch["size"] for batch in recent) / (sum(latencies) / 1e3 or 1)
+        return summary
+
+    def close(self):
+        """Envía lo que quede en los lotes abiertos y espera a que terminen los envíos."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        self._pool.shutdown(wait=True)
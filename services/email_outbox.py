@@ -0,0 +1,383 @@
+import heapq
+import logging
+import random
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.core.telemetry import REGISTRY, get_logger, log_event
+from src.data.file_lock import OwnerLock
+from src.data.journal import JournalStore
+
+logger = get_logger("services.email_outbox")
+OUTBOX_DELIVERIES = REGISTRY.counter("galactatec_email_deliveries_total",
+                                     "Intentos de entrega del outbox por tipo y resultado (sent, retry, dead).",
+                                     ["kind", "result"])
+
+
+class OutboxInUseError(RuntimeError):
+    """El archivo de outbox ya tiene dueño (otro proceso u otra instancia)."""
+
+
+def _owner_lock_path(path: Path) -> Path:
+    return path.with_name(path.name + ".owner.lock")
+
+
+class EmailOutbox:
+    """Cola persistente de correos con entrega en segundo plano.
+
+    Expone los mismos métodos que EmailSender (enviar_correo_confirmacion,
+    enviar_codigo_recuperacion), así que PlayerService puede usarla en su lugar:
+    cada llamada guarda el mensaje en el outbox (JournalStore, con fsync) y retorna
+    enseguida. Un hilo de entrega llama al sender real; si falla, reintenta con
+    backoff exponencial (base_delay, 2*base_delay, ... hasta max_delay, con algo de
+    azar) y tras max_attempts intentos el mensaje queda como "dead" para revisarlo
+    con dead_letters() / retry_dead(). Lo que quede pendiente al cerrar se entrega
+    al arrancar de nuevo.
+
+    Los mensajes llevan secretos (token de confirmación, código de recuperación): al
+    descartarse, los de tipos en REDACT_ON_DEAD pierden sus argumentos y los demás se
+    borran pasados dead_ttl segundos (None = nunca).
+
+    Un archivo de outbox tiene un solo dueño: el outbox toma <archivo>.owner.lock
+    hasta close() y otro proceso (u otra instancia) que lo abra recibe OutboxInUseError.
+    Con varios workers, cada proceso abre el suyo con open_for_worker()
+    (email_outbox.json, email_outbox.1.json, ...) y adopt_orphans() pasa a este outbox
+    los mensajes de los archivos hermanos que quedaron sin dueño.
+    """
+
+    # Tipo de mensaje -> método del sender
+    KINDS = {
+        "confirmacion": "enviar_correo_confirmacion",
+        "recuperacion": "enviar_codigo_recuperacion",
+    }
+    # El código de recuperación vence en minutos: descartado ya no sirve reenviarlo
+    REDACT_ON_DEAD = {"recuperacion"}
+    # Cada cuánto los hilos de entrega borran los descartados vencidos y adoptan los
+    # outbox huérfanos
+    SWEEP_INTERVAL = 60.0
+
+    def __init__(self, sender, file_path: str = "data/email_outbox.json", max_attempts: int = 6,
+                 base_delay: float = 2.0, max_delay: float = 600.0, workers: int = 1,
+                 clock: Callable[[], float] = time.time, start: bool = True,
+                 dead_ttl: Optional[float] = 24 * 3600):
+        current_dir = Path(__file__).parent.parent
+        self.sender = sender
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.dead_ttl = dead_ttl
+        self._clock = clock
+
+        path = self.path = current_dir / file_path
+        # Solo el dueño entrega y compacta: otro proceso no ve los mensajes de este (no
+        # relee el log) y su compactación los borraría
+        self._owner_lock = OwnerLock(_owner_lock_path(path))
+        if not self._owner_lock.acquire():
+            raise OutboxInUseError(f"El outbox {path} ya está abierto por otro proceso")
+        try:
+            self._journal = JournalStore(path, compact_threshold=500, list_key="id")
+            self._messages: Dict[str, dict] = self._journal.load()
+        except BaseException:
+            self._owner_lock.release()
+            raise
+        self._cond = threading.Condition(self._journal.lock)
+        self._next_sweep = 0.0
+        self._due: List[tuple] = []  # (próximo intento, id) de los pendientes
+        for message in self._messages.values():
+            if message["status"] == "pending":
+                heapq.heappush(self._due, (message["next_attempt_at"], message["id"]))
+        self._in_flight = set()
+        self._stop = False
+
+        self._workers = []
+        if start:
+            for i in range(workers):
+                worker = threading.Thread(target=self._run, name=f"email-outbox-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    @classmethod
+    def open_for_worker(cls, sender, file_path: str = "data/email_outbox.json", max_workers: int = 64,
+                        **kwargs) -> "EmailOutbox":
+        """Abre el primer archivo libre de la familia de file_path (email_outbox.json,
+        email_outbox.1.json, ...): cada proceso del servidor entrega desde el suyo."""
+        base = Path(file_path)
+        for slot in range(max_workers):
+            path = base if slot == 0 else base.with_name(f"{base.stem}.{slot}{base.suffix}")
+            try:
+                return cls(sender, path, **kwargs)
+            except OutboxInUseError:
+                continue
+        raise OutboxInUseError(f"Los {max_workers} archivos de {base} ya tienen dueño")
+
+    # ------------------------------- ENCOLAR ------------------------------
+    def enviar_correo_confirmacion(self, destinatario, token):
+        return self.enqueue("confirmacion", destinatario, token)
+
+    def enviar_codigo_recuperacion(self, destinatario, codigo):
+        return self.enqueue("recuperacion", destinatario, codigo)
+
+    def enqueue(self, kind: str, destinatario: str, *args) -> str:
+        """Guarda el mensaje en el outbox y retorna su id (no espera la entrega)."""
+        if kind not in self.KINDS:
+            raise ValueError(f"Tipo de correo desconocido: {kind}")
+        now = self._clock()
+        message = {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "to": destinatario,
+            "args": list(args),
+            "status": "pending",
+            "attempts": 0,
+            "created_at": now,
+            "next_attempt_at": now,
+            "last_error": None,
+        }
+        with self._cond:
+            self._put(message)
+            heapq.heappush(self._due, (now, message["id"]))
+            self._cond.notify()
+        return message["id"]
+
+    def _put(self, message: dict):
+        # Requiere el lock
+        self._messages[message["id"]] = message
+        self._journal.append([("put", message["id"], message)])
+        self._journal.maybe_compact(self._snapshot)
+
+    def _delete(self, message_id: str):
+        # Requiere el lock
+        self._messages.pop(message_id, None)
+        self._journal.append([("del", message_id, None)])
+        self._journal.maybe_compact(self._snapshot)
+
+    def _snapshot(self) -> Dict[str, dict]:
+        return dict(self._messages)
+
+    # ------------------------------- ENTREGA ------------------------------
+    def _next_due(self) -> Optional[dict]:
+        """Espera hasta que haya un mensaje para intentar (None al cerrar o cuando toca
+        borrar los descartados vencidos). Requiere el lock."""
+        while not self._stop:
+            if self._clock() >= self._next_sweep:
+                return None
+            while self._due:
+                at, message_id = self._due[0]
+                message = self._messages.get(message_id)
+                if (message is None or message["status"] != "pending"
+                        or message["next_attempt_at"] != at or message_id in self._in_flight):
+                    heapq.heappop(self._due)  # entrada vieja
+                    continue
+                break
+            sweep_in = self._next_sweep - self._clock()
+            if not self._due:
+                self._cond.wait(sweep_in)
+                continue
+            delay = self._due[0][0] - self._clock()
+            if delay > 0:
+                self._cond.wait(min(delay, sweep_in))
+                continue
+            _, message_id = heapq.heappop(self._due)
+            self._in_flight.add(message_id)
+            return self._messages[message_id]
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                message = self._next_due()
+            if message is None:
+                if self._stop:
+                    return
+                self._sweep()
+                continue
+            if hasattr(self.sender, "submit"):
+                # EmailBatcher: no se espera al envío, así los mensajes se juntan en lotes
+                self._dispatch(message)
+            else:
+                self._deliver(message)
+
+    def _dispatch(self, message: dict):
+        try:
+            future = self.sender.submit(message["kind"], message["to"], *message["args"])
+        except Exception as exc:
+            self._finish(message, exc)
+            return
+        future.add_done_callback(lambda f: self._finish(message, f.exception()))
+
+    def _deliver(self, message: dict):
+        error = None
+        try:
+            getattr(self.sender, self.KINDS[message["kind"]])(message["to"], *message["args"])
+        except Exception as exc:
+            error = exc
+        self._finish(message, error)
+
+    def _finish(self, message: dict, error: Optional[Exception]):
+        with self._cond:
+            self._in_flight.discard(message["id"])
+            if error is None:
+                OUTBOX_DELIVERIES.inc(kind=message["kind"], result="sent")
+                self._delete(message["id"])
+                self._cond.notify_all()
+                return
+            redacted = self._retry_later(message, error)
+        if redacted:
+            # Fuera del lock (compact toma primero el suyo): el código también sale del disco
+            self._journal.compact(self._snapshot)
+
+    def _retry_later(self, message: dict, error: Exception) -> bool:
+        """Reprograma o descarta el mensaje. Retorna True si se le quitaron los argumentos.
+        Requiere el lock."""
+        redacted = False
+        attempts = message["attempts"] + 1
+        updated = dict(message, attempts=attempts, last_error=f"{type(error).__name__}: {error}")
+        if attempts >= self.max_attempts:
+            updated["status"] = "dead"
+            updated["dead_at"] = self._clock()
+            if message["kind"] in self.REDACT_ON_DEAD:
+                updated["args"] = None
+                redacted = True
+            OUTBOX_DELIVERIES.inc(kind=message["kind"], result="dead")
+            log_event(logger, logging.WARNING, "Correo descartado", id=message["id"], to=message["to"],
+                      attempts=attempts, error=str(error))
+        else:
+            OUTBOX_DELIVERIES.inc(kind=message["kind"], result="retry")
+            backoff = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+            updated["next_attempt_at"] = self._clock() + backoff * random.uniform(0.5, 1.0)
+            heapq.heappush(self._due, (updated["next_attempt_at"], updated["id"]))
+        self._put(updated)
+        self._cond.notify_all()
+        return redacted
+
+    # ---------------------------- CONSULTAS -------------------------------
+    def pending_count(self) -> int:
+        with self._cond:
+            return sum(1 for m in self._messages.values() if m["status"] == "pending")
+
+    def dead_letters(self) -> List[dict]:
+        with self._cond:
+            return [dict(m) for m in self._messages.values() if m["status"] == "dead"]
+
+    def retry_dead(self, message_id: str) -> bool:
+        """Vuelve a poner en cola un mensaje descartado (no los que perdieron sus argumentos)."""
+        with self._cond:
+            message = self._messages.get(message_id)
+            if message is None or message["status"] != "dead" or message["args"] is None:
+                return False
+            now = self._clock()
+            updated = dict(message, status="pending", attempts=0, next_attempt_at=now)
+            self._put(updated)
+            heapq.heappush(self._due, (now, message_id))
+            self._cond.notify()
+            return True
+
+    def _sweep(self):
+        with self._cond:
+            self._next_sweep = self._clock() + self.SWEEP_INTERVAL
+        try:
+            self.expire_dead()
+            self.adopt_orphans()
+        except Exception as exc:
+            log_event(logger, logging.WARNING, "Falló el mantenimiento del outbox", path=str(self.path),
+                      error=str(exc))
+
+    def expire_dead(self) -> int:
+        """Borra los descartados de hace más de dead_ttl segundos. Retorna cuántos.
+
+        Los hilos de entrega la llaman cada SWEEP_INTERVAL segundos."""
+        if self.dead_ttl is None:
+            return 0
+        with self._cond:
+            limit = self._clock() - self.dead_ttl
+            # Los descartados antes de guardar dead_at cuentan desde su creación
+            expired = [m["id"] for m in self._messages.values()
+                       if m["status"] == "dead" and m.get("dead_at", m["created_at"]) <= limit]
+            for message_id in expired:
+                self._delete(message_id)
+        if expired:
+            # Se compacta ya para que los tokens también salgan del log en disco
+            self._journal.compact(self._snapshot)
+            log_event(logger, logging.INFO, "Correos descartados vencidos borrados", count=len(expired))
+        return len(expired)
+
+    def _sibling_paths(self) -> List[Path]:
+        # Los archivos de la misma familia, por sus .owner.lock (el de un proceso que se
+        # cayó antes de compactar puede no tener snapshot, solo el log)
+        base = self.path
+        if base.stem.rpartition(".")[2].isdigit():
+            base = base.with_name(f"{base.stem.rpartition('.')[0]}{base.suffix}")
+        locks = [_owner_lock_path(base)] + list(base.parent.glob(f"{base.stem}.*{base.suffix}.owner.lock"))
+        paths = [lock.with_name(lock.name[:-len(".owner.lock")]) for lock in locks if lock.exists()]
+        return sorted(path for path in paths if path != self.path)
+
+    def adopt_orphans(self) -> int:
+        """Pasa a este outbox los mensajes de los archivos hermanos sin dueño (de un
+        worker que terminó o se cayó) y los vacía. Retorna cuántos mensajes adoptó.
+
+        Los hilos de entrega la llaman cada SWEEP_INTERVAL segundos. Un mensaje podría
+        entregarse dos veces si el proceso se cae justo entre adoptarlo y vaciar el
+        archivo de origen, nunca perderse."""
+        adopted = 0
+        for path in self._sibling_paths():
+            owner_lock = OwnerLock(_owner_lock_path(path))
+            if not owner_lock.acquire():
+                continue
+            try:
+                journal = JournalStore(path, compact_threshold=500, list_key="id")
+                try:
+                    messages = journal.load()
+                    if not messages:
+                        continue
+                    with self._cond:
+                        for message in messages.values():
+                            self._messages[message["id"]] = message
+                            if message["status"] == "pending":
+                                heapq.heappush(self._due, (message["next_attempt_at"], message["id"]))
+                        self._journal.append([("put", m["id"], m) for m in messages.values()])
+                        self._journal.maybe_compact(self._snapshot)
+                        self._cond.notify_all()
+                    # Recién con los mensajes guardados aquí se vacía el archivo huérfano
+                    journal.append([("del", message_id, None) for message_id in messages])
+                    journal.compact(dict)
+                    adopted += len(messages)
+                finally:
+                    journal.close()
+            finally:
+                owner_lock.release()
+        if adopted:
+            log_event(logger, logging.INFO, "Correos adoptados de outbox sin dueño", path=str(self.path),
+                      count=adopted)
+        return adopted
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que no queden mensajes por entregar (sin contar los descartados)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while any(m["status"] == "pending" for m in self._messages.values()):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining if remaining is not None else 0.5)
+            return True
+
+    def close(self):
+        """Detiene los hilos de entrega; lo pendiente queda guardado para el próximo arranque.
+
+        Si el sender es un EmailBatcher, ciérrelo después del outbox."""
+        with self._cond:
+            if self._stop:
+                return
+            self._stop = True
+            self._cond.notify_all()
+        for worker in self._workers:
+            worker.join()
+        with self._cond:
+            # Envíos despachados al EmailBatcher que aún no terminan
+            while self._in_flight:
+                self._cond.wait()
+        self._journal.close()
+        self._owner_lock.release()
@@ -1,33 +1,86 @@
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
 import requests
 from sib_api_v3_sdk import ApiClient, Configuration
 from sib_api_v3_sdk.api import transactional_emails_api
-from sib_api_v3_sdk.models import SendSmtpEmail
+from sib_api_v3_sdk.models import CreateSmtpEmail, SendSmtpEmail, SendSmtpEmailMessageVersions
 from sib_api_v3_sdk.rest import ApiException
 
+from src.core.telemetry import REGISTRY, get_logger, log_event
+
+logger = get_logger("services.email")
+EMAIL_API_SECONDS = REGISTRY.histogram("galactatec_email_api_seconds",
+                                       "Duración de las llamadas a la API de correo.", ["kind"])
+EMAIL_API_ERRORS = REGISTRY.counter("galactatec_email_api_errors_total",
+                                    "Llamadas a la API de correo que fallaron.", ["kind"])
+
+
+# URL pública resuelta: (url, momento en que se resolvió)
+_url_publica_cache = None
+_url_publica_lock = threading.Lock()
+URL_PUBLICA_TTL = 300  # segundos; ngrok cambia la URL al reiniciarse
 
-def obtener_url_publica():
+
+def obtener_url_publica(refrescar: bool = False):
     #Intenta obtenr la URL pública de ngrok; si falla, retorna localhost"
+    #PUBLIC_URL la fija sin consultar a ngrok. El resultado se guarda URL_PUBLICA_TTL
+    #segundos para no consultar la API de ngrok en cada correo.
+    global _url_publica_cache
+    fija = os.getenv("PUBLIC_URL")
+    if fija:
+        return fija.rstrip("/")
 
-    try:
-        respuesta = requests.get("http://127.0.0.1:4040/api/tunnels")
-        data = respuesta.json()
-        public_url = data['tunnels'][0]['public_url']
-        print(f"URL pública detectada: {public_url}")
+    with _url_publica_lock:
+        if (not refrescar and _url_publica_cache is not None
+                and time.monotonic() - _url_publica_cache[1] < URL_PUBLICA_TTL):
+            return _url_publica_cache[0]
+        try:
+            respuesta = requests.get("http://127.0.0.1:4040/api/tunnels", timeout=2)
+            data = respuesta.json()
+            public_url = data['tunnels'][0]['public_url']
+            log_event(logger, logging.INFO, "URL pública detectada", url=public_url)
+        except Exception:
+            log_event(logger, logging.WARNING, "No se pudo obtener la URL pública de ngrok. Usando localhost por defecto.")
+            public_url = "http://localhost:5000"
+        _url_publica_cache = (public_url, time.monotonic())
         return public_url
-    except Exception:
-        print("No se pudo obtener la URL pública de ngrok. Usando localhost por defecto.")
-        return "http://localhost:5000"
 
 
 class EmailSender:
     #Abstrae la logica de comunicacion con el servicio de envio de correos (Brevo)"
-    def __init__(self, api_key, remitente):
+
+    # Tipo de correo -> (asunto, cuerpo con {{params.x}} para los envíos por lote)
+    PLANTILLAS_LOTE = {
+        "confirmacion": ("Confirma tu correo",
+                         "Haz clic en el siguiente enlace para confirmar tu correo: {{params.enlace}}"),
+        "recuperacion": ("Recupera tu contraseña",
+                         "Tu código de recuperación es: {{params.codigo}}\nEste código expira en 5 minutos."),
+    }
+
+    def __init__(self, api_key, remitente, pool_size: int = 4, tx_api=None):
         "Inicializa el clienta de la API de Brevo con la clave y la informacion del remitente"
+        #pool_size acota las conexiones HTTP que el cliente mantiene abiertas y reutiliza.
+        #tx_api permite usar otro proveedor (p. ej. ProveedorSimulado) con la misma interfaz.
         self.remitente = remitente
         configuration = Configuration()
         configuration.api_key['api-key'] = api_key
+        configuration.connection_pool_maxsize = pool_size
         self.api_client = ApiClient(configuration)
-        self.tx_api = transactional_emails_api.TransactionalEmailsApi(self.api_client)
+        self.tx_api = tx_api or transactional_emails_api.TransactionalEmailsApi(self.api_client)
+
+    def _llamar_api(self, tipo, email):
+        #Envia por la API midiendo la duracion y contando los errores
+        with EMAIL_API_SECONDS.time(kind=tipo):
+            try:
+                return self.tx_api.send_transac_email(email)
+            except Exception:
+                EMAIL_API_ERRORS.inc(kind=tipo)
+                raise
 
     def enviar_correo_confirmacion(self, destinatario, token):
         #Envia el correo con un enlace de confirmacion de registro
@@ -45,15 +98,14 @@ class EmailSender:
 
         try:
             #Llama a la API para enviar el correo
-            response = self.tx_api.send_transac_email(email)
-            print(f"Correo enviado a {destinatario}, MessageId: {getattr(response, 'message_id', response)}")
+            response = self._llamar_api("confirmacion", email)
+            log_event(logger, logging.INFO, "Correo enviado", to=destinatario,
+                      message_id=getattr(response, 'message_id', None))
         except ApiException as e:
             #Manejo de errores especificos de la API
-            print(f"No se pudo enviar el correo. Status: {getattr(e, 'status', 'N/A')}, Reason: {getattr(e, 'reason', str(e))}")
-            try: 
-                print("Response body:", e.body)
-            except Exception: 
-                pass
+            log_event(logger, logging.WARNING, "No se pudo enviar el correo", to=destinatario,
+                      status=getattr(e, 'status', None), reason=getattr(e, 'reason', str(e)),
+                      body=getattr(e, 'body', None))
             raise
 
     def enviar_codigo_recuperacion(self, destinatario, codigo):
@@ -71,7 +123,101 @@ class EmailSender:
 
         #Llama a la API para enviar el correo 
         try:
-            self.tx_api.send_transac_email(email)
-            print(f"Código enviado a {destinatario}")
+            self._llamar_api("recuperacion", email)
+            log_event(logger, logging.INFO, "Código enviado", to=destinatario)
         except Exception as e:
-            print(f"Error al enviar código: {e}")
\ No newline at end of file
+            log_event(logger, logging.WARNING, "Error al enviar código", to=destinatario, error=str(e))
+            raise
+
+    def enviar_lote(self, tipo, mensajes):
+        #Envia varios correos del mismo tipo en una sola llamada usando messageVersions:
+        #una version por destinatario con sus propios parametros. mensajes es una lista
+        #de (destinatario, token o codigo). Si la llamada falla, falla el lote completo.
+        asunto, cuerpo = self.PLANTILLAS_LOTE[tipo]
+        public_url = obtener_url_publica() if tipo == "confirmacion" else None
+        versiones = []
+        for destinatario, valor in mensajes:
+            if tipo == "confirmacion":
+                params = {"enlace": f"{public_url}/confirmar?token={valor}"}
+            else:
+                params = {"codigo": valor}
+            versiones.append(SendSmtpEmailMessageVersions(to=[{"email": destinatario}], params=params))
+
+        email = SendSmtpEmail(
+            sender=self.remitente,
+            subject=asunto,
+            text_content=cuerpo,
+            message_versions=versiones
+        )
+        try:
+            return self._llamar_api(tipo, email)
+        except ApiException as e:
+            log_event(logger, logging.WARNING, "No se pudo enviar el lote de correos", kind=tipo,
+                      size=len(mensajes), status=getattr(e, 'status', None),
+                      reason=getattr(e, 'reason', str(e)))
+            raise
+
+
+class LocalEmailSender:
+    #Sustituto local de EmailSender para probar sin Brevo ni red: guarda los correos en
+    #memoria (enviados) y, si se indica, en un archivo JSONL. Con fallos=N los primeros N
+    #envíos lanzan ConnectionError, para probar reintentos.
+    def __init__(self, archivo=None, fallos: int = 0):
+        self.archivo = Path(archivo) if archivo else None
+        self.fallos = fallos
+        self.enviados = []
+        self._lock = threading.Lock()
+
+    def _enviar(self, destinatario, asunto, cuerpo):
+        with self._lock:
+            if self.fallos > 0:
+                self.fallos -= 1
+                raise ConnectionError("Fallo simulado del proveedor de correo")
+            correo = {"to": destinatario, "subject": asunto, "text": cuerpo, "sent_at": time.time()}
+            self.enviados.append(correo)
+            if self.archivo:
+                self.archivo.parent.mkdir(exist_ok=True, parents=True)
+                with open(self.archivo, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(correo, ensure_ascii=False) + "\n")
+        log_event(logger, logging.INFO, "Correo local", subject=asunto, to=destinatario)
+
+    def enviar_correo_confirmacion(self, destinatario, token):
+        cuerpo = f"Haz clic en el siguiente enlace para confirmar tu correo: {obtener_url_publica()}/confirmar?token={token}"
+        self._enviar(destinatario, "Confirma tu correo", cuerpo)
+
+    def enviar_codigo_recuperacion(self, destinatario, codigo):
+        cuerpo = f"Tu código de recuperación es: {codigo}\nEste código expira en 5 minutos."
+        self._enviar(destinatario, "Recupera tu contraseña", cuerpo)
+
+    def enviar_lote(self, tipo, mensajes):
+        for destinatario, valor in mensajes:
+            if tipo == "confirmacion":
+                self.enviar_correo_confirmacion(destinatario, valor)
+            else:
+                self.enviar_codigo_recuperacion(destinatario, valor)
+
+
+class ProveedorSimulado:
+    #Sustituto de TransactionalEmailsApi para pruebas de carga: acepta send_transac_email
+    #igual que Brevo, espera latencia segundos por llamada (como un viaje de red) y guarda
+    #los correos recibidos. Con fallos=N las primeras N llamadas lanzan ApiException.
+    def __init__(self, latencia: float = 0.05, fallos: int = 0):
+        self.latencia = latencia
+        self.fallos = fallos
+        self.llamadas = 0
+        self.recibidos = []
+        self._lock = threading.Lock()
+
+    def send_transac_email(self, email):
+        time.sleep(self.latencia)
+        with self._lock:
+            self.llamadas += 1
+            if self.fallos > 0:
+                self.fallos -= 1
+                raise ApiException(status=503, reason="Fallo simulado del proveedor")
+            versiones = email.message_versions or [SendSmtpEmailMessageVersions(to=email.to, params=email.params)]
+            ids = []
+            for version in versiones:
+                ids.append(f"<simulado-{len(self.recibidos)}@local>")
+                self.recibidos.append({"to": version.to, "subject": email.subject, "params": version.params})
+        return CreateSmtpEmail(message_ids=ids) if email.message_versions else CreateSmtpEmail(message_id=ids[0])
@@ -1,30 +1,69 @@
+import asyncio
+import functools
 import json
-import re
+import logging
+import time
 import uuid
-from validators import Validator, UniquenessValidator
-from player import Player
-from persistence import PlayerRepository
+from concurrent.futures import ThreadPoolExecutor
+from src.core.validators import Validator
+from src.core.password_hasher import get_password_hasher
+from src.core.player import Player
+from src.core.telemetry import REGISTRY, get_logger, log_event
+from src.data.persistence import PlayerRepository
+
+logger = get_logger("services.player_service")
+SERVICE_SECONDS = REGISTRY.histogram("galactatec_player_service_seconds",
+                                     "Duración de registros y confirmaciones.", ["op"])
+SERVICE_RESULTS = REGISTRY.counter("galactatec_player_service_total",
+                                   "Registros y confirmaciones por resultado (ok, invalid).", ["op", "result"])
 
 #Contiene la lógica de negocio para interactuar con los jugadores.
 # Actúa como un intermediario entre la interfaz de usuario y el almacenamiento.
 class PlayerService:
-    def __init__(self, repo: PlayerRepository, email_sender):
+    def __init__(self, repo: PlayerRepository, email_sender, repo_workers: int = 4):
         self.repo = repo
         self.email_sender = email_sender
+        # Versiones async: el repositorio se usa desde un pool chico (su lock hace atómicas
+        # las altas y, con escritura agrupada, las confirmaciones concurrentes comparten
+        # lote) y el envío de correos desde el executor por defecto
+        self._repo_executor = ThreadPoolExecutor(max_workers=repo_workers, thread_name_prefix="player-repo")
 
     #crear un nuevo jugador 
     def registrar_jugador(self, alias, full_name, email, password, profile_picture="", spaceship_image="", favorite_music=None):
+        start = time.perf_counter()
         # Validaciones
-        self.repo.validate_alias_email(alias, email)
-        Validator.validate_email(email)
-        Validator.validate_password_strength(password)
+        try:
+            self.repo.validate_alias_email(alias, email)
+            Validator.validate_email(email)
+            Validator.validate_password_strength(password)
+        except ValueError:
+            SERVICE_RESULTS.inc(op="registrar", result="invalid")
+            raise
+
+        # La contraseña se hashea aquí (en el pool del hasher) y el pendiente guarda el
+        # registro del jugador ya armado: confirmar solo lo mueve, sin bcrypt ni texto plano.
+        password_hash = get_password_hasher().hash(password)
+        jugador_data = self._armar_pendiente(alias, full_name, email, password_hash,
+                                             profile_picture, spaceship_image, favorite_music)
+
+        # Guardar pendiente: Almacena temporalmente en pending_players
+        self.repo.add_pending_player(jugador_data)
+
+        # Enviar correo
+        self.email_sender.enviar_correo_confirmacion(email, jugador_data["token"])
+        SERVICE_RESULTS.inc(op="registrar", result="ok")
+        SERVICE_SECONDS.observe(time.perf_counter() - start, op="registrar")
+        return jugador_data # Retorna datos del jugador pendiente
 
+    def _armar_pendiente(self, alias, full_name, email, password_hash, profile_picture,
+                         spaceship_image, favorite_music):
         token = str(uuid.uuid4())
-        jugador_data = {
+        return {
+            "id": str(uuid.uuid4()),
             "alias": alias,
             "full_name": full_name,
             "email": email,
-            "password": password,
+            "password_hash": password_hash,
             "profile_picture": profile_picture,
             "spaceship_image": spaceship_image,
             "favorite_music": favorite_music or [],
@@ -32,67 +71,131 @@ class PlayerService:
             "confirmed": False
         }
 
-        # Guardar pendiente: Almacena temporalmente en pending_players
-        self.repo.add_pending_player(jugador_data)
-
-        # Enviar correo
-        self.email_sender.enviar_correo_confirmacion(email, token)
-        return jugador_data # Retorna datos del jugador pendiente
-
     def confirmar_jugador(self, token: str) -> Player:
+        with SERVICE_SECONDS.time(op="confirmar"):
+            jugador_data = self._pendiente_de(token)
+            # Mueve los datos del jugador pendiente a la lista de jugadores confirmados (`players.json`).
+            # La contraseña ya viene hasheada desde el registro.
+            try:
+                self.repo.confirm_pending_player(jugador_data)
+            except ValueError:
+                SERVICE_RESULTS.inc(op="confirmar", result="invalid")
+                raise
+            return self._confirmado(jugador_data)
+
+    def _pendiente_de(self, token: str) -> dict:
         jugador_data = self.repo.get_pending_player_by_token(token)
         # Si no se encuentra, el token es inválido o ya se usó.
         if not jugador_data:
+            SERVICE_RESULTS.inc(op="confirmar", result="invalid")
             raise ValueError("Token inválido o jugador no encontrado")
-        # Mueve los datos del jugador pendiente a la lista de jugadores confirmados (`players.json`).
-        # El repositorio se encarga de hashear la contraseña en este proceso.
-        self.repo.confirm_pending_player(jugador_data)
+        return jugador_data
+
+    def _confirmado(self, jugador_data: dict) -> Player:
+        SERVICE_RESULTS.inc(op="confirmar", result="ok")
+        log_event(logger, logging.INFO, "Jugador confirmado", player_id=jugador_data.get("id"))
         return self.repo.get_player_by_email(jugador_data["email"])
     
     def validar_contraseña(self,contraseña: str): 
-        if len(contraseña) < 7:
-            raise ValueError("La contraseña debe tener al menos 7 caracteres")
-        if not re.search(r'[A-Z]', contraseña):
-            raise ValueError("Debe contener al menos una mayúscula")
-        if not re.search(r'[a-z]', contraseña):
-            raise ValueError("Debe contener al menos una minúscula")
-        if not re.search(r'[0-9]', contraseña):
-            raise ValueError("Debe contener al menos un número")
-        if not re.search(r'[!@#$%^&*(),.?\":{}|<>]', contraseña):
-            raise ValueError("Debe contener al menos un símbolo especial")
+        # Mismas reglas que en el registro (validadores precompilados)
+        Validator.validate_password_strength(contraseña)
+
+    # Recuperación de contraseña: se envía un código por correo que vence en 5 minutos.
+    def solicitar_recuperacion(self, email):
+        codigo = self.repo.request_password_reset(email)
+        # Si el email no existe no se envía nada, pero la respuesta es la misma
+        if codigo is not None:
+            self.email_sender.enviar_codigo_recuperacion(email, codigo)
+
+    def restablecer_contraseña(self, email, codigo, nueva_contraseña):
+        Validator.validate_password_strength(nueva_contraseña)
+        if not self.repo.update_password(email, nueva_contraseña, code=codigo):
+            raise ValueError("Código de recuperación inválido o vencido")
     
     # Método para actualizar la información de un jugador existente.
     def actualizar_jugador(self, player_id, alias, full_name, email, profile_picture, spaceship_image, favorite_music):
-        print(f"DEBUG: Iniciando actualizar_jugador()")
-        print(f"player_id: {player_id}")
-        print(f"full_name antiguo: SERÁ ACTUALIZADO A: {full_name}")
-        
         # Obtener el jugador existente por ID
         jugador_existente = self.repo.get_player_by_id(player_id)
         if not jugador_existente:
             raise ValueError("Jugador no encontrado")
         
-        print(f"Jugador encontrado: {jugador_existente.alias}")
-        
-        # Configurar el validador de unicidad (excluyendo el ID del jugador actual)
-        current_players = self.repo.get_all_dict()
-        jugador_existente.set_uniqueness_validator(UniquenessValidator(current_players))
+        # Configurar el validador de unicidad (usa los índices del repositorio y excluye el ID del jugador actual)
+        jugador_existente.set_uniqueness_validator(self.repo.uniqueness_validator)
         
         # Usa los setters de alias y email 
         jugador_existente.alias = alias
         jugador_existente.email = email
-        print(f"Alias y email actualizados")
         
         # Asigna el resto de valores directamente al objeto Player en memoria
         jugador_existente._full_name = full_name
         jugador_existente._profile_picture = profile_picture
         jugador_existente._spaceship_image = spaceship_image
         jugador_existente._favorite_music = [m.strip() for m in favorite_music if m.strip()]
-        print(f" Otros datos actualizados: full_name={jugador_existente._full_name}")
 
         # Guardar cambios: Notifica al repositorio para que persista el objeto Player actualizado en el archivo JSON.
         self.repo.update_player_info(jugador_existente) 
-        print(f"Cambios guardados en disco\n")
+        log_event(logger, logging.DEBUG, "Jugador actualizado", player_id=player_id, alias=alias)
         
         #Retorna el objeto Player actualizado
-        return jugador_existente
\ No newline at end of file
+        return jugador_existente
+
+    # ================= Versiones async =================
+    # Para servidores asyncio (ver services/asgi_app.py): no bloquean el event loop.
+    # bcrypt va al pool de procesos del hasher, el repositorio a su pool y Brevo al
+    # executor por defecto.
+    async def _en_repo(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._repo_executor, functools.partial(fn, *args, **kwargs))
+
+    async def registrar_jugador_async(self, alias, full_name, email, password, profile_picture="",
+                                      spaceship_image="", favorite_music=None):
+        start = time.perf_counter()
+        try:
+            await self._en_repo(self.repo.validate_alias_email, alias, email)
+            Validator.validate_email(email)
+            Validator.validate_password_strength(password)
+        except ValueError:
+            SERVICE_RESULTS.inc(op="registrar", result="invalid")
+            raise
+
+        password_hash = await get_password_hasher().hash_async(password)
+        jugador_data = self._armar_pendiente(alias, full_name, email, password_hash,
+                                             profile_picture, spaceship_image, favorite_music)
+        await self._en_repo(self.repo.add_pending_player, jugador_data)
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.email_sender.enviar_correo_confirmacion,
+                                   email, jugador_data["token"])
+        SERVICE_RESULTS.inc(op="registrar", result="ok")
+        SERVICE_SECONDS.observe(time.perf_counter() - start, op="registrar")
+        return jugador_data
+
+    async def confirmar_jugador_async(self, token: str) -> Player:
+        # La confirmación ya no hashea: todo es trabajo del repositorio. Con escritura
+        # agrupada el lote se espera en el event loop, no en un hilo del pool (si no, el
+        # pool limitaría las confirmaciones a repo_workers por commit_delay).
+        start = time.perf_counter()
+        jugador_data = await self._en_repo(self._pendiente_de, token)
+        try:
+            confirmacion = await self._en_repo(self.repo.start_confirmation, jugador_data)
+            if confirmacion is not None:
+                try:
+                    await asyncio.wrap_future(confirmacion.saved)
+                except Exception:
+                    pass  # finish() deshace el alta y relanza el error si no se guardó
+                finally:
+                    await self._en_repo(confirmacion.finish)
+        except ValueError:
+            SERVICE_RESULTS.inc(op="confirmar", result="invalid")
+            raise
+        jugador = await self._en_repo(self._confirmado, jugador_data)
+        SERVICE_SECONDS.observe(time.perf_counter() - start, op="confirmar")
+        return jugador
+
+    async def actualizar_jugador_async(self, player_id, alias, full_name, email, profile_picture,
+                                       spaceship_image, favorite_music):
+        return await self._en_repo(self.actualizar_jugador, player_id, alias, full_name, email,
+                                   profile_picture, spaceship_image, favorite_music)
+
+    def close(self):
+        self._repo_executor.shutdown()
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from src.core.telemetry import REGISTRY, get_logger, log_event
+from src.data.hall_of_fame import HallOfFameEntry, HallOfFameRepository
+
+logger = get_logger("services.scores")
+
+SCORES_TOTAL = REGISTRY.counter("galactatec_scores_total",
+                                "Scores recibidos por resultado (accepted/rejected/dropped).", ["result"])
+SCORE_FLUSH_SECONDS = REGISTRY.histogram("galactatec_score_flush_seconds",
+                                         "Duración de cada fusión de un lote de scores al ranking.")
+
+MAX_NAME_LENGTH = 32
+MAX_SCORE = 10 ** 9
+
+
+class ScoreService:
+    """Recibe scores de partidas y los fusiona al Salón de la Fama por lotes.
+
+    submit() solo valida y agrega al búfer en memoria (hasta max_buffer scores); un
+    hilo los fusiona cada flush_interval segundos con HallOfFameRepository.add_entries,
+    así que cada lote cuesta una sola escritura del ranking (y del historial, si hay
+    leaderboard), sin importar cuántos scores traiga.
+
+    top() retorna el top serializado con su ETag. Se calcula una vez por versión del
+    ranking y límite; mientras no entre un score nuevo al top se reutiliza.
+    """
+
+    def __init__(self, hall_of_fame: HallOfFameRepository, flush_interval: float = 1.0,
+                 max_buffer: int = 10_000):
+        self.hall_of_fame = hall_of_fame
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+
+        self._buffer: List[HallOfFameEntry] = []
+        self._cond = threading.Condition()
+        # Serializa las fusiones con las lecturas del ranking
+        self._ranking_lock = threading.Lock()
+        # límite -> (versión del ranking, ETag, cuerpo JSON)
+        self._cache: Dict[Optional[int], Tuple[int, str, bytes]] = {}
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name="score-flusher", daemon=True)
+        self._thread.start()
+
+    # ------------------------------ VALIDACIÓN ----------------------------
+    @staticmethod
+    def validate(data) -> HallOfFameEntry:
+        """Convierte un score recibido en HallOfFameEntry o lanza ValueError.
+
+        La fecha la pone el servidor; la que envíe el cliente se ignora.
+        """
+        if not isinstance(data, dict):
+            raise ValueError("Cada score debe ser un objeto JSON")
+        name = data.get("player_name")
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError("El nombre del jugador es obligatorio")
+        name = name.strip()
+        if len(name) > MAX_NAME_LENGTH:
+            raise ValueError(f"El nombre del jugador no puede superar {MAX_NAME_LENGTH} caracteres")
+        score = data.get("score")
+        # bool es subclase de int: se rechaza aparte
+        if not isinstance(score, int) or isinstance(score, bool) or not 0 <= score <= MAX_SCORE:
+            raise ValueError(f"El score debe ser un entero entre 0 y {MAX_SCORE}")
+        difficulty = data.get("difficulty")
+        if (not isinstance(difficulty, int) or isinstance(difficulty, bool)
+                or not 0 <= difficulty < len(HallOfFameEntry.DIFFICULTY_NAMES)):
+            raise ValueError("Dificultad inválida")
+        return HallOfFameEntry(name, score, difficulty)
+
+    # ------------------------------ RECEPCIÓN -----------------------------
+    def submit(self, items: List[dict]) -> Dict:
+        """Valida y encola los scores. Retorna {"accepted": n, "rejected": [{index, error}]}.
+
+        Si el búfer está lleno los scores válidos se descartan y se lanza RuntimeError.
+        """
+        accepted: List[HallOfFameEntry] = []
+        rejected = []
+        for index, data in enumerate(items):
+            try:
+                accepted.append(self.validate(data))
+            except ValueError as e:
+                rejected.append({"index": index, "error": str(e)})
+        if rejected:
+            SCORES_TOTAL.inc(len(rejected), result="rejected")
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("El servicio de scores está cerrado")
+            if len(self._buffer) + len(accepted) > self.max_buffer:
+                SCORES_TOTAL.inc(len(accepted), result="dropped")
+                log_event(logger, logging.WARNING, "búfer de scores lleno",
+                          pending=len(self._buffer), dropped=len(accepted))
+                raise RuntimeError("Demasiados scores en espera. Intente más tarde.")
+            self._buffer.extend(accepted)
+        if accepted:
+            SCORES_TOTAL.inc(len(accepted), result="accepted")
+        return {"accepted": len(accepted), "rejected": rejected}
+
+    def pending_count(self) -> int:
+        return len(self._buffer)
+
+    # ------------------------------- FUSIÓN -------------------------------
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait(self.flush_interval)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                log_event(logger, logging.ERROR, "error al fusionar scores", error=str(e))
+
+    def flush(self) -> int:
+        """Fusiona los scores pendientes al ranking. Retorna cuántos entraron al top."""
+        with self._cond:
+            batch, self._buffer = self._buffer, []
+        with SCORE_FLUSH_SECONDS.time(), self._ranking_lock:
+            if self.hall_of_fame.unsaved:
+                # Un guardado anterior falló con sus scores ya en el ranking: solo se
+                # reintenta guardar, sin volver a añadirlos
+                try:
+                    self.hall_of_fame.save()
+                except Exception:
+                    self._requeue(batch)
+                    raise
+            if not batch:
+                return 0
+            try:
+                placed = sum(self.hall_of_fame.add_entries(batch))
+            except Exception:
+                # Si el lote no llegó al ranking se reintenta entero en la próxima fusión;
+                # si llegó y solo falló el guardado, se reintenta save() (arriba)
+                if not self.hall_of_fame.unsaved:
+                    self._requeue(batch)
+                raise
+        log_event(logger, logging.DEBUG, "scores fusionados", batch=len(batch), placed=placed)
+        return placed
+
+    def _requeue(self, batch: List[HallOfFameEntry]):
+        with self._cond:
+            self._buffer[:0] = batch
+
+    # ------------------------------- LECTURA ------------------------------
+    def top(self, limit: Optional[int] = None) -> Tuple[str, bytes]:
+        """Top del Salón de la Fama como (ETag, cuerpo JSON), cacheado por versión."""
+        with self._ranking_lock:
+            version = self.hall_of_fame.version
+            cached = self._cache.get(limit)
+            if cached is not None and cached[0] == version:
+                return cached[1], cached[2]
+            entries = [entry.to_dict() for entry in self.hall_of_fame.get_top(limit)]
+        body = json.dumps(entries, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        # ETag a partir del contenido: sigue siendo válido tras reiniciar el servidor
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        with self._ranking_lock:
+            if self.hall_of_fame.version == version:
+                self._cache[limit] = (version, etag, body)
+        return etag, body
+
+    def close(self):
+        """Detiene el hilo y fusiona lo que quede en el búfer."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self.flush()
@@ -1,37 +1,87 @@
+import atexit
 import sys
 import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from flask import Flask, request
-from persistence import PlayerRepository
-from services.player_service import PlayerService
-from services.email_sender import EmailSender  
-
-app = Flask(__name__)
-
-# Inicializar dependencias
-repo = PlayerRepository("data/players.json")
-email_sender = EmailSender(
-    api_key=os.getenv("BREVO_API_KEY"), 
-    remitente={"email": os.getenv("EMAIL_REMITENTE", "melmontoya245@gmail.com"), "name": "Battle for Saturn"}
-    )
-
-player_service = PlayerService(repo, email_sender)
-
-@app.route('/')
-def home():
-    return "Servidor Flask funcionando"
-
-@app.route("/confirmar")
-def confirmar():
-    token = request.args.get("token")
-    if not token:
-        return "Token no proporcionado", 400
-    try:
-        jugador = player_service.confirmar_jugador(token)
-        return f"Correo de {jugador.email} confirmado correctamente"
-    except ValueError as e:
-        return str(e), 400
-    
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(repo_root)
+
+from typing import Optional
+
+from flask import Flask, Response, jsonify, request
+from src.core.telemetry import PROMETHEUS_CONTENT_TYPE, REGISTRY, configure_logging
+from services.bootstrap import AppServices
+
+# Máximo de scores por petición a /puntajes
+MAX_SCORES_PER_REQUEST = 100
+
+
+def create_app(services: Optional[AppServices] = None) -> Flask:
+    """Crea la aplicación Flask. Sin `services` arma las dependencias desde el entorno
+    (DATA_DIR, PLAYER_STORAGE, EMAIL_SENDER; ver services/bootstrap.py)."""
+    # Logs en JSON por stderr (nivel en GALACTATEC_LOG_LEVEL)
+    configure_logging()
+    if services is None:
+        services = AppServices(scores=True)
+        # Al salir se fusionan los scores y se entregan los correos que queden
+        atexit.register(services.close)
+    player_service = services.player_service
+    hall_of_fame = services.hall_of_fame
+    score_service = services.score_service
+
+    app = Flask(__name__)
+    app.extensions["galactatec"] = services
+
+    @app.route('/')
+    def home():
+        return "Servidor Flask funcionando"
+
+    @app.route("/confirmar")
+    def confirmar():
+        token = request.args.get("token")
+        if not token:
+            return "Token no proporcionado", 400
+        try:
+            jugador = player_service.confirmar_jugador(token)
+            return f"Correo de {jugador.email} confirmado correctamente"
+        except ValueError as e:
+            return str(e), 400
+
+    @app.route("/metrics")
+    def metrics():
+        # Métricas en formato de texto de Prometheus
+        return Response(REGISTRY.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+    if score_service is None:
+        return app
+
+    @app.route("/puntajes", methods=["POST"])
+    def puntajes():
+        # Un score ({"player_name", "score", "difficulty"}) o una lista de ellos
+        data = request.get_json(silent=True)
+        items = data if isinstance(data, list) else [data]
+        if not items or len(items) > MAX_SCORES_PER_REQUEST:
+            return jsonify({"error": f"Se esperaban entre 1 y {MAX_SCORES_PER_REQUEST} scores"}), 400
+        try:
+            resultado = score_service.submit(items)
+        except RuntimeError as e:
+            return jsonify({"error": str(e)}), 503
+        # 202: se incorporan al ranking en la próxima fusión
+        return jsonify(resultado), 202 if resultado["accepted"] else 400
+
+    @app.route("/salon-de-la-fama")
+    def salon_de_la_fama():
+        limit = request.args.get("limit", type=int)
+        if limit is not None and not 1 <= limit <= hall_of_fame.max_entries:
+            return jsonify({"error": f"limit debe estar entre 1 y {hall_of_fame.max_entries}"}), 400
+        etag, body = score_service.top(limit)
+        # no-cache: el cliente puede guardarlo pero revalida con If-None-Match
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if request.if_none_match.contains_weak(etag.strip('"')):
+            return Response(status=304, headers=headers)
+        return Response(body, content_type="application/json", headers=headers)
+
+    return app
+
+
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
\ No newline at end of file
+    # Modo debug (recarga y depurador) solo con FLASK_DEBUG=1
+    create_app().run(host="0.0.0.0", port=5000)
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import bcrypt
+
+from .telemetry import REGISTRY
+
+DEFAULT_ROUNDS = 12
+BCRYPT_SECONDS = REGISTRY.histogram("galactatec_bcrypt_seconds",
+                                    "Duración de las operaciones bcrypt (incluida la espera en el pool).", ["op"])
+
+
+# Funciones que corren en los procesos del pool (deben poder importarse por nombre)
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _verify(password: str, hashed: str) -> bool:
+    return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+
+
+def _verify_and_update(password: str, hashed: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    if not _verify(password, hashed):
+        return False, None
+    current = hash_rounds(hashed)
+    if current is not None and current < rounds:
+        # Contraseña correcta con un costo menor al configurado: se aprovecha que se
+        # conoce la contraseña para rehashearla. Un costo mayor se deja (bajar el
+        # configurado no debilita los hashes ya guardados).
+        return True, _hash(password, rounds)
+    return True, None
+
+
+def hash_rounds(hashed: str) -> Optional[int]:
+    """Costo (rounds) de un hash bcrypt "$2b$12$...", o None si no se reconoce."""
+    parts = hashed.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    """Hash y verificación bcrypt en un pool de procesos.
+
+    Cada hash cuesta cientos de ms de CPU; en el pool varios logins o
+    confirmaciones simultáneos se reparten entre los núcleos en lugar de
+    bloquear el hilo que llama. Hay versiones síncronas (esperan el resultado),
+    submit_* que retornan un Future, y *_async para usar con asyncio.
+
+    rounds es el costo de bcrypt para los hashes nuevos; verify_and_update()
+    rehashea cuando un hash guardado tiene un costo menor. Con max_workers=0 todo se
+    ejecuta en el hilo que llama (sin pool).
+    """
+
+    def __init__(self, rounds: int = DEFAULT_ROUNDS, max_workers: Optional[int] = None,
+                 executor: Optional[Executor] = None):
+        if not 4 <= rounds <= 31:
+            raise ValueError("El costo de bcrypt debe estar entre 4 y 31")
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self._executor = executor
+        self._own_executor = executor is None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> Optional[Executor]:
+        if self._executor is None and self.max_workers != 0:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers or os.cpu_count())
+        return self._executor
+
+    def _submit(self, op: str, fn, *args) -> Future:
+        start = time.perf_counter()
+        pool = self._pool()
+        if pool is not None:
+            future = pool.submit(fn, *args)
+        else:
+            future = Future()
+            try:
+                future.set_result(fn(*args))
+            except BaseException as exc:
+                future.set_exception(exc)
+        future.add_done_callback(lambda _: BCRYPT_SECONDS.observe(time.perf_counter() - start, op=op))
+        return future
+
+    # ------------------------------ FUTUROS -------------------------------
+    def submit_hash(self, password: str) -> Future:
+        return self._submit("hash", _hash, password, self.rounds)
+
+    def submit_verify(self, password: str, hashed: str) -> Future:
+        return self._submit("verify", _verify, password, hashed)
+
+    def submit_verify_and_update(self, password: str, hashed: str) -> Future:
+        return self._submit("verify", _verify_and_update, password, hashed, self.rounds)
+
+    # ----------------------------- SÍNCRONO -------------------------------
+    def hash(self, password: str) -> str:
+        return self.submit_hash(password).result()
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self.submit_verify(password, hashed).result()
+
+    def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Retorna (correcta, hash nuevo o None si no hace falta rehashear)."""
+        return self.submit_verify_and_update(password, hashed).result()
+
+    def needs_rehash(self, hashed: str) -> bool:
+        rounds = hash_rounds(hashed)
+        return rounds is not None and rounds < self.rounds
+
+    # ------------------------------ ASYNCIO -------------------------------
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self.submit_hash(password))
+
+    async def verify_async(self, password: str, hashed: str) -> bool:
+        return await asyncio.wrap_future(self.submit_verify(password, hashed))
+
+    async def verify_and_update_async(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        return await asyncio.wrap_future(self.submit_verify_and_update(password, hashed))
+
+    def close(self):
+        """Cierra el pool si lo creó este hasher."""
+        with self._lock:
+            if self._own_executor and self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+_default_hasher: Optional[PasswordHasher] = None
+_default_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Hasher compartido por Player. El costo se puede fijar con GALACTATEC_BCRYPT_ROUNDS
+    y los procesos con GALACTATEC_HASH_WORKERS (0 = sin pool)."""
+    global _default_hasher
+    if _default_hasher is None:
+        with _default_lock:
+            if _default_hasher is None:
+                rounds = int(os.environ.get("GALACTATEC_BCRYPT_ROUNDS", DEFAULT_ROUNDS))
+                workers = os.environ.get("GALACTATEC_HASH_WORKERS")
+                _default_hasher = PasswordHasher(rounds, int(workers) if workers is not None else None)
+    return _default_hasher
+
+
+def set_password_hasher(hasher: PasswordHasher):
+    """Reemplaza el hasher compartido (p. ej. con otro costo o sin pool)."""
+    global _default_hasher
+    with _default_lock:
+        _default_hasher = hasher
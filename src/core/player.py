@@ -1,11 +1,15 @@
 import uuid
-import bcrypt
 from typing import List, Optional
+from .password_hasher import get_password_hasher
 from .validators import Validator, UniquenessValidator
 
 class Player:
     """Clase que representa un jugador"""
 
+    # Sin __dict__ por instancia: con rosters grandes cada jugador ocupa bastante menos
+    __slots__ = ("_id", "_alias", "_full_name", "_email", "_password_hash", "_profile_picture",
+                 "_spaceship_image", "_favorite_music", "_uniqueness_validator", "_serialized")
+
     def __init__(self, alias: str, full_name: str, email: str, password: str,
                  profile_picture: str = "", spaceship_image: str = "",
                  favorite_music: Optional[List[str]] = None):
@@ -20,16 +24,22 @@ class Player:
         self._spaceship_image = spaceship_image
         self._favorite_music = favorite_music or []
         self._uniqueness_validator: Optional[UniquenessValidator] = None
+        self._serialized: Optional[dict] = None
 
         Validator.validate_email(self._email)
 
     # ================= Métodos de contraseña =================
+    # El hash corre en el pool de procesos del PasswordHasher compartido
     def _hash_password(self, password: str) -> str:
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+        return get_password_hasher().hash(password)
 
     def verify_password(self, password: str) -> bool:
-        return bcrypt.checkpw(password.encode("utf-8"), self._password_hash.encode("utf-8"))
+        """Verifica la contraseña; si es correcta y el hash tiene un costo distinto
+        al configurado, se reemplaza por uno nuevo (ver PasswordHasher)."""
+        ok, new_hash = get_password_hasher().verify_and_update(password, self._password_hash)
+        if new_hash is not None:
+            self._password_hash = new_hash
+        return ok
 
     def set_password(self, new_password: str):
         """Actualiza la contraseña del jugador con hash seguro"""
@@ -66,7 +76,20 @@ class Player:
 
     # ================= Serialización =================
     def to_dict(self):
-        return {
+        """Retorna el jugador serializado. El dict se memoriza mientras ningún campo
+        se reasigne, así que quien lo reciba no debe modificarlo."""
+        serialized = self._serialized
+        if (serialized is not None
+                and serialized["alias"] is self._alias
+                and serialized["email"] is self._email
+                and serialized["password_hash"] is self._password_hash
+                and serialized["full_name"] is self._full_name
+                and serialized["profile_picture"] is self._profile_picture
+                and serialized["spaceship_image"] is self._spaceship_image
+                and serialized["favorite_music"] is self._favorite_music
+                and serialized["id"] is self._id):
+            return serialized
+        serialized = self._serialized = {
             "id": self._id,
             "alias": self._alias,
             "full_name": self._full_name,
@@ -76,11 +99,12 @@ class Player:
             "spaceship_image": self._spaceship_image,
             "favorite_music": self._favorite_music
         }
+        return serialized
 
     @classmethod
     def from_dict(cls, data: dict):
         player = cls.__new__(cls)
-        player._id = data.get("id", str(uuid.uuid4()))
+        player._id = data["id"] if "id" in data else str(uuid.uuid4())
         player._alias = data.get("alias", "")
         player._full_name = data.get("full_name", "")
         player._email = data.get("email", "")
@@ -89,4 +113,5 @@ class Player:
         player._spaceship_image = data.get("spaceship_image", "")
         player._favorite_music = data.get("favorite_music", [])
         player._uniqueness_validator = None
+        player._serialized = None
         return player
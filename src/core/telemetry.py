@@ -0,0 +1,241 @@
+"""Logs estructurados y métricas en memoria (formato de texto de Prometheus).
+
+Logs: los módulos usan get_logger("data.storage") y log_event(logger, nivel, mensaje,
+**campos). Sin configurar, Python solo muestra WARNING o más en stderr; los servidores
+llaman a configure_logging(), que escribe una línea JSON por evento con el nivel de
+GALACTATEC_LOG_LEVEL (INFO por defecto). Los volcados de datos completos (p. ej. el
+roster al guardar) solo se generan con GALACTATEC_LOG_PAYLOADS=1 y nivel DEBUG.
+
+Métricas: contadores, histogramas y gauges registrados en REGISTRY; render() los
+escribe en el formato que lee Prometheus (ruta /metrics de los servidores).
+"""
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+LOGGER_NAME = "galactatec"
+
+
+# ---------------------------------- LOGS --------------------------------------
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def log_event(logger: logging.Logger, level: int, message: str, **fields):
+    """Registra message con campos estructurados (solo si el nivel está habilitado)."""
+    if logger.isEnabledFor(level):
+        logger.log(level, message, extra={"fields": fields})
+
+
+def payload_logging_enabled(logger: logging.Logger) -> bool:
+    """True si hay que volcar datos completos: GALACTATEC_LOG_PAYLOADS=1 y nivel DEBUG."""
+    return os.environ.get("GALACTATEC_LOG_PAYLOADS") == "1" and logger.isEnabledFor(logging.DEBUG)
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por evento: ts, level, logger, msg y los campos del evento."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(level: Optional[str] = None, stream=None):
+    """Envía los logs de la aplicación a stream (stderr) en JSON. Llamarla de nuevo no duplica."""
+    logger = logging.getLogger(LOGGER_NAME)
+    level = level or os.environ.get("GALACTATEC_LOG_LEVEL", "INFO")
+    logger.setLevel(level.upper())
+    if not any(getattr(handler, "_galactatec", False) for handler in logger.handlers):
+        handler = logging.StreamHandler(stream or sys.stderr)
+        handler.setFormatter(JsonFormatter())
+        handler._galactatec = True
+        logger.addHandler(handler)
+    logger.propagate = False
+
+
+# -------------------------------- MÉTRICAS ------------------------------------
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> Tuple:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} espera las etiquetas {self.label_names}")
+        return tuple(labels[name] for name in self.label_names)
+
+    def _header(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type_name}"
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> Iterable[str]:
+        yield from self._header()
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # etiquetas -> [conteos por bucket (no acumulados), suma, total]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Mide el bloque with y lo registra (también si lanza una excepción)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def render(self) -> Iterable[str]:
+        yield from self._header()
+        with self._lock:
+            series = [(key, list(s[0]), s[1], s[2]) for key, s in self._series.items()]
+        for key, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}"
+            labels = _format_labels(self.label_names, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class Gauge(_Metric):
+    """Valor que se lee al exportar, con una función (p. ej. correos pendientes)."""
+    type_name = "gauge"
+
+    def __init__(self, name: str, help_text: str, fn: Callable[[], float]):
+        super().__init__(name, help_text)
+        self.fn = fn
+
+    def render(self) -> Iterable[str]:
+        try:
+            value = self.fn()
+        except Exception:
+            return
+        yield from self._header()
+        yield f"{self.name} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"La métrica {name} ya existe con otro tipo")
+            return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, help_text, labels)
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help_text, labels, buckets)
+
+    def gauge(self, name: str, help_text: str, fn: Callable[[], float]) -> Gauge:
+        """Registra (o reemplaza la función de) un gauge."""
+        gauge = self._register(Gauge, name, help_text, fn)
+        gauge.fn = fn
+        return gauge
+
+    def render(self) -> str:
+        """Todas las métricas en formato de texto de Prometheus (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
@@ -1,32 +1,115 @@
 import re
 from pathlib import Path
-from typing import List
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Patrones compilados una sola vez al importar
+_ALIAS_PATTERN = re.compile(r'^[a-zA-Z0-9_-]+$')
+_EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+# Hash bcrypt: $2a$, $2b$ o $2y$, costo de dos cifras y 53 caracteres de sal + hash
+_BCRYPT_PATTERN = re.compile(r'^\$2[aby]\$(\d{2})\$[./A-Za-z0-9]{53}$')
+
+# Clases de caracteres de la contraseña (las mismas que [A-Z], [a-z], [0-9] y los símbolos)
+_UPPER = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+_LOWER = frozenset("abcdefghijklmnopqrstuvwxyz")
+_DIGITS = frozenset("0123456789")
+_SPECIAL = frozenset('!@#$%^&*(),.?":{}|<>')
 
 class Validator: 
     #Clase para validaciones de email, contraseña, archivos y música
-    def validate_alias(alias:str):
+    #Los *_errors retornan todos los errores (lista vacía si es válido); los validate_*
+    #lanzan ValueError con el primero.
+    def alias_errors(alias: str) -> List[str]:
         if not alias or len(alias) < 3: 
-            raise ValueError("El alias debe tener al menos 3 caracteres.")
-        if not re.match(r'^[a-zA-Z0-9_-]+$', alias):
-            raise ValueError("El alias solo puede contener letras, números, guiones y guines bajos.")
+            return ["El alias debe tener al menos 3 caracteres."]
+        if not _ALIAS_PATTERN.match(alias):
+            return ["El alias solo puede contener letras, números, guiones y guines bajos."]
+        return []
+
+    def email_errors(email: str) -> List[str]:
+        #Valida el formato de email usando una expresion regular estandar
+        if not email or not _EMAIL_PATTERN.match(email): 
+            return ["Formato de email invalido."]
+        return []
+
+    def password_errors(password: str) -> List[str]:
+        #Una sola pasada: el conjunto de caracteres se arma una vez y se compara con cada clase
+        errors = []
+        if len(password) < 7: 
+            errors.append("La contraseña debe tener al menos 7 caracteres.")
+        chars = set(password)
+        if chars.isdisjoint(_UPPER):
+            errors.append("La contraseña debe contener al menos una mayúscula.")
+        if chars.isdisjoint(_LOWER):
+            errors.append("La contraseña debe contener al menos una minúscula.")
+        if chars.isdisjoint(_DIGITS):
+            errors.append("La contraseña debe contener al menos un número.")
+        if chars.isdisjoint(_SPECIAL):
+            errors.append("La contraseña debe contener al menos un símbolo especial.")
+        return errors
+
+    def password_hash_errors(password_hash: str) -> List[str]:
+        #Hashes importados ya calculados: deben ser bcrypt con un costo válido (4 a 31)
+        match = _BCRYPT_PATTERN.match(password_hash or "")
+        if not match or not 4 <= int(match.group(1)) <= 31:
+            return ["El hash de contraseña debe ser bcrypt ($2a$, $2b$ o $2y$ con costo entre 04 y 31)."]
+        return []
+
+    def validate_alias(alias:str):
+        errors = Validator.alias_errors(alias)
+        if errors:
+            raise ValueError(errors[0])
     
     def validate_email(email: str):
-        #Valida el formato de email usando una expresion regular estandar
-        pattern =  r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(pattern, email): 
-            raise ValueError("Formato de email invalido.")
+        errors = Validator.email_errors(email)
+        if errors:
+            raise ValueError(errors[0])
     
     def validate_password_strength(password: str): 
-        if len(password) < 7: 
-            raise ValueError("La contraseña debe tener al menos 7 caracteres.")
-        if not re.search(r'[A-Z]', password):
-            raise ValueError("La contraseña debe contener al menos una mayúscula.")
-        if not re.search(r'[a-z]', password):
-            raise ValueError("La contraseña debe contener al menos una minúscula.")
-        if not re.search(r'[0-9]', password):
-            raise ValueError("La contraseña debe contener al menos un número.")
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
-            raise ValueError("La contraseña debe contener al menos un símbolo especial.")
+        errors = Validator.password_errors(password)
+        if errors:
+            raise ValueError(errors[0])
+
+    def validate_registrations(records: Iterable[dict],
+                               uniqueness_validator: Optional["UniquenessValidator"] = None
+                               ) -> Dict[int, Dict[str, List[str]]]:
+        #Valida muchos registros de una vez (importaciones, herramientas de administración).
+        #Retorna {posición: {campo: [errores]}} solo para los registros con errores, incluidos
+        #alias/email repetidos dentro del lote y, con uniqueness_validator, ya registrados.
+        #Un registro sin "password" pero con un "password_hash" bcrypt válido se acepta tal cual.
+        report: Dict[int, Dict[str, List[str]]] = {}
+        seen_alias: Dict[str, int] = {}
+        seen_email: Dict[str, int] = {}
+        for position, record in enumerate(records):
+            alias = record.get("alias") or ""
+            email = record.get("email") or ""
+            errors = {
+                "alias": Validator.alias_errors(alias),
+                "email": Validator.email_errors(email),
+            }
+            if "password" in record:
+                errors["password"] = Validator.password_errors(record["password"] or "")
+            elif not record.get("password_hash"):
+                errors["password"] = ["Falta la contraseña."]
+            else:
+                errors["password_hash"] = Validator.password_hash_errors(record["password_hash"])
+
+            alias_key = UniquenessValidator.normalize(alias)
+            email_key = UniquenessValidator.normalize(email)
+            if alias_key in seen_alias:
+                errors["alias"].append(f"Alias repetido en el registro {seen_alias[alias_key]}.")
+            elif uniqueness_validator and not uniqueness_validator.is_alias_unique(alias):
+                errors["alias"].append("Alias ya en uso.")
+            if email_key in seen_email:
+                errors["email"].append(f"Email repetido en el registro {seen_email[email_key]}.")
+            elif uniqueness_validator and not uniqueness_validator.is_email_unique(email):
+                errors["email"].append("Email ya registrado.")
+            seen_alias.setdefault(alias_key, position)
+            seen_email.setdefault(email_key, position)
+
+            errors = {field: messages for field, messages in errors.items() if messages}
+            if errors:
+                report[position] = errors
+        return report
     
     def validate_file_path(file_path: str): 
         #Verifica si una ruta de archivo existe en el sistema
@@ -38,22 +121,39 @@ class Validator:
                 raise ValueError(f"Archivo de música inválido: {f}")
 
 class UniquenessValidator:
-    #Verifica la unicidad del alias y email contra la de otros jugadores
-    def __init__(self, existing_players: dict = None):
+    #Verifica la unicidad del alias y email contra la de otros jugadores.
+    #Consulta índices normalizados (minúsculas -> id): los de PlayerRepository si se
+    #pasan las funciones de búsqueda, o unos propios construidos desde existing_players.
+    def __init__(self, existing_players: dict = None,
+                 alias_lookup: Optional[Callable[[str], Optional[str]]] = None,
+                 email_lookup: Optional[Callable[[str], Optional[str]]] = None):
         self.existing_players = existing_players or {}
+        if alias_lookup is None or email_lookup is None:
+            alias_index, email_index = self.build_indexes(self.existing_players)
+            alias_lookup = alias_lookup or alias_index.get
+            email_lookup = email_lookup or email_index.get
+        self._alias_lookup = alias_lookup
+        self._email_lookup = email_lookup
+
+    @staticmethod
+    def normalize(value: str) -> str:
+        #Clave de índice: alias y email se comparan sin distinguir mayúsculas
+        return (value or "").lower()
+
+    @classmethod
+    def build_indexes(cls, players: dict) -> Tuple[Dict[str, str], Dict[str, str]]:
+        #Construye los índices alias -> id y email -> id en una sola pasada
+        alias_index, email_index = {}, {}
+        for pid, pdata in players.items():
+            alias_index[cls.normalize(pdata.get("alias"))] = pid
+            email_index[cls.normalize(pdata.get("email"))] = pid
+        return alias_index, email_index
+
     #Alias unico 
     def is_alias_unique(self, alias: str, exclude_id: str = None): 
-        for pid, pdata in self.existing_players.items():
-            if exclude_id and pid == exclude_id:
-                continue
-            if pdata.get("alias") == alias:
-                return False
-        return True
+        owner = self._alias_lookup(self.normalize(alias))
+        return owner is None or (exclude_id is not None and owner == exclude_id)
     #Email unico 
     def is_email_unique(self, email: str, exclude_id: str = None):
-        for pid, pdata in self.existing_players.items():
-            if exclude_id and pid == exclude_id:
-                continue
-            if pdata.get("email") == email:
-                return False
-        return True
+        owner = self._email_lookup(self.normalize(email))
+        return owner is None or (exclude_id is not None and owner == exclude_id)
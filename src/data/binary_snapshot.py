@@ -0,0 +1,280 @@
+"""Formato binario compacto y versionado para jugadores y Salón de la Fama.
+
+Estructura del archivo (little-endian):
+
+    cabecera   "GTSN" | versión u16 | tipo u8 | relleno u8 | cantidad u32
+    registro   largo u32 | contenido
+
+Con el largo de cada registro un lector puede saltarse los campos que añadan
+versiones futuras. Contenido de cada tipo:
+
+    jugadores  7 largos u16 (id, alias, full_name, email, password_hash,
+               profile_picture, spaceship_image; 0xFFFF = None) |
+               canciones u16 (0xFFFF = None) | largo u16 de cada canción |
+               textos UTF-8 seguidos, y al final los campos no previstos en JSON
+               (los largos son en caracteres: el texto se decodifica de una vez)
+    salón      score i64 | dificultad u8 | fecha u64 (AAAAMMDDhhmmss) |
+               largo del nombre u16 | nombre UTF-8
+
+difficulty_name no se guarda: se deriva de difficulty.
+
+Uso desde la línea de comandos:
+    python -m src.data.binary_snapshot import players data/players.json data/players.bin
+    python -m src.data.binary_snapshot export data/players.bin data/players.json
+"""
+import argparse
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+MAGIC = b"GTSN"
+VERSION = 1
+
+KIND_PLAYERS = 1
+KIND_HALL_OF_FAME = 2
+KINDS = {"players": KIND_PLAYERS, "hall_of_fame": KIND_HALL_OF_FAME}
+
+_HEADER = struct.Struct("<4sHBxI")
+_LENGTH = struct.Struct("<I")
+_PLAYER_HEAD = struct.Struct("<7HH")
+_ENTRY_HEAD = struct.Struct("<qBQH")
+
+_PLAYER_FIELDS = ("id", "alias", "full_name", "email", "password_hash",
+                  "profile_picture", "spaceship_image")
+_PLAYER_KEYS = frozenset(_PLAYER_FIELDS + ("favorite_music",))
+_NONE = 0xFFFF
+_MAX_TEXT = 0xFFFE
+
+# ------------------------------ JUGADORES ---------------------------------
+def _check_length(text: str) -> int:
+    if len(text) > _MAX_TEXT:
+        raise ValueError(f"Texto demasiado largo para el formato binario ({len(text)} caracteres)")
+    return len(text)
+
+
+def encode_player(record: dict) -> bytes:
+    # Los largos son en caracteres: al leer se decodifica el texto del registro de
+    # una sola vez y se corta por posiciones.
+    lengths, texts = [], []
+    for field in _PLAYER_FIELDS:
+        value = record.get(field)
+        if value is None:
+            lengths.append(_NONE)
+            continue
+        value = str(value)
+        lengths.append(_check_length(value))
+        texts.append(value)
+    music = record.get("favorite_music")
+    if music is None:
+        lengths.append(_NONE)
+    else:
+        lengths.append(len(music))
+        for song in music:
+            song = str(song)
+            lengths.append(_check_length(song))
+            texts.append(song)
+    extras = {k: v for k, v in record.items() if k not in _PLAYER_KEYS}
+    if extras:
+        texts.append(json.dumps(extras, ensure_ascii=False))
+    return _lengths_struct(len(lengths)).pack(*lengths) + "".join(texts).encode("utf-8")
+
+
+_STRUCTS = {}
+
+
+def _lengths_struct(count: int) -> struct.Struct:
+    cached = _STRUCTS.get(count)
+    if cached is None:
+        cached = _STRUCTS[count] = struct.Struct(f"<{count}H")
+    return cached
+
+
+def decode_player(data: bytes, pos: int = 0, end: Optional[int] = None) -> dict:
+    head = _PLAYER_HEAD.unpack_from(data, pos)
+    music_count = head[-1]
+    pos += _PLAYER_HEAD.size
+    music_lengths = ()
+    if music_count != _NONE and music_count:
+        music_lengths = _lengths_struct(music_count).unpack_from(data, pos)
+        pos += 2 * music_count
+    text = data[pos:end].decode("utf-8")
+
+    record = {}
+    cut = 0
+    for field, length in zip(_PLAYER_FIELDS, head):
+        if length == _NONE:
+            record[field] = None
+        else:
+            record[field] = text[cut:cut + length]
+            cut += length
+    if music_count == _NONE:
+        record["favorite_music"] = None
+    else:
+        music = []
+        for length in music_lengths:
+            music.append(text[cut:cut + length])
+            cut += length
+        record["favorite_music"] = music
+    if cut < len(text):
+        # Lo que sobra son los campos extra en JSON
+        record.update(json.loads(text[cut:]))
+    return record
+
+
+# --------------------------- SALÓN DE LA FAMA -----------------------------
+def _pack_date(date: str) -> int:
+    """"AAAA-MM-DD hh:mm:ss" -> AAAAMMDDhhmmss."""
+    if len(date) != 19 or date[4] != "-" or date[7] != "-" or date[10] != " " or date[13] != ":" or date[16] != ":":
+        raise ValueError(f"Fecha con formato inesperado: {date!r}")
+    return int(date[0:4] + date[5:7] + date[8:10] + date[11:13] + date[14:16] + date[17:19])
+
+
+def _unpack_date(value: int) -> str:
+    digits = f"{value:014d}"
+    return f"{digits[0:4]}-{digits[4:6]}-{digits[6:8]} {digits[8:10]}:{digits[10:12]}:{digits[12:14]}"
+
+
+def encode_entry(record: dict) -> bytes:
+    name = record["player_name"].encode("utf-8")
+    if len(name) > _MAX_TEXT:
+        raise ValueError(f"Nombre demasiado largo para el formato binario ({len(name)} bytes)")
+    score, difficulty = int(record["score"]), int(record["difficulty"])
+    if not -2 ** 63 <= score < 2 ** 63:
+        raise ValueError(f"Score fuera de rango para el formato binario: {score}")
+    if not 0 <= difficulty <= 0xFF:
+        raise ValueError(f"Dificultad fuera de rango para el formato binario: {difficulty}")
+    return _ENTRY_HEAD.pack(score, difficulty, _pack_date(record["date"]), len(name)) + name
+
+
+def decode_entry(data: bytes, pos: int = 0, end: Optional[int] = None) -> dict:
+    score, difficulty, date, length = _ENTRY_HEAD.unpack_from(data, pos)
+    pos += _ENTRY_HEAD.size
+    return {
+        "player_name": data[pos:pos + length].decode("utf-8"),
+        "score": score,
+        "difficulty": difficulty,
+        "date": _unpack_date(date),
+    }
+
+
+_ENCODERS = {KIND_PLAYERS: encode_player, KIND_HALL_OF_FAME: encode_entry}
+_DECODERS = {KIND_PLAYERS: decode_player, KIND_HALL_OF_FAME: decode_entry}
+
+
+# ------------------------------- ARCHIVOS ---------------------------------
+def dumps(kind: int, records: Iterable[dict]) -> bytes:
+    encode = _ENCODERS[kind]
+    parts = [b""]
+    pack_length = _LENGTH.pack
+    count = 0
+    for record in records:
+        body = encode(record)
+        parts.append(pack_length(len(body)))
+        parts.append(body)
+        count += 1
+    parts[0] = _HEADER.pack(MAGIC, VERSION, kind, count)
+    return b"".join(parts)
+
+
+def loads(data: bytes) -> Tuple[int, List[dict]]:
+    """Retorna (tipo, registros) de un snapshot binario."""
+    if len(data) < _HEADER.size:
+        raise ValueError("Snapshot binario vacío o truncado")
+    magic, version, kind, count = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("No es un snapshot binario de GalactaTec")
+    if version > VERSION:
+        raise ValueError(f"Versión de snapshot no soportada: {version}")
+    decode = _DECODERS.get(kind)
+    if decode is None:
+        raise ValueError(f"Tipo de snapshot desconocido: {kind}")
+    records = []
+    pos = _HEADER.size
+    unpack_length = _LENGTH.unpack_from
+    try:
+        for _ in range(count):
+            (length,) = unpack_length(data, pos)
+            pos += _LENGTH.size
+            if pos + length > len(data):
+                raise ValueError("Snapshot binario truncado")
+            records.append(decode(data, pos, pos + length))
+            pos += length
+    except struct.error as exc:
+        raise ValueError("Snapshot binario truncado") from exc
+    return kind, records
+
+
+def write_snapshot(path: Path, kind: int, records: Iterable[dict]):
+    """Escribe el snapshot de forma atómica (temporal + fsync + rename)."""
+    path = Path(path)
+    path.parent.mkdir(exist_ok=True, parents=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(dumps(kind, records))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: Path) -> Tuple[int, List[dict]]:
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+# --------------------------- IMPORTAR / EXPORTAR ---------------------------
+def _records_from_json(kind: int, data) -> List[dict]:
+    if kind == KIND_PLAYERS:
+        # players.json es {id: jugador}
+        return list(data.values()) if isinstance(data, dict) else list(data)
+    return list(data)
+
+
+def _records_to_json(kind: int, records: List[dict]):
+    if kind == KIND_PLAYERS:
+        return {record["id"]: record for record in records}
+    from .hall_of_fame import HallOfFameEntry
+    return [HallOfFameEntry.from_dict(record).to_dict() for record in records]
+
+
+def import_json(json_path: Path, bin_path: Path, kind: str) -> int:
+    """Convierte players.json / hall_of_fame.json al formato binario. Retorna la cantidad."""
+    kind_id = KINDS[kind]
+    with open(json_path, "r", encoding="utf-8") as f:
+        records = _records_from_json(kind_id, json.load(f) or [])
+    write_snapshot(bin_path, kind_id, records)
+    return len(records)
+
+
+def export_json(bin_path: Path, json_path: Path) -> int:
+    """Convierte un snapshot binario al JSON de siempre. Retorna la cantidad."""
+    kind_id, records = read_snapshot(bin_path)
+    Path(json_path).parent.mkdir(exist_ok=True, parents=True)
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(_records_to_json(kind_id, records), f, indent=2, ensure_ascii=False)
+    return len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convierte datos entre JSON y el formato binario.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="JSON -> binario")
+    imp.add_argument("kind", choices=sorted(KINDS))
+    imp.add_argument("json_path")
+    imp.add_argument("bin_path")
+    exp = sub.add_parser("export", help="binario -> JSON")
+    exp.add_argument("bin_path")
+    exp.add_argument("json_path")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        count = import_json(args.json_path, args.bin_path, args.kind)
+        print(f"Importados {count} registros a {args.bin_path}")
+    else:
+        count = export_json(args.bin_path, args.json_path)
+        print(f"Exportados {count} registros a {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
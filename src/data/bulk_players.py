@@ -0,0 +1,218 @@
+"""Importación y exportación masiva de jugadores (CSV o JSONL).
+
+La importación lee el archivo por lotes sin cargarlo entero y, por cada lote:
+  1. valida formato y unicidad con Validator.validate_registrations (contra los
+     índices del repositorio y contra lo ya importado),
+  2. hashea las contraseñas en el pool de procesos del PasswordHasher,
+  3. añade los jugadores al repositorio con una sola escritura (add_players). Si
+     mientras tanto otro hilo o proceso registró alguno de esos alias o emails, esos
+     registros se rechazan y el resto del lote se guarda igual.
+Mientras el pool hashea un lote ya se lee y valida el siguiente. No se envían correos.
+
+Columnas: alias, full_name, email y password (o password_hash bcrypt ya calculado), más
+profile_picture, spaceship_image y favorite_music (en CSV, separadas por ";").
+La exportación escribe el mismo formato con password_hash.
+
+Uso (desde la raíz del proyecto):
+    python -m src.data.bulk_players import jugadores.csv [--players data/players.json]
+        [--rejects rechazados.jsonl] [--batch-size 2000]
+    python -m src.data.bulk_players export jugadores.jsonl [--players data/players.json]
+"""
+import argparse
+import csv
+import json
+import uuid
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..core.password_hasher import PasswordHasher, get_password_hasher
+from ..core.player import Player
+from ..core.validators import UniquenessValidator, Validator
+from .persistence import PlayerRepository
+from .storage import DuplicatePlayerError
+
+EXPORT_FIELDS = ["id", "alias", "full_name", "email", "password_hash",
+                 "profile_picture", "spaceship_image", "favorite_music"]
+
+
+def _detect_format(path: Path, fmt: Optional[str]) -> str:
+    fmt = fmt or Path(path).suffix.lstrip(".").lower()
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"Formato no soportado: {fmt!r} (use csv o jsonl)")
+    return fmt
+
+
+def read_records(path: Path, fmt: Optional[str] = None,
+                 rejected: Optional[Dict[int, dict]] = None) -> Iterator[Tuple[int, dict]]:
+    """Recorre el archivo retornando (línea, registro) sin cargarlo entero.
+
+    Una línea JSONL mal formada o que no es un objeto lanza ValueError; con rejected
+    se anota ahí ({línea: {"registro": [error]}}) y se sigue con la próxima.
+    """
+    fmt = _detect_format(path, fmt)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for record in reader:
+                music = record.get("favorite_music") or ""
+                record["favorite_music"] = [m.strip() for m in music.split(";") if m.strip()]
+                yield reader.line_num, record
+            return
+        for line_num, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError(f"Se esperaba un objeto JSON, no {type(record).__name__}")
+            except ValueError as e:
+                # JSONDecodeError también es ValueError
+                if rejected is None:
+                    raise ValueError(f"Línea {line_num}: {e}") from e
+                rejected[line_num] = {"registro": [f"Línea inválida: {e}"]}
+                continue
+            yield line_num, record
+
+
+def _batches(items: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_players(repo: PlayerRepository, path: Path, fmt: Optional[str] = None,
+                   batch_size: int = 2000, hasher: Optional[PasswordHasher] = None) -> dict:
+    """Importa los jugadores del archivo. Retorna {"imported", "rejected": {línea: errores}}."""
+    hasher = hasher or get_password_hasher()
+    summary = {"imported": 0, "rejected": {}}
+    # Claves ya aceptadas en esta importación: el lote anterior puede no estar
+    # guardado todavía cuando se valida el siguiente
+    seen_alias, seen_email = set(), set()
+    in_flight: Optional[List[Tuple[int, dict, Optional[Future]]]] = None
+
+    def commit(prepared: List[Tuple[int, dict, Optional[Future]]]):
+        players, lines = [], {}
+        for line_num, record, future in prepared:
+            data = {field: record.get(field) or "" for field in EXPORT_FIELDS}
+            data["id"] = str(uuid.uuid4())
+            data["favorite_music"] = record.get("favorite_music") or []
+            data["password_hash"] = future.result() if future is not None else record["password_hash"]
+            players.append(Player.from_dict(data))
+            lines[data["id"]] = line_num
+        while players:
+            try:
+                repo.add_players(players)
+                break
+            except ValueError as e:
+                conflicting = _conflicting(repo, players, e)
+                if not conflicting:
+                    raise
+                # Registrados por otro hilo o proceso después de validar el lote
+                for player in players:
+                    if player._id in conflicting:
+                        message = f"{e} (registrado durante la importación)."
+                        summary["rejected"][lines[player._id]] = {"registro": [message]}
+                players = [player for player in players if player._id not in conflicting]
+        summary["imported"] += len(players)
+
+    # Las líneas ilegibles se rechazan sin cortar la importación
+    for batch in _batches(read_records(path, fmt, summary["rejected"]), batch_size):
+        report = Validator.validate_registrations((record for _, record in batch),
+                                                 repo.uniqueness_validator)
+        prepared = []
+        for position, (line_num, record) in enumerate(batch):
+            errors = report.get(position, {})
+            alias_key = UniquenessValidator.normalize(record.get("alias"))
+            email_key = UniquenessValidator.normalize(record.get("email"))
+            if not errors and alias_key in seen_alias:
+                errors = {"alias": ["Alias ya importado en este archivo."]}
+            elif not errors and email_key in seen_email:
+                errors = {"email": ["Email ya importado en este archivo."]}
+            if errors:
+                summary["rejected"][line_num] = errors
+                continue
+            seen_alias.add(alias_key)
+            seen_email.add(email_key)
+            future = hasher.submit_hash(record["password"]) if record.get("password") else None
+            prepared.append((line_num, record, future))
+
+        # El lote anterior se guarda mientras el pool hashea este
+        if in_flight:
+            commit(in_flight)
+        in_flight = prepared
+    if in_flight:
+        commit(in_flight)
+    return summary
+
+
+def _conflicting(repo: PlayerRepository, players: List[Player], error: ValueError) -> set:
+    """Ids de los jugadores que chocan con jugadores ya registrados."""
+    if isinstance(error, DuplicatePlayerError):
+        return set(error.player_ids)
+    validator = repo.uniqueness_validator
+    return {player._id for player in players
+            if not validator.is_alias_unique(player.alias) or not validator.is_email_unique(player.email)}
+
+
+def export_players(repo: PlayerRepository, path: Path, fmt: Optional[str] = None) -> int:
+    """Escribe todos los jugadores en CSV o JSONL, uno por línea. Retorna la cantidad."""
+    fmt = _detect_format(path, fmt)
+    if repo.storage.indexed:
+        records = repo.storage.iter_players()
+    else:
+        records = repo.get_all_dict().values()
+    count = 0
+    Path(path).parent.mkdir(exist_ok=True, parents=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS, extrasaction="ignore") if fmt == "csv" else None
+        if writer:
+            writer.writeheader()
+        for record in records:
+            if writer:
+                row = dict(record)
+                row["favorite_music"] = ";".join(record.get("favorite_music") or [])
+                writer.writerow(row)
+            else:
+                f.write(json.dumps(dict(record), ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa o exporta jugadores en CSV/JSONL.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("import", "export"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("path")
+        cmd.add_argument("--format", choices=["csv", "jsonl"])
+        cmd.add_argument("--players", default="data/players.json")
+        cmd.add_argument("--journal", action="store_true", help="players.json en modo journal")
+    sub.choices["import"].add_argument("--batch-size", type=int, default=2000)
+    sub.choices["import"].add_argument("--rejects", help="JSONL con los registros rechazados")
+    args = parser.parse_args()
+
+    repo = PlayerRepository(args.players, journal=args.journal)
+    try:
+        if args.command == "export":
+            count = export_players(repo, args.path, args.format)
+            print(f"Exportados {count} jugadores a {args.path}")
+            return
+        summary = import_players(repo, args.path, args.format, args.batch_size)
+        print(f"Importados {summary['imported']} jugadores "
+              f"(rechazados: {len(summary['rejected'])})")
+        if args.rejects:
+            with open(args.rejects, "w", encoding="utf-8") as f:
+                for line_num, errors in summary["rejected"].items():
+                    f.write(json.dumps({"line": line_num, "errors": errors}, ensure_ascii=False) + "\n")
+    finally:
+        repo.close()
+
+
+if __name__ == "__main__":
+    main()
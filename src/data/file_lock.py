@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Lock advisory entre procesos sobre un archivo .lock.
+
+    Usa fcntl.flock en POSIX y msvcrt.locking en Windows. Es reentrante dentro del
+    mismo proceso (los hilos se serializan con un RLock) para que los métodos que ya
+    tienen el lock puedan llamarse entre sí.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._thread_lock = threading.RLock()
+        self._fd = None
+        self._depth = 0
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self.path.parent.mkdir(exist_ok=True, parents=True)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                self._lock_fd(self._fd)
+            except BaseException:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                self._unlock_fd(self._fd)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+        self._thread_lock.release()
+
+    @staticmethod
+    def _lock_fd(fd: int, blocking: bool = True) -> bool:
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            return True
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                # LK_LOCK se rinde tras ~10 s; se sigue esperando
+                time.sleep(0.05)
+
+    @staticmethod
+    def _unlock_fd(fd: int):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class OwnerLock:
+    """Lock de archivo de dueño único: se toma sin esperar al abrir un recurso y se
+    suelta al cerrarlo, desde cualquier hilo (a diferencia de FileLock, que es de la
+    sección crítica del hilo que lo tomó)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fd = None
+
+    def acquire(self) -> bool:
+        """Retorna False si otro proceso (u otra instancia) ya es dueño."""
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            locked = FileLock._lock_fd(fd, blocking=False)
+        except BaseException:
+            os.close(fd)
+            raise
+        if not locked:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        fd, self._fd = self._fd, None
+        try:
+            FileLock._unlock_fd(fd)
+        finally:
+            os.close(fd)
+
+
+def file_signature(path: Path):
+    """Firma barata para detectar cambios: (inodo, tamaño, mtime) o None si no existe."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
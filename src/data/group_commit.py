@@ -0,0 +1,201 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Iterable, List, Optional, Tuple
+
+from ..core.telemetry import get_logger, log_event
+
+logger = get_logger("data.group_commit")
+
+
+class GroupCommitter:
+    """Agrupa escrituras: las claves se marcan como sucias y se persisten juntas.
+
+    Un hilo de fondo llama a flush_fn con todas las claves pendientes cuando pasa
+    `delay` segundos desde la primera marca o cuando se acumulan `max_batch`.
+    mark_dirty() retorna un ticket; wait(ticket) bloquea hasta que ese cambio
+    esté persistido y future(ticket) da un Future para esperarlo sin ocupar un hilo.
+
+    Si flush_fn falla, las claves se reintentan con espera exponencial (retry_delay,
+    el doble cada vez, hasta max_retry_delay). Tras max_retries reintentos fallidos el
+    error llega solo a los tickets de ese lote; sus claves quedan pendientes y se
+    vuelven a intentar con la próxima marca, flush() o close().
+    """
+
+    # Lotes fallidos que se recuerdan para wait() sobre tickets ya resueltos
+    MAX_FAILURES_KEPT = 256
+
+    def __init__(self, flush_fn: Callable[[List[str]], None], delay: float = 0.05,
+                 max_batch: int = 256, max_retries: int = 5, retry_delay: float = 0.1,
+                 max_retry_delay: float = 10.0):
+        self._flush_fn = flush_fn
+        self.delay = delay
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()  # un flush a la vez, para que los tickets avancen en orden
+        self._dirty: "OrderedDict[str, None]" = OrderedDict()
+        self._marked_seq = 0    # último ticket entregado
+        self._flushed_seq = 0   # todos los tickets <= este están en disco o en _failures
+        # Lotes que agotaron los reintentos: (primer ticket, último ticket, error)
+        self._failures: Deque[Tuple[int, int, BaseException]] = deque(maxlen=self.MAX_FAILURES_KEPT)
+        self._attempts = 0      # fallos seguidos del lote actual
+        self._retry_at = 0.0    # antes de este instante (monotonic) no se reintenta
+        self._stalled = False   # agotó los reintentos: espera una marca nueva
+        self._closed = False
+        self._futures: List[Tuple[int, Future]] = []  # (ticket, future) sin resolver
+
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def mark_dirty(self, keys: Iterable[str]) -> int:
+        """Marca claves para el próximo flush. Retorna el ticket para wait()."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("GroupCommitter cerrado")
+            for key in keys:
+                self._dirty[key] = None
+            self._marked_seq += 1
+            self._stalled = False
+            self._cond.notify_all()
+            return self._marked_seq
+
+    def wait(self, ticket: int, timeout: Optional[float] = None) -> bool:
+        """Espera a que el ticket esté persistido. Retorna False si vence el timeout."""
+        with self._cond:
+            done = self._cond.wait_for(lambda: self._flushed_seq >= ticket, timeout)
+            error = self._failure(ticket) if done else None
+        if error is not None:
+            raise error
+        return done
+
+    def _failure(self, ticket: int) -> Optional[BaseException]:
+        # Requiere self._cond
+        for first, last, error in self._failures:
+            if first <= ticket <= last:
+                return error
+        return None
+
+    def future(self, ticket: int) -> Future:
+        """Future que se resuelve cuando el ticket está persistido, o con el error si
+        falla su lote (como wait()). En asyncio se espera con asyncio.wrap_future()."""
+        future = Future()
+        with self._cond:
+            if self._flushed_seq < ticket:
+                self._futures.append((ticket, future))
+                return future
+            error = self._failure(ticket)
+        self._resolve([(ticket, future)], error)
+        return future
+
+    def _take_futures(self, ticket: int) -> List[Tuple[int, Future]]:
+        # Requiere self._cond
+        done = [(t, f) for t, f in self._futures if t <= ticket]
+        self._futures = [(t, f) for t, f in self._futures if t > ticket]
+        return done
+
+    @staticmethod
+    def _resolve(futures: List[Tuple[int, Future]], error: Optional[BaseException] = None):
+        # Fuera del lock: los callbacks corren en este hilo. Los cancelados se saltan.
+        for _, future in futures:
+            if not future.set_running_or_notify_cancel():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+    def flush(self):
+        """Persiste ya todo lo pendiente (en el hilo que llama). Si falla lanza el error,
+        aunque el lote siga con reintentos en el hilo de fondo."""
+        with self._cond:
+            ticket = self._marked_seq
+        error = self._flush_batch()
+        if error is not None:
+            raise error
+        self.wait(ticket)
+
+    def _retry_pause(self) -> float:
+        # Requiere self._cond. Segundos que faltan para poder reintentar.
+        return self._retry_at - time.monotonic() if self._attempts else 0.0
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: (self._dirty and not self._stalled) or self._closed)
+                if self._closed:
+                    return
+                pause = self._retry_pause()
+                if pause > 0:
+                    # Espera exponencial tras un fallo; close() la corta
+                    self._cond.wait_for(lambda: self._closed, pause)
+                    continue
+                # Ventana de agrupación: espera más cambios salvo que el lote ya esté lleno
+                self._cond.wait_for(
+                    lambda: len(self._dirty) >= self.max_batch or self._closed, self.delay
+                )
+                if self._closed:
+                    return
+            self._flush_batch()
+
+    def _flush_batch(self, final: bool = False) -> Optional[BaseException]:
+        with self._flush_lock:
+            return self._flush_locked(final)
+
+    def _flush_locked(self, final: bool = False) -> Optional[BaseException]:
+        """Un intento de escribir todo lo pendiente. Retorna el error si falló.
+
+        final=True (al cerrar) no deja reintentos: un fallo llega a las esperas."""
+        with self._cond:
+            keys = list(self._dirty)
+            self._dirty.clear()
+            ticket = self._marked_seq
+        if keys:
+            try:
+                self._flush_fn(keys)
+            except Exception as e:
+                with self._cond:
+                    # Las claves siguen pendientes para el próximo intento
+                    for key in keys:
+                        self._dirty.setdefault(key, None)
+                    self._attempts += 1
+                    attempt = self._attempts
+                    retrying = attempt <= self.max_retries and not final
+                    if retrying:
+                        backoff = min(self.retry_delay * 2 ** (self._attempts - 1), self.max_retry_delay)
+                        self._retry_at = time.monotonic() + backoff
+                        futures = []
+                    else:
+                        # Sin más reintentos: el error es solo de los tickets de este lote
+                        self._failures.append((self._flushed_seq + 1, ticket, e))
+                        self._flushed_seq = ticket
+                        self._attempts = 0
+                        self._stalled = True
+                        futures = self._take_futures(ticket)
+                    self._cond.notify_all()
+                log_event(logger, logging.WARNING, "Falló la escritura agrupada", records=len(keys),
+                          error=str(e), attempt=attempt, retrying=retrying)
+                self._resolve(futures, e)
+                return e
+        with self._cond:
+            self._flushed_seq = max(self._flushed_seq, ticket)
+            self._attempts = 0
+            futures = self._take_futures(self._flushed_seq)
+            self._cond.notify_all()
+        self._resolve(futures)
+        return None
+
+    def close(self):
+        """Persiste lo pendiente y detiene el hilo de fondo."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join()
+        self._flush_batch(final=True)
@@ -1,8 +1,14 @@
 import json
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import TYPE_CHECKING, List, Optional, Dict
 from datetime import datetime
 
+from . import binary_snapshot
+from .ranking import BoundedRanking
+
+if TYPE_CHECKING:
+    from .leaderboard import LeaderboardEngine
+
 
 class HallOfFameEntry:
     """Representa una entrada en el Salón de la Fama"""
@@ -40,61 +46,128 @@ class HallOfFameEntry:
 
 
 class HallOfFameRepository:
-    """Gestiona la persistencia del Salón de la Fama"""
+    """Gestiona la persistencia del Salón de la Fama
+
+    Guarda solo las mejores max_entries entradas en un BoundedRanking: las
+    inserciones y consultas de posición son O(log K) y un score que no supera el
+    corte se descarta sin tocar el disco. Si se pasa un LeaderboardEngine, además
+    recibe todos los scores (historial completo y rankings por dificultad, por
+    jugador y por día/semana).
+    """
     
-    def __init__(self, file_path: str = "data/hall_of_fame.json"):
+    def __init__(self, file_path: Optional[str] = None, max_entries: int = 5,
+                 leaderboard: Optional["LeaderboardEngine"] = None, binary: bool = False):
         current_dir = Path(__file__).parent.parent.parent
+        if file_path is None:
+            file_path = "data/hall_of_fame.bin" if binary else "data/hall_of_fame.json"
         self._file_path = current_dir / file_path
-        self._entries: List[HallOfFameEntry] = []
+        self.max_entries = max_entries
+        self.leaderboard = leaderboard
+        # Con binary=True se guarda en el formato binario compacto (ver binary_snapshot)
+        self.binary = binary
+        self._ranking: BoundedRanking[HallOfFameEntry] = BoundedRanking(max_entries)
+        # Aumenta cada vez que cambia el ranking (para cachés de lectura)
+        self.version = 0
+        # El ranking en memoria tiene entradas que no se pudieron guardar (ver save())
+        self._unsaved = False
         self._load_entries()
     
     def _load_entries(self):
         """Carga las entradas desde el archivo JSON"""
-        if self._file_path.exists():
+        if self.binary and self._file_path.exists():
+            # Un archivo que no es un snapshot binario (p. ej. el JSON de siempre) no se
+            # toma como vacío: el próximo guardado lo reemplazaría.
+            kind, data = binary_snapshot.read_snapshot(self._file_path)
+            if kind != binary_snapshot.KIND_HALL_OF_FAME:
+                raise ValueError(f"{self._file_path} no es un snapshot del Salón de la Fama")
+            entries = [HallOfFameEntry.from_dict(entry) for entry in data]
+            self._ranking = BoundedRanking(self.max_entries, entries)
+        elif self._file_path.exists():
             try:
                 with open(self._file_path, "r", encoding="utf-8") as f:
                     data = json.load(f)
-                    self._entries = [HallOfFameEntry.from_dict(entry) for entry in data]
-                    self._entries.sort(key=lambda x: x.score, reverse=True)
-            except (json.JSONDecodeError, IOError):
-                self._entries = []
+                entries = [HallOfFameEntry.from_dict(entry) for entry in data]
+                self._ranking = BoundedRanking(self.max_entries, entries)
+            except (ValueError, IOError):
+                self._ranking = BoundedRanking(self.max_entries)
         else:
-            self._entries = []
+            self._ranking = BoundedRanking(self.max_entries)
     
     def _save_entries(self):
         """Guarda las entradas en el archivo JSON"""
+        if self.binary:
+            binary_snapshot.write_snapshot(self._file_path, binary_snapshot.KIND_HALL_OF_FAME,
+                                           (entry.to_dict() for entry in self._ranking.entries()))
+            return
         self._file_path.parent.mkdir(exist_ok=True, parents=True)
         with open(self._file_path, "w", encoding="utf-8") as f:
-            data = [entry.to_dict() for entry in self._entries]
+            data = [entry.to_dict() for entry in self._ranking.entries()]
             json.dump(data, f, indent=2, ensure_ascii=False)
     
     def add_entry(self, entry: HallOfFameEntry) -> bool:
         """
-        Añade una entrada y retorna True si entra en el top 5
+        Añade una entrada y retorna True si entra en el top (max_entries)
+        """
+        self._check_entries([entry])
+        if self.leaderboard is not None:
+            self.leaderboard.submit(entry)
+        if self._ranking.add(entry) is None:
+            # No supera el corte: nada que guardar
+            return False
+        self.version += 1
+        self._unsaved = True
+        self.save()
+        return True
+
+    def add_entries(self, entries: List[HallOfFameEntry]) -> List[bool]:
+        """Añade varias entradas con una sola escritura. Retorna, por entrada, si entró al top.
+
+        Si falla el leaderboard no se añade nada. Si falla el guardado del ranking las
+        entradas ya quedaron en él (unsaved es True): no se deben volver a añadir, solo
+        reintentar save().
         """
-        self._entries.append(entry)
-        self._entries.sort(key=lambda x: x.score, reverse=True)
-        
-        entered_top_5 = len(self._entries) <= 5 and self._entries.index(entry) < 5
-        
-        self._entries = self._entries[:5]
+        self._check_entries(entries)
+        if self.leaderboard is not None:
+            self.leaderboard.submit_many(entries)
+        placed = [self._ranking.add(entry) is not None for entry in entries]
+        if any(placed):
+            self.version += 1
+            self._unsaved = True
+            self.save()
+        return placed
+
+    @property
+    def unsaved(self) -> bool:
+        """True si el último guardado falló y el archivo está atrasado respecto al ranking."""
+        return self._unsaved
+
+    def save(self):
+        """Guarda el ranking en memoria (p. ej. para reintentar un guardado que falló)."""
         self._save_entries()
-        
-        return entered_top_5
+        self._unsaved = False
+
+    def _check_entries(self, entries: List[HallOfFameEntry]):
+        """Lanza ValueError si alguna entrada no se puede guardar, antes de tocar el ranking."""
+        if self.binary:
+            for entry in entries:
+                binary_snapshot.encode_entry(entry.to_dict())
+
+    def get_top(self, limit: Optional[int] = None) -> List[HallOfFameEntry]:
+        """Retorna las mejores entradas (todas las guardadas si no se indica limit)"""
+        return list(self._ranking.entries()[:limit])
     
     def get_top_5(self) -> List[HallOfFameEntry]:
         """Retorna las mejores 5 entradas"""
-        return self._entries[:5]
+        return self.get_top(5)
+
+    def get_cutoff_score(self) -> Optional[int]:
+        """Score mínimo para entrar al ranking, o None si todavía hay lugar"""
+        return self._ranking.cutoff()
     
     def get_rank_for_score(self, score: int) -> Optional[int]:
-        """Retorna la posición que tendría un score en el ranking (1-5) o None si no entra"""
-        for idx, entry in enumerate(self.get_top_5()):
-            if score > entry.score:
-                return idx + 1
-        if len(self.get_top_5()) < 5:
-            return len(self.get_top_5()) + 1
-        return None
+        """Retorna la posición que tendría un score en el ranking (1-max_entries) o None si no entra"""
+        return self._ranking.rank_for_score(score)
     
     def is_top_5(self, score: int) -> bool:
-        """Verifica si un score entraría en el top 5"""
+        """Verifica si un score entraría en el ranking"""
         return self.get_rank_for_score(score) is not None
@@ -0,0 +1,307 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from ..core.telemetry import get_logger, log_event
+from .file_lock import FileLock, file_signature
+
+logger = get_logger("data.journal")
+
+# Operación del journal: ("put", clave, registro) o ("del", clave, None)
+JournalOp = Tuple[str, str, Optional[dict]]
+
+# Aviso de cambios hechos por otro proceso: (completo, registros). Si completo es True,
+# registros es el estado entero; si no, son cambios sueltos (None = registro borrado).
+ChangeListener = Callable[[bool, Dict[str, Optional[dict]]], None]
+
+
+class JournalStore:
+    """Snapshot JSON + log append-only de operaciones (una línea JSON por operación).
+
+    Cada escritura añade solo las operaciones nuevas al log y hace fsync, en vez de
+    reescribir el archivo completo. La compactación vuelca el estado actual a un
+    snapshot nuevo (escritura a temporal + fsync + rename atómico) y descarta el log.
+    Al arrancar se reconstruye el estado leyendo el snapshot y reproduciendo el log.
+
+    Con list_key el snapshot se guarda como lista de registros (como pending_players.json)
+    y la clave de cada registro se toma de ese campo.
+
+    Varios procesos pueden compartir los mismos archivos: las escrituras se hacen con
+    un lock de archivo (<snapshot>.lock) y cada proceso recuerda hasta qué byte del log
+    leyó. poll() solo hace stat() mientras nadie más escriba; si otro proceso añadió
+    operaciones se leen únicamente esas líneas, y si compactó se recarga todo. Los
+    cambios ajenos se entregan a on_changes.
+    """
+
+    def __init__(self, snapshot_path: Path, compact_threshold: int = 1000,
+                 fsync: bool = True, background_compaction: bool = True,
+                 list_key: Optional[str] = None, on_changes: Optional[ChangeListener] = None):
+        self.snapshot_path = Path(snapshot_path)
+        self.list_key = list_key
+        self.log_path = self.snapshot_path.with_name(self.snapshot_path.name + ".log")
+        # Log que se está compactando; si existe al arrancar, la compactación no terminó
+        self.rotated_log_path = self.snapshot_path.with_name(self.snapshot_path.name + ".log.1")
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self.background_compaction = background_compaction
+        self.on_changes = on_changes
+
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()  # una compactación a la vez
+        # Entre procesos: escrituras y compactaciones
+        self._file_lock = FileLock(self.snapshot_path.with_name(self.snapshot_path.name + ".lock"))
+        self._compact_file_lock = FileLock(self.snapshot_path.with_name(self.snapshot_path.name + ".compact.lock"))
+        self._log_file = None
+        self._log_ops = 0
+        self._compacting = False
+        self._compaction_thread: Optional[threading.Thread] = None
+
+        # Lo último que este proceso vio en disco
+        self._snapshot_sig = None
+        self._log_ino: Optional[int] = None
+        self._log_offset = 0
+
+    @property
+    def lock(self) -> threading.RLock:
+        """Lock de escritura; quien guarde estado propio junto al journal debe usar este
+        mismo lock para no invertir el orden de bloqueo con la compactación."""
+        return self._lock
+
+    # ------------------------------ LECTURA -------------------------------
+    def load(self) -> Dict[str, dict]:
+        """Reconstruye el estado: snapshot + log pendiente de compactar + log actual."""
+        with self._lock, self._file_lock:
+            return self._read_state()
+
+    def read_only_load(self) -> Dict[str, dict]:
+        """Como load(), pero sin tocar los archivos: no toma el lock de archivo (que crea
+        el .lock) ni recorta una cola rota del log, que solo se ignora. Para herramientas
+        que leen datos de otro proceso detenido (p. ej. la migración a SQLite)."""
+        with self._lock:
+            return self._read_state(truncate_torn=False)
+
+    def _read_state(self, truncate_torn: bool = True) -> Dict[str, dict]:
+        state: Dict[str, dict] = {}
+        self._snapshot_sig = file_signature(self.snapshot_path)
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                try:
+                    state = self._from_snapshot(json.load(f))
+                except json.JSONDecodeError:
+                    log_event(logger, logging.WARNING, f"Snapshot {self.snapshot_path.name} vacío o mal formado.",
+                              path=str(self.snapshot_path))
+                    state = {}
+        self._replay(self.rotated_log_path, state)
+        self._log_ops, self._log_offset = self._replay(self.log_path, state, truncate_torn=truncate_torn)
+        log_sig = file_signature(self.log_path)
+        self._log_ino = log_sig[0] if log_sig else None
+        return state
+
+    def _from_snapshot(self, data) -> Dict[str, dict]:
+        if isinstance(data, list):
+            key = self.list_key or "id"
+            return {record[key]: record for record in data if record.get(key)}
+        return data or {}
+
+    def _to_snapshot(self, state: Dict[str, dict]):
+        return list(state.values()) if self.list_key else state
+
+    def _replay(self, path: Path, state: Dict[str, Optional[dict]], start: int = 0,
+                truncate_torn: bool = False, keep_deletes: bool = False) -> Tuple[int, int]:
+        """Aplica las operaciones de un log (desde el byte start) sobre state.
+
+        Retorna (operaciones aplicadas, byte hasta el que se leyó). Con keep_deletes
+        los borrados quedan como None en state en lugar de quitar la clave.
+        """
+        if not path.exists():
+            return 0, 0
+        with open(path, "rb") as f:
+            f.seek(start)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data) and truncate_torn:
+            # Cola sin salto de línea: una caída a mitad de escritura (las escrituras
+            # completas se hacen con el lock). Se recorta para no pegarle la siguiente.
+            with open(path, "r+b") as f:
+                f.truncate(start + end)
+        applied = 0
+        for line in data[:end].splitlines():
+            try:
+                op = json.loads(line)
+            except json.JSONDecodeError:
+                # Línea truncada por una caída a mitad de escritura: se ignora
+                continue
+            if op.get("op") == "put":
+                state[op["id"]] = op["data"]
+            elif op.get("op") == "del":
+                if keep_deletes:
+                    state[op["id"]] = None
+                else:
+                    state.pop(op["id"], None)
+            applied += 1
+        return applied, start + end
+
+    # ------------------------- CAMBIOS DE OTROS ---------------------------
+    def _changed_on_disk(self) -> bool:
+        if file_signature(self.snapshot_path) != self._snapshot_sig:
+            return True
+        log_sig = file_signature(self.log_path)
+        if log_sig is None:
+            return self._log_ino is not None
+        return log_sig[0] != self._log_ino or log_sig[1] != self._log_offset
+
+    def poll(self) -> bool:
+        """Incorpora lo que otros procesos escribieron. Retorna True si había cambios."""
+        if not self._changed_on_disk():
+            return False
+        with self._lock, self._file_lock:
+            return self._catch_up()
+
+    def _catch_up(self) -> bool:
+        # Requiere self._lock y el lock de archivo
+        if not self._changed_on_disk():
+            return False
+        log_sig = file_signature(self.log_path)
+        rotated = (file_signature(self.snapshot_path) != self._snapshot_sig
+                   or (self._log_ino is not None and (log_sig is None or log_sig[0] != self._log_ino)))
+        if rotated:
+            # Otro proceso compactó: se recarga todo
+            self._close_log()
+            state = self._read_state()
+            if self.on_changes:
+                self.on_changes(True, state)
+            return True
+
+        changes: Dict[str, Optional[dict]] = {}
+        applied, self._log_offset = self._replay(self.log_path, changes, self._log_offset, keep_deletes=True)
+        self._log_ino = log_sig[0]
+        self._log_ops += applied
+        if changes and self.on_changes:
+            self.on_changes(False, changes)
+        return bool(changes)
+
+    # ------------------------------ ESCRITURA -----------------------------
+    def append(self, ops: Iterable[JournalOp], before_write: Optional[Callable[[], None]] = None):
+        """Añade operaciones al log con una sola escritura y un fsync.
+
+        before_write corre con los locks tomados y el estado al día con lo de otros
+        procesos; si lanza, no se escribe nada.
+        """
+        lines = []
+        for kind, key, data in ops:
+            entry = {"op": kind, "id": key}
+            if kind == "put":
+                entry["data"] = data
+            lines.append(json.dumps(entry, ensure_ascii=False, separators=(",", ":")))
+        if not lines:
+            return
+        payload = ("\n".join(lines) + "\n").encode("utf-8")
+        with self._lock, self._file_lock:
+            # Primero lo que hayan escrito otros procesos, para no saltárselo
+            self._catch_up()
+            if before_write is not None:
+                before_write()
+            f = self._open_log()
+            f.write(payload)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+            self._log_offset = f.tell()
+            self._log_ino = os.fstat(f.fileno()).st_ino
+            self._log_ops += len(lines)
+
+    def _open_log(self):
+        if self._log_file is not None:
+            # Si otro proceso rotó el log, el descriptor apunta al archivo viejo
+            current = file_signature(self.log_path)
+            if current is None or current[0] != os.fstat(self._log_file.fileno()).st_ino:
+                self._close_log()
+        if self._log_file is None:
+            self.log_path.parent.mkdir(exist_ok=True, parents=True)
+            self._log_file = open(self.log_path, "ab")
+        return self._log_file
+
+    def _close_log(self):
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+
+    # ---------------------------- COMPACTACIÓN ----------------------------
+    def needs_compaction(self) -> bool:
+        return self._log_ops >= self.compact_threshold
+
+    def maybe_compact(self, state_provider: Callable[[], Dict[str, dict]]):
+        """Lanza una compactación si el log superó el umbral (en segundo plano si está activo)."""
+        if not self.needs_compaction() or self._compacting:
+            return
+        if self.background_compaction:
+            self._compacting = True
+            self._compaction_thread = threading.Thread(
+                target=self.compact, args=(state_provider,), daemon=True
+            )
+            self._compaction_thread.start()
+        else:
+            self.compact(state_provider)
+
+    def compact(self, state_provider: Callable[[], Dict[str, dict]]):
+        """Vuelca el estado a un snapshot nuevo y descarta el log ya incluido en él."""
+        try:
+            with self._compact_lock, self._compact_file_lock:
+                with self._lock, self._file_lock:
+                    # Se rota el log y se captura el estado juntos: todo lo que esté en el
+                    # log rotado ya está reflejado en el estado capturado (incluido lo
+                    # escrito por otros procesos, que se incorpora antes).
+                    self._catch_up()
+                    self._close_log()
+                    if self.log_path.exists():
+                        self._merge_into_rotated_log()
+                    state = state_provider()
+                    self._log_ops = 0
+                    self._log_ino = None
+                    self._log_offset = 0
+
+                tmp_path = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self._to_snapshot(state), f, ensure_ascii=False, separators=(",", ":"))
+                    f.flush()
+                    if self.fsync:
+                        os.fsync(f.fileno())
+
+                with self._lock, self._file_lock:
+                    os.replace(tmp_path, self.snapshot_path)
+                    self._fsync_dir()
+                    self._snapshot_sig = file_signature(self.snapshot_path)
+                    if self.rotated_log_path.exists():
+                        self.rotated_log_path.unlink()
+        finally:
+            self._compacting = False
+
+    def _merge_into_rotated_log(self):
+        # Si quedó un log rotado de una compactación interrumpida, el log actual se
+        # le concatena para no perder su orden al reproducirlos.
+        if self.rotated_log_path.exists():
+            with open(self.rotated_log_path, "ab") as dst, open(self.log_path, "rb") as src:
+                dst.write(src.read())
+            self.log_path.unlink()
+        else:
+            os.replace(self.log_path, self.rotated_log_path)
+
+    def _fsync_dir(self):
+        if not self.fsync or not hasattr(os, "O_DIRECTORY"):
+            return
+        fd = os.open(self.snapshot_path.parent, os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def close(self):
+        """Espera a la compactación en curso y cierra el log."""
+        thread = self._compaction_thread
+        if thread is not None and thread.is_alive():
+            thread.join()
+        with self._lock:
+            self._close_log()
@@ -0,0 +1,230 @@
+import json
+import logging
+import mmap
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ..core.telemetry import log_event
+from ..core.validators import UniquenessValidator
+from .file_lock import file_signature
+from .prefix_index import PrefixIndex
+from .storage import IndexedPlayerStorage, JsonPlayerStorage, SnapshotProvider, logger
+
+_WHITESPACE = re.compile(rb"[ \t\r\n]*")
+_DECODER = json.JSONDecoder()
+
+
+class LazyJsonPlayerStorage(JsonPlayerStorage, IndexedPlayerStorage):
+    """players.json leído bajo demanda a través de un mmap.
+
+    Al abrir se recorre el archivo una sola vez para guardar, por jugador, el
+    desplazamiento y largo de su registro, los índices alias/email -> id y un
+    PrefixIndex de alias y nombres para search_prefix(); los registros no se
+    conservan. get_player() decodifica solo el trozo pedido.
+
+    Los jugadores guardados quedan en una capa en memoria y el archivo se reescribe
+    copiando los trozos sin cambios tal cual (sin volver a parsearlos). Conviene
+    usarlo junto con la escritura agrupada (commit_delay) para reescribir por lotes.
+
+    Si otro proceso reescribió players.json, se vuelve a indexar antes de leer en
+    poll_changes() o antes de escribir, con el lock de archivo tomado.
+    """
+
+    def __init__(self, players_path: Path, pending_path: Path,
+                 pending_ttl: Optional[float] = 24 * 3600):
+        super().__init__(players_path, pending_path, pending_ttl)
+        self._lock = threading.RLock()
+        self._file = None
+        self._mm: Optional[mmap.mmap] = None
+        self._offsets: Dict[str, Tuple[int, int]] = {}  # id -> (inicio, largo) en bytes
+        self._alias_index: Dict[str, str] = {}
+        self._email_index: Dict[str, str] = {}
+        self._prefix_index = PrefixIndex()
+        self._open()
+
+    # ------------------------------- ÍNDICE -------------------------------
+    def _open(self):
+        with self._lock, self._file_lock:
+            self._open_locked()
+
+    def _open_locked(self):
+        self._close_map()
+        self._offsets, self._alias_index, self._email_index = {}, {}, {}
+        self._prefix_index.clear()
+        self._signature = file_signature(self.players_path)
+        if not self.players_path.exists() or self.players_path.stat().st_size == 0:
+            return
+        self._file = open(self.players_path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            # El índice de prefijos se ordena una sola vez al final del recorrido
+            with self._prefix_index.bulk():
+                self._scan()
+        except ValueError:
+            log_event(logger, logging.WARNING, "Archivo players.json vacío o mal formado. "
+                      "Inicializando sin jugadores.", path=str(self.players_path))
+            self._close_map()
+            self._offsets, self._alias_index, self._email_index = {}, {}, {}
+            self._prefix_index.clear()
+
+    def _close_map(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _skip_ws(self, pos: int) -> int:
+        return _WHITESPACE.match(self._mm, pos).end()
+
+    def _expect(self, pos: int, char: bytes) -> int:
+        if self._mm[pos:pos + 1] != char:
+            raise ValueError(f"Se esperaba {char!r} en la posición {pos}")
+        return pos + 1
+
+    def _decode_at(self, pos: int):
+        """Decodifica el valor JSON que empieza en pos. Retorna (valor, posición final)."""
+        window = 4096
+        size = len(self._mm)
+        while True:
+            # 'ignore' solo puede cortar un carácter multibyte al final de la ventana
+            text = self._mm[pos:pos + window].decode("utf-8", "ignore")
+            try:
+                value, end = _DECODER.raw_decode(text)
+            except json.JSONDecodeError:
+                if pos + window >= size:
+                    raise
+                window *= 4
+                continue
+            return value, pos + len(text[:end].encode("utf-8"))
+
+    def _scan(self):
+        """Recorre {"id": {...}, ...} una vez guardando desplazamientos e índices."""
+        pos = self._expect(self._skip_ws(0), b"{")
+        pos = self._skip_ws(pos)
+        if self._mm[pos:pos + 1] == b"}":
+            return
+        while True:
+            key, pos = self._decode_at(pos)
+            pos = self._skip_ws(self._expect(self._skip_ws(pos), b":"))
+            record, end = self._decode_at(pos)
+            self._offsets[key] = (pos, end - pos)
+            self._index(key, record)
+            pos = self._skip_ws(end)
+            if self._mm[pos:pos + 1] == b",":
+                pos = self._skip_ws(pos + 1)
+                continue
+            self._expect(pos, b"}")
+            return
+
+    def _index(self, player_id: str, record: dict):
+        self._alias_index[UniquenessValidator.normalize(record.get("alias"))] = player_id
+        self._email_index[UniquenessValidator.normalize(record.get("email"))] = player_id
+        # Reemplaza los términos anteriores del jugador
+        self._prefix_index.update(player_id, record.get("alias"), record.get("full_name"))
+
+    def _unindex(self, player_id: str, record: dict):
+        alias_key = UniquenessValidator.normalize(record.get("alias"))
+        email_key = UniquenessValidator.normalize(record.get("email"))
+        if self._alias_index.get(alias_key) == player_id:
+            del self._alias_index[alias_key]
+        if self._email_index.get(email_key) == player_id:
+            del self._email_index[email_key]
+
+    # ----------------------------- JUGADORES ------------------------------
+    def get_player(self, player_id: str) -> Optional[dict]:
+        with self._lock:
+            location = self._offsets.get(player_id)
+            if location is None:
+                return None
+            start, length = location
+            return json.loads(self._mm[start:start + length])
+
+    def find_alias_owner(self, alias_key: str) -> Optional[str]:
+        return self._alias_index.get(alias_key)
+
+    def find_email_owner(self, email_key: str) -> Optional[str]:
+        return self._email_index.get(email_key)
+
+    def search_prefix(self, prefix: str, limit: int, offset: int = 0) -> List[str]:
+        return self._prefix_index.search(prefix, limit, offset)
+
+    def iter_players(self) -> Iterator[dict]:
+        for player_id in list(self._offsets):
+            record = self.get_player(player_id)
+            if record is not None:
+                yield record
+
+    def load_players(self) -> Dict[str, dict]:
+        return {record["id"]: record for record in self.iter_players()}
+
+    def count_players(self) -> int:
+        return len(self._offsets)
+
+    def poll_changes(self) -> bool:
+        if file_signature(self.players_path) == self._signature:
+            return False
+        with self._lock, self._file_lock:
+            if file_signature(self.players_path) == self._signature:
+                return False
+            self._open_locked()
+        # Los jugadores hidratados pueden estar desactualizados
+        self._notify(True, {})
+        return True
+
+    def save_players(self, changed: List[dict], snapshot: SnapshotProvider):
+        """Reescribe players.json copiando los registros sin cambios y poniendo los nuevos."""
+        if not changed:
+            return
+        with self._lock, self._file_lock:
+            self.poll_changes()
+            self._check_write(changed)
+            updates = {record["id"]: record for record in changed}
+            for player_id, record in updates.items():
+                old = self.get_player(player_id)
+                if old is not None:
+                    self._unindex(player_id, old)
+            self._rewrite(updates)
+            for player_id, record in updates.items():
+                self._index(player_id, record)
+
+    def _rewrite(self, updates: Dict[str, dict]):
+        self.players_path.parent.mkdir(exist_ok=True, parents=True)
+        tmp_path = self.players_path.with_name(self.players_path.name + ".tmp")
+        new_offsets: Dict[str, Tuple[int, int]] = {}
+        pending = dict(updates)
+
+        with open(tmp_path, "wb") as out:
+            written = out.write(b"{")
+            first = True
+            order = list(self._offsets) + [pid for pid in updates if pid not in self._offsets]
+            for player_id in order:
+                if player_id in pending:
+                    body = json.dumps(pending.pop(player_id), ensure_ascii=False).encode("utf-8")
+                else:
+                    start, length = self._offsets[player_id]
+                    body = self._mm[start:start + length]
+                prefix = ("\n  " if first else ",\n  ") + json.dumps(player_id, ensure_ascii=False) + ": "
+                written += out.write(prefix.encode("utf-8"))
+                new_offsets[player_id] = (written, len(body))
+                written += out.write(body)
+                first = False
+            out.write(b"\n}")
+            out.flush()
+            os.fsync(out.fileno())
+
+        self._close_map()
+        os.replace(tmp_path, self.players_path)
+        self._file = open(self.players_path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = new_offsets
+        self._signature = file_signature(self.players_path)
+
+    def close(self):
+        super().close()
+        with self._lock:
+            self._close_map()
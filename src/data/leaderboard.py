@@ -0,0 +1,213 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..core.validators import UniquenessValidator
+from .hall_of_fame import HallOfFameEntry
+from .ranking import BoundedRanking
+
+# Clave de un ranking: ("global",), ("difficulty", 1), ("daily", "2025-11-14"), ...
+BoardKey = Tuple
+
+
+class LeaderboardEngine:
+    """Rankings sobre el historial completo de scores, mantenidos de forma incremental.
+
+    Cada score se añade a un log append-only (una línea JSON por partida) y actualiza
+    en O(log K) los rankings acotados a los que pertenece:
+
+    - global y por dificultad (RECLUTA / SARGENTO / COMANDANTE),
+    - mejor score de cada jugador (un solo puesto por jugador),
+    - diario y semanal (semana ISO), uno por periodo.
+
+    Las consultas leen esos rankings ya calculados, sin recorrer el historial. Al
+    cambiar de día o semana simplemente se empieza un ranking vacío para el periodo
+    nuevo; de los anteriores se conservan los últimos daily_retention/weekly_retention.
+    El historial solo se reproduce al arrancar.
+    """
+
+    def __init__(self, file_path: str = "data/score_history.jsonl", board_size: int = 10,
+                 daily_retention: int = 14, weekly_retention: int = 8, fsync: bool = True,
+                 clock: Callable[[], datetime] = datetime.now):
+        current_dir = Path(__file__).parent.parent.parent
+        self._file_path = current_dir / file_path
+        self.board_size = board_size
+        self.daily_retention = daily_retention
+        self.weekly_retention = weekly_retention
+        self.fsync = fsync
+        self._clock = clock
+
+        self._lock = threading.RLock()
+        self._boards: Dict[BoardKey, BoundedRanking[HallOfFameEntry]] = {}
+        self._player_best: Dict[str, HallOfFameEntry] = {}
+        # Periodos con ranking propio, en el orden en que aparecieron
+        self._periods: Dict[str, "OrderedDict[str, None]"] = {"daily": OrderedDict(), "weekly": OrderedDict()}
+        self._total_scores = 0
+        self._log_file = None
+        self._load_history()
+
+    # ------------------------------ HISTORIAL -----------------------------
+    def _load_history(self):
+        """Reconstruye los rankings reproduciendo el historial."""
+        if not self._file_path.exists():
+            return
+        with open(self._file_path, "rb") as f:
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            # Última línea a medias por una caída: se recorta
+            with open(self._file_path, "r+b") as f:
+                f.truncate(end)
+        for line in data[:end].splitlines():
+            try:
+                entry = HallOfFameEntry.from_dict(json.loads(line))
+            except (json.JSONDecodeError, KeyError):
+                continue
+            self._apply(entry)
+
+    def _append(self, entries: List[HallOfFameEntry]):
+        if self._log_file is None:
+            self._file_path.parent.mkdir(exist_ok=True, parents=True)
+            self._log_file = open(self._file_path, "ab")
+        lines = "".join(json.dumps(entry.to_dict(), ensure_ascii=False, separators=(",", ":")) + "\n"
+                        for entry in entries)
+        self._log_file.write(lines.encode("utf-8"))
+        self._log_file.flush()
+        if self.fsync:
+            os.fsync(self._log_file.fileno())
+
+    # ------------------------------ PERIODOS ------------------------------
+    @staticmethod
+    def day_key(moment: datetime) -> str:
+        return moment.strftime("%Y-%m-%d")
+
+    @staticmethod
+    def week_key(moment: datetime) -> str:
+        year, week, _ = moment.isocalendar()
+        return f"{year}-W{week:02d}"
+
+    @staticmethod
+    def _entry_moment(entry: HallOfFameEntry) -> Optional[datetime]:
+        try:
+            return datetime.strptime(entry.date, "%Y-%m-%d %H:%M:%S")
+        except (TypeError, ValueError):
+            return None
+
+    def _period_board(self, kind: str, period: str) -> Optional[BoundedRanking[HallOfFameEntry]]:
+        """Ranking del periodo; se crea al verlo por primera vez y se descartan los viejos."""
+        key = (kind, period)
+        board = self._boards.get(key)
+        if board is not None:
+            return board
+        periods = self._periods[kind]
+        retention = self.daily_retention if kind == "daily" else self.weekly_retention
+        if len(periods) >= retention and period < min(periods):
+            # Un score atrasado de un periodo que ya no se conserva
+            return None
+        board = self._boards[key] = BoundedRanking(self.board_size)
+        periods[period] = None
+        while len(periods) > retention:
+            oldest = min(periods)
+            del periods[oldest]
+            del self._boards[(kind, oldest)]
+        return board
+
+    # ------------------------------ ESCRITURA -----------------------------
+    def submit(self, entry: HallOfFameEntry) -> Dict[BoardKey, int]:
+        """Registra un score. Retorna los rankings en los que entró y su posición (1-based)."""
+        with self._lock:
+            self._append([entry])
+            return self._apply(entry)
+
+    def submit_many(self, entries: List[HallOfFameEntry]) -> List[Dict[BoardKey, int]]:
+        """Registra varios scores con una sola escritura (y un fsync) del historial."""
+        if not entries:
+            return []
+        with self._lock:
+            self._append(entries)
+            return [self._apply(entry) for entry in entries]
+
+    def _apply(self, entry: HallOfFameEntry) -> Dict[BoardKey, int]:
+        self._total_scores += 1
+        placed: Dict[BoardKey, int] = {}
+
+        boards = [("global",), ("difficulty", entry.difficulty)]
+        for key in boards:
+            board = self._boards.get(key)
+            if board is None:
+                board = self._boards[key] = BoundedRanking(self.board_size)
+            self._place(board, key, entry, placed)
+
+        moment = self._entry_moment(entry)
+        if moment is not None:
+            for kind, period in (("daily", self.day_key(moment)), ("weekly", self.week_key(moment))):
+                board = self._period_board(kind, period)
+                if board is not None:
+                    self._place(board, (kind, period), entry, placed)
+
+        player_key = UniquenessValidator.normalize(entry.player_name)
+        best = self._player_best.get(player_key)
+        if best is None or entry.score > best.score:
+            self._player_best[player_key] = entry
+            board = self._boards.get(("players",))
+            if board is None:
+                board = self._boards[("players",)] = BoundedRanking(self.board_size)
+            if best is not None:
+                # El jugador sube: su puesto anterior se reemplaza por el nuevo
+                board.remove(best)
+            self._place(board, ("players",), entry, placed)
+        return placed
+
+    @staticmethod
+    def _place(board: BoundedRanking, key: BoardKey, entry: HallOfFameEntry, placed: Dict[BoardKey, int]):
+        position = board.add(entry)
+        if position is not None:
+            placed[key] = position + 1
+
+    # ------------------------------- LECTURA ------------------------------
+    def get_board(self, key: BoardKey) -> Tuple[HallOfFameEntry, ...]:
+        """Ranking ya calculado para la clave (vacío si no hay scores)."""
+        board = self._boards.get(key)
+        return board.entries() if board is not None else ()
+
+    def top_global(self) -> Tuple[HallOfFameEntry, ...]:
+        return self.get_board(("global",))
+
+    def top_by_difficulty(self, difficulty: int) -> Tuple[HallOfFameEntry, ...]:
+        return self.get_board(("difficulty", difficulty))
+
+    def top_players(self) -> Tuple[HallOfFameEntry, ...]:
+        """Mejor score de cada jugador, un puesto por jugador."""
+        return self.get_board(("players",))
+
+    def top_daily(self, day: Optional[str] = None) -> Tuple[HallOfFameEntry, ...]:
+        """Ranking del día (YYYY-MM-DD); por defecto, el de hoy."""
+        return self.get_board(("daily", day or self.day_key(self._clock())))
+
+    def top_weekly(self, week: Optional[str] = None) -> Tuple[HallOfFameEntry, ...]:
+        """Ranking de la semana ISO (YYYY-Www); por defecto, la actual."""
+        return self.get_board(("weekly", week or self.week_key(self._clock())))
+
+    def get_player_best(self, player_name: str) -> Optional[HallOfFameEntry]:
+        return self._player_best.get(UniquenessValidator.normalize(player_name))
+
+    def get_rank_for_score(self, key: BoardKey, score: int) -> Optional[int]:
+        """Posición (1-based) que tendría un score en el ranking, o None si no entra."""
+        board = self._boards.get(key)
+        if board is None:
+            return 1 if self.board_size > 0 else None
+        return board.rank_for_score(score)
+
+    @property
+    def total_scores(self) -> int:
+        return self._total_scores
+
+    def close(self):
+        with self._lock:
+            if self._log_file is not None:
+                self._log_file.close()
+                self._log_file = None
@@ -0,0 +1,81 @@
+"""Migración única de players.json y pending_players.json a una base SQLite.
+
+Los archivos de origen solo se leen (no se crean .lock ni se recortan logs), así que
+conviene detener antes el servidor y el juego para copiar un estado consistente.
+
+Uso (desde la raíz del proyecto):
+    python -m src.data.migrate_to_sqlite [--players data/players.json]
+        [--pending data/pending_players.json] [--db data/players.db]
+"""
+import argparse
+import logging
+from pathlib import Path
+
+from ..core.telemetry import configure_logging, get_logger, log_event
+from ..core.validators import UniquenessValidator
+from .journal import JournalStore
+from .sqlite_storage import SQLitePlayerStorage
+
+logger = get_logger("data.migrate_to_sqlite")
+
+
+def migrate(players_path="data/players.json", pending_path="data/pending_players.json",
+            db_path="data/players.db", batch_size: int = 5000) -> dict:
+    """Copia jugadores y pendientes a SQLite. Retorna un resumen con los contadores."""
+    current_dir = Path(__file__).parent.parent.parent
+    # Incluye un posible players.json.log del modo journal, sin modificar los archivos
+    players = JournalStore(current_dir / players_path).read_only_load()
+    pending = JournalStore(current_dir / pending_path, list_key="token").read_only_load()
+    target = SQLitePlayerStorage(db_path)
+
+    summary = {"players": 0, "pending": 0, "skipped_players": 0}
+    seen_alias, seen_email = set(), set()
+    batch = []
+
+    def flush():
+        target.save_players(batch, dict)
+        summary["players"] += len(batch)
+        batch.clear()
+
+    try:
+        for record in players.values():
+            alias_key = UniquenessValidator.normalize(record.get("alias"))
+            email_key = UniquenessValidator.normalize(record.get("email"))
+            # Los índices únicos de SQLite rechazarían el lote entero: se omiten los duplicados
+            if alias_key in seen_alias or email_key in seen_email:
+                log_event(logger, logging.WARNING, "Jugador omitido: alias/email duplicado.",
+                          player_id=record.get("id"))
+                summary["skipped_players"] += 1
+                continue
+            seen_alias.add(alias_key)
+            seen_email.add(email_key)
+            batch.append(record)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+        for record in pending.values():
+            target.add_pending(record)
+            summary["pending"] += 1
+    finally:
+        target.close()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migra los archivos JSON de jugadores a SQLite.")
+    parser.add_argument("--players", default="data/players.json")
+    parser.add_argument("--pending", default="data/pending_players.json")
+    parser.add_argument("--db", default="data/players.db")
+    args = parser.parse_args()
+    # Los jugadores omitidos se avisan por el log (stderr)
+    configure_logging()
+
+    summary = migrate(args.players, args.pending, args.db)
+    print(f"Migrados {summary['players']} jugadores y {summary['pending']} pendientes a {args.db} "
+          f"(omitidos: {summary['skipped_players']} jugadores duplicados)")
+
+
+if __name__ == "__main__":
+    main()
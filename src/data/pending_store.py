@@ -0,0 +1,192 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from ..core.telemetry import get_logger, log_event
+from ..core.validators import UniquenessValidator
+from .journal import JournalStore
+
+logger = get_logger("data.pending_store")
+
+
+class PendingRegistrationStore:
+    """Registros pendientes de confirmación indexados por token, con expiración.
+
+    - Búsqueda y confirmación por token en O(1) (índice en memoria).
+    - Un registro nuevo reemplaza a los pendientes con el mismo alias o email.
+    - Los registros caducan pasados ttl_seconds; un hilo los elimina periódicamente.
+    - Los cambios se añaden al log de JournalStore y se compactan en
+      pending_players.json (que sigue siendo una lista de registros).
+    - Si otro proceso (el juego, otro worker) añadió registros, un token que no está
+      en memoria se busca leyendo solo lo nuevo del log.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: Optional[float] = 24 * 3600,
+                 sweep_interval: Optional[float] = 60.0, compact_threshold: int = 500,
+                 clock: Callable[[], float] = time.time):
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        self._journal = JournalStore(Path(path), compact_threshold=compact_threshold,
+                                     list_key="token", on_changes=self._apply_changes)
+        self._lock = self._journal.lock
+
+        # token -> registro, en orden de creación (los más antiguos primero)
+        self._by_token: "OrderedDict[str, dict]" = OrderedDict()
+        self._by_alias: Dict[str, str] = {}
+        self._by_email: Dict[str, str] = {}
+
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+        self._load()
+        if ttl_seconds and sweep_interval:
+            self._sweeper = threading.Thread(target=self._sweep_loop, daemon=True)
+            self._sweeper.start()
+
+    # ------------------------------- CARGA --------------------------------
+    def _load(self):
+        now = self._clock()
+        records = list(self._journal.load().values())
+        for record in records:
+            # Registros anteriores a la expiración: cuentan desde ahora (solo en memoria,
+            # se guarda con la próxima escritura)
+            record.setdefault("created_at", now)
+        records.sort(key=lambda r: r["created_at"])
+
+        with self._lock:
+            for record in records:
+                # Los duplicados de alias/email quedan ocultos en memoria; la próxima
+                # compactación los descarta del archivo
+                self._insert(record)
+            expired = self._pop_expired(now)
+
+        if expired:
+            # Solo si la limpieza quitó registros se reescribe el snapshot; abrir el
+            # repositorio no debe modificar pending_players.json
+            self._journal.compact(self._snapshot)
+
+    # ------------------------------ ÍNDICES -------------------------------
+    def _insert(self, record: dict) -> List[str]:
+        """Indexa el registro quitando los que comparten alias o email. Retorna los tokens quitados."""
+        removed = []
+        alias_key = UniquenessValidator.normalize(record.get("alias"))
+        email_key = UniquenessValidator.normalize(record.get("email"))
+        for old_token in {self._by_alias.get(alias_key), self._by_email.get(email_key)}:
+            if old_token and old_token != record["token"] and self._remove(old_token):
+                removed.append(old_token)
+        self._remove(record["token"])
+        self._by_token[record["token"]] = record
+        self._by_alias[alias_key] = record["token"]
+        self._by_email[email_key] = record["token"]
+        return removed
+
+    def _remove(self, token: str) -> Optional[dict]:
+        record = self._by_token.pop(token, None)
+        if record is None:
+            return None
+        alias_key = UniquenessValidator.normalize(record.get("alias"))
+        email_key = UniquenessValidator.normalize(record.get("email"))
+        if self._by_alias.get(alias_key) == token:
+            del self._by_alias[alias_key]
+        if self._by_email.get(email_key) == token:
+            del self._by_email[email_key]
+        return record
+
+    def _is_expired(self, record: dict, now: float) -> bool:
+        return bool(self.ttl_seconds) and record["created_at"] + self.ttl_seconds <= now
+
+    def _pop_expired(self, now: float) -> List[str]:
+        # Los registros están en orden de creación: basta con mirar el principio
+        expired = []
+        while self._by_token:
+            token, record = next(iter(self._by_token.items()))
+            if not self._is_expired(record, now):
+                break
+            self._remove(token)
+            expired.append(token)
+        return expired
+
+    def _apply_changes(self, full: bool, records: Dict[str, Optional[dict]]):
+        # Cambios de otro proceso; el journal llama con su lock (self._lock) tomado
+        now = self._clock()
+        if full:
+            self._by_token.clear()
+            self._by_alias.clear()
+            self._by_email.clear()
+        for token, record in sorted(records.items(), key=lambda item: (item[1] or {}).get("created_at", now)):
+            if record is None:
+                self._remove(token)
+            else:
+                record.setdefault("created_at", now)
+                self._insert(record)
+
+    def _snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return dict(self._by_token)
+
+    # ------------------------------ PÚBLICO -------------------------------
+    def add(self, record: dict) -> dict:
+        """Guarda un registro pendiente (reemplaza pendientes con su alias o email)."""
+        record = dict(record)
+        record.setdefault("created_at", self._clock())
+        with self._lock:
+            removed = self._insert(record)
+            self._journal.append([("del", token, None) for token in removed]
+                                 + [("put", record["token"], record)])
+        self._journal.maybe_compact(self._snapshot)
+        return record
+
+    def get(self, token: str) -> Optional[dict]:
+        """Retorna el registro pendiente con ese token, o None si no existe o caducó."""
+        record = self._by_token.get(token)
+        if record is None and self._journal.poll():
+            record = self._by_token.get(token)
+        if record is None or self._is_expired(record, self._clock()):
+            return None
+        return record
+
+    def pop(self, token: str) -> Optional[dict]:
+        """Quita y retorna el registro pendiente con ese token."""
+        with self._lock:
+            record = self._remove(token)
+            if record is not None:
+                self._journal.append([("del", token, None)])
+        self._journal.maybe_compact(self._snapshot)
+        return record
+
+    def records(self) -> List[dict]:
+        return list(self._snapshot().values())
+
+    def __len__(self):
+        return len(self._by_token)
+
+    # ------------------------------ LIMPIEZA ------------------------------
+    def evict_expired(self) -> int:
+        """Elimina los registros caducados. Retorna cuántos eliminó."""
+        self._journal.poll()
+        with self._lock:
+            expired = self._pop_expired(self._clock())
+            if expired:
+                self._journal.append([("del", token, None) for token in expired])
+        self._journal.maybe_compact(self._snapshot)
+        return len(expired)
+
+    def _sweep_loop(self):
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                self.evict_expired()
+            except OSError as e:
+                log_event(logger, logging.WARNING, "No se pudieron limpiar los pendientes caducados",
+                          error=str(e))
+
+    def compact(self):
+        self._journal.compact(self._snapshot)
+
+    def close(self):
+        self._stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join()
+        self._journal.close()
@@ -1,174 +1,752 @@
-import json
-import os
+import atexit
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Optional
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional
 from ..core.player import Player
+from ..core.telemetry import REGISTRY, get_logger, log_event
 from ..core.validators import UniquenessValidator
+from .group_commit import GroupCommitter
+from .lazy_storage import LazyJsonPlayerStorage
+from .player_cache import PlayerCache
+from .prefix_index import PrefixIndex, search_terms
+from .recovery_codes import RecoveryCodeStore
+from .session_store import SessionStore
+from .storage import (BinaryPlayerStorage, DuplicatePlayerError, JournalPlayerStorage, JsonPlayerStorage,
+                      PlayerStorage)
+
+logger = get_logger("data.persistence")
+REPO_SECONDS = REGISTRY.histogram("galactatec_repo_operation_seconds",
+                                  "Duración de las cargas, guardados y confirmaciones del repositorio.", ["op"])
+REPO_PLAYERS_SAVED = REGISTRY.counter("galactatec_repo_players_saved_total",
+                                      "Jugadores persistidos por el repositorio.")
+
+class PendingConfirmation:
+    """Confirmación en curso con escritura agrupada (ver PlayerRepository.start_confirmation).
+
+    `saved` es un Future que se resuelve cuando termina el lote del jugador; después
+    hay que llamar a finish().
+    """
+
+    def __init__(self, repo: "PlayerRepository", player: Player, token: str, ticket: int, saved: Future):
+        self.player = player
+        self.saved = saved
+        self._repo = repo
+        self._token = token
+        self._ticket = ticket
+
+    def finish(self) -> Player:
+        """Quita el pendiente (esperando el lote si aún no terminó) y retorna el jugador.
+        Si la escritura falló deshace el alta y relanza el error: el enlace sigue sirviendo."""
+        return self._repo._finish_confirmation(self.player, self._token, self._ticket)
+
 
 class PlayerRepository:
     """Manejo de jugadores confirmados y pendientes"""
 
-    def __init__(self, file_path="data/players.json"):
+    def __init__(self, file_path=None, journal: bool = False,
+                 compact_threshold: int = 1000, storage: Optional[PlayerStorage] = None,
+                 pending_ttl: Optional[float] = 24 * 3600,
+                 pending_file_path="data/pending_players.json",
+                 commit_delay: Optional[float] = None, commit_batch_size: int = 256,
+                 lazy: bool = False, cache_size: Optional[int] = 10000,
+                 refresh_interval: Optional[float] = None, binary: bool = False,
+                 session_ttl: float = 12 * 3600, session_secret: Optional[bytes] = None,
+                 recovery_ttl: float = 5 * 60):
         current_dir = Path(__file__).parent.parent.parent
-        
-        self._file_path = current_dir / file_path 
-        self.PENDING_FILE = current_dir / "data/pending_players.json"
-        
-        self._players = {}
+
+        if file_path is None:
+            file_path = "data/players.bin" if binary else "data/players.json"
+        self._file_path = current_dir / file_path
+        self.PENDING_FILE = current_dir / pending_file_path
+
+        # Backend de almacenamiento. Por defecto los archivos JSON de data/; con
+        # journal=True las escrituras se añaden a players.json.log y una compactación
+        # en segundo plano las vuelca a players.json (ver JournalStore). Los pendientes
+        # caducan pasados pending_ttl segundos (None = nunca). Con lazy=True players.json
+        # se indexa sin cargarlo y los jugadores se leen bajo demanda (LazyJsonPlayerStorage).
+        # Con binary=True el archivo de jugadores usa el formato binario compacto
+        # (ver binary_snapshot; por defecto data/players.bin). Un archivo que no sea un
+        # snapshot binario válido lanza ValueError en vez de tomarse como vacío.
+        if storage is None:
+            if binary:
+                storage = BinaryPlayerStorage(self._file_path, self.PENDING_FILE, pending_ttl)
+            elif lazy:
+                storage = LazyJsonPlayerStorage(self._file_path, self.PENDING_FILE, pending_ttl)
+            elif journal:
+                storage = JournalPlayerStorage(self._file_path, self.PENDING_FILE, compact_threshold, pending_ttl)
+            else:
+                storage = JsonPlayerStorage(self._file_path, self.PENDING_FILE, pending_ttl)
+        self._storage = storage
+        # Con un backend indexado (SQLite, lazy) no se carga el roster: _players es una
+        # caché LRU de hasta cache_size jugadores ya consultados y las búsquedas van a
+        # los índices del backend.
+        self._indexed = storage.indexed
+        self._cache_size = cache_size
+
+        self._players = self._new_player_map()
+        # Jugadores modificados aún no persistidos (escritura agrupada); no se pueden
+        # perder aunque la caché los descarte.
+        self._unsaved = {}
+        # id -> número de la última marca de _unsaved. Los jugadores se modifican en el
+        # mismo objeto, así que un flush solo puede quitar de _unsaved lo que no se volvió
+        # a marcar mientras se guardaba.
+        self._dirty_seq: Dict[str, int] = {}
+        self._dirty_counter = 0
+        self._dirty_lock = threading.Lock()
+        self._saving = set()  # ids que se están guardando en este momento
+        # id -> error de los jugadores que el backend rechazó al escribir porque otro
+        # proceso ya tenía su alias o email; lo lanza quien espera ese guardado
+        self._rejected: Dict[str, DuplicatePlayerError] = {}
+        # Hace atómicos "validar unicidad + registrar" de altas y confirmaciones cuando
+        # varios hilos usan el repositorio (servidores, pool de PlayerService)
+        self._lock = threading.RLock()
+        # Índices normalizados (minúsculas) -> id, mantenidos en add/update/reload
+        self._alias_index = {}
+        self._email_index = {}
+        self._index_keys = {}  # id -> (alias, email) con los que está indexado
+        # Alias y nombres para search_players() (solo sin backend indexado, que busca solo)
+        self._prefix_index = PrefixIndex()
+        # Vista serializada del roster ({id: dict}) para get_all_dict() y los snapshots:
+        # solo se vuelven a serializar los jugadores marcados en _stale_view.
+        self._roster_view: Dict[str, dict] = {}
+        self._stale_view = set()
+        # Copia de solo lectura de la vista que entrega get_all_dict(); se rehace solo
+        # cuando la vista cambió (la vista reemplaza los registros, no los modifica)
+        self._roster_copy: Optional[Mapping[str, Mapping]] = None
+        self._view_lock = threading.Lock()
+        self._uniqueness_validator = UniquenessValidator(
+            alias_lookup=self._find_alias_owner,
+            email_lookup=self._find_email_owner,
+        )
         self._load_players()
 
+        # Sesiones abiertas con create_session(): tokens firmados que evitan repetir
+        # bcrypt en cada llamada; se revocan al cambiar la contraseña. Son de este
+        # proceso: otros workers no ven sus revocaciones (ver SessionStore).
+        self.sessions = SessionStore(session_ttl, session_secret)
+        # Códigos de recuperación de contraseña (request_password_reset / update_password)
+        self.recovery_codes = RecoveryCodeStore(recovery_ttl)
+
+        # Varios procesos (servidor, juego) pueden compartir los datos. El backend avisa
+        # de los cambios ajenos que detecta; con refresh_interval además se consulta
+        # antes de leer, como mucho una vez cada refresh_interval segundos (0 = siempre).
+        self._refresh_interval = refresh_interval
+        self._last_refresh = time.monotonic()
+        self._storage.set_change_listener(self._on_storage_changes)
+        # La validación en memoria no ve lo que otro proceso registró y aún no se leyó:
+        # el backend vuelve a comprobar la unicidad al escribir, ya al día
+        self._storage.set_write_check(self._check_unique_on_write)
+
+        # Escritura agrupada: con commit_delay los cambios se marcan como sucios y un hilo
+        # los persiste juntos tras commit_delay segundos o commit_batch_size jugadores.
+        # Sin commit_delay cada cambio se guarda en el momento, como siempre.
+        self._committer: Optional[GroupCommitter] = None
+        if commit_delay is not None:
+            self._committer = GroupCommitter(self._flush_dirty, commit_delay, commit_batch_size)
+            atexit.register(self.flush)
+
+    @property
+    def storage(self) -> PlayerStorage:
+        return self._storage
+
     def _load_players(self):
-        """Carga los jugadores desde el archivo players.json a la memoria."""
-        from ..core.player import Player 
-        
-        if self._file_path.exists():
-            with open(self._file_path, "r", encoding="utf-8") as f:
-                try:
-                    data = json.load(f)
-                    for pdata in data.values():
-                        player = Player.from_dict(pdata)
-                        player.set_uniqueness_validator(UniquenessValidator(self.get_all_dict()))
-                        self._players[player._id] = player
-                except json.JSONDecodeError:
-                    print("ADVERTENCIA: Archivo players.json vacío o mal formado. Inicializando sin jugadores.")
-                    self._players = {}
-
-
-    def _save_players(self):
-        """Guarda los jugadores en memoria en el archivo players.json en disco."""
-        self._file_path.parent.mkdir(exist_ok=True, parents=True)
-        
-        with open(self._file_path, "w", encoding="utf-8") as f:
-            json.dump({p._id: p.to_dict() for p in self._players.values()}, f, indent=2, ensure_ascii=False)
-        
-        print(f"GUARDADO en {self._file_path}:")
-        print(json.dumps({p._id: p.to_dict() for p in self._players.values()}, indent=2, ensure_ascii=False))
-
-
-    def get_all_dict(self):
-        """Retorna un diccionario de todos los jugadores (serializados a dict)."""
-        return {p._id: p.to_dict() for p in self._players.values()}
-
-    def add_player(self, player: Player):
+        """Carga los jugadores desde el almacenamiento a la memoria."""
+        if self._indexed:
+            return
+        start = time.perf_counter()
+        with self._prefix_index.bulk():
+            for pdata in self._storage.load_players().values():
+                self._register(Player.from_dict(pdata))
+        elapsed = time.perf_counter() - start
+        REPO_SECONDS.observe(elapsed, op="load")
+        log_event(logger, logging.INFO, "Jugadores cargados", players=len(self._players),
+                  seconds=round(elapsed, 3))
+
+    # ----------------------- CAMBIOS DE OTROS PROCESOS ---------------------
+    def refresh(self) -> bool:
+        """Incorpora los cambios que otros procesos hayan hecho en el almacenamiento."""
+        self._last_refresh = time.monotonic()
+        return self._storage.poll_changes()
+
+    def _maybe_refresh(self):
+        if self._refresh_interval is None:
+            return
+        if time.monotonic() - self._last_refresh >= self._refresh_interval:
+            self.refresh()
+
+    def _on_storage_changes(self, full: bool, records: Dict[str, Optional[dict]]):
+        """Aplica cambios ajenos avisados por el backend (ver PlayerStorage)."""
+        # Lo modificado aquí y aún no guardado manda sobre lo leído de disco
+        keep = set(self._unsaved) | self._saving
+        if self._indexed:
+            # El backend ya responde con los datos nuevos: basta con olvidar lo hidratado
+            cached = list(self._players.items())
+            if full:
+                self._players = self._new_player_map()
+                for pid, player in cached:
+                    if pid in keep:
+                        self._players[pid] = player
+            else:
+                for pid in records:
+                    if pid not in keep:
+                        self._players.pop(pid, None)
+            return
+
+        # Una recarga completa reordena el índice de prefijos una sola vez
+        with self._prefix_index.bulk() if full else nullcontext():
+            if full:
+                for pid in list(self._players):
+                    if pid not in records and pid not in keep:
+                        self._forget(pid)
+            for pid, pdata in records.items():
+                if pid in keep:
+                    continue
+                if pdata is None:
+                    self._forget(pid)
+                    continue
+                current = self._players.get(pid)
+                if current is not None and current.to_dict() == pdata:
+                    # Sin cambios: se conserva el mismo objeto Player
+                    continue
+                self._register(Player.from_dict(pdata))
+
+    def _forget(self, player_id: str):
+        self._players.pop(player_id, None)
+        self._mark_stale((player_id,))
+        self._prefix_index.remove(player_id)
+        if player_id in self._index_keys:
+            self._unindex_player(player_id)
+
+    def _register(self, player: Player) -> Player:
+        player.set_uniqueness_validator(self._uniqueness_validator)
+        self._players[player._id] = player
+        self._index_player(player)
+        self._index_prefixes(player)
+        self._mark_stale((player._id,))
+        return player
+
+    # ------------------------------ ÍNDICES -------------------------------
+    def _new_player_map(self):
+        return PlayerCache(self._cache_size) if self._indexed else {}
+
+    def _clear_players(self):
+        self._players = self._new_player_map()
+        with self._view_lock:
+            self._roster_view = {}
+            self._stale_view = set()
+            self._roster_copy = None
+        self._alias_index = {}
+        self._email_index = {}
+        self._index_keys = {}
+        self._prefix_index.clear()
+
+    def _index_player(self, player: Player):
+        """Registra (o actualiza) el alias y email de un jugador en los índices.
+
+        Con un backend indexado solo se indexan los jugadores aún no persistidos, que
+        el backend todavía no conoce.
+        """
+        if self._indexed and player._id not in self._unsaved:
+            return
+        alias_key = UniquenessValidator.normalize(player.alias)
+        email_key = UniquenessValidator.normalize(player.email)
+        old_keys = self._index_keys.get(player._id)
+        if old_keys == (alias_key, email_key):
+            return
+        if old_keys:
+            self._unindex_player(player._id)
+        self._alias_index[alias_key] = player._id
+        self._email_index[email_key] = player._id
+        self._index_keys[player._id] = (alias_key, email_key)
+
+    def _index_prefixes(self, player: Player):
+        if not self._indexed:
+            self._prefix_index.update(player._id, player.alias, player._full_name)
+
+    def _unindex_player(self, player_id: str):
+        old_alias, old_email = self._index_keys.pop(player_id)
+        if self._alias_index.get(old_alias) == player_id:
+            del self._alias_index[old_alias]
+        if self._email_index.get(old_email) == player_id:
+            del self._email_index[old_email]
+
+    def _find_alias_owner(self, alias_key: str) -> Optional[str]:
+        owner = self._alias_index.get(alias_key)
+        if owner is None and self._indexed:
+            owner = self._storage.find_alias_owner(alias_key)
+        return owner
+
+    def _find_email_owner(self, email_key: str) -> Optional[str]:
+        owner = self._email_index.get(email_key)
+        if owner is None and self._indexed:
+            owner = self._storage.find_email_owner(email_key)
+        return owner
+
+    def _check_unique_on_write(self, records: List[dict]):
+        """Comprueba que nadie más tenga el alias o email de los registros a escribir.
+
+        La llama el backend con su lock de escritura tomado y los cambios de otros procesos
+        ya incorporados (ver PlayerStorage). Lanza DuplicatePlayerError con los ids en conflicto.
+        """
+        if self._indexed:
+            alias_owner, email_owner = self._storage.find_alias_owner, self._storage.find_email_owner
+        else:
+            # El listener ya puso en los índices a los jugadores registrados por otros
+            alias_owner, email_owner = self._alias_index.get, self._email_index.get
+        ids = {record["id"] for record in records}
+        conflicts, messages = [], []
+        for record in records:
+            for message, value, find_owner in (("Alias ya en uso", record.get("alias", ""), alias_owner),
+                                               ("Email ya registrado", record.get("email", ""), email_owner)):
+                owner = find_owner(UniquenessValidator.normalize(value))
+                # Los jugadores de este proceso ya se validaron entre sí en memoria
+                if owner is not None and owner not in ids and owner not in self._unsaved:
+                    conflicts.append(record["id"])
+                    messages.append(message)
+                    break
+        if conflicts:
+            raise DuplicatePlayerError(messages[0], conflicts)
+
+    def _discard_rejected(self, player_ids: Iterable[str], error: Optional[DuplicatePlayerError] = None):
+        """Deshace en memoria los cambios que el backend rechazó por duplicados."""
+        player_ids = list(player_ids)
+        log_event(logger, logging.WARNING, "Jugadores rechazados al guardar: alias o email ya registrado",
+                  players=len(player_ids))
+        for player_id in player_ids:
+            self._forget_unsaved(player_id)
+            if error is not None:
+                with self._dirty_lock:
+                    self._rejected[player_id] = error
+        if not self._indexed:
+            # Si eran jugadores existentes, vuelve su versión guardada (los indexados se
+            # hidratan de nuevo al consultarlos)
+            self._on_storage_changes(True, self._storage.load_players())
+
+    def _wait_saved(self, ticket: int, players: Iterable[Player]):
+        """Espera el ticket del committer; lanza el error si algún jugador fue rechazado."""
+        self._committer.wait(ticket)
+        with self._dirty_lock:
+            rejected = [p._id for p in players if p._id in self._rejected]
+            errors = [self._rejected.pop(player_id) for player_id in rejected]
+        if errors:
+            raise DuplicatePlayerError(str(errors[0]), rejected)
+
+    @property
+    def uniqueness_validator(self) -> UniquenessValidator:
+        """Validador de unicidad respaldado por los índices del repositorio."""
+        return self._uniqueness_validator
+
+
+    def _save_players(self, changed: Optional[Iterable[Player]] = None, wait: bool = False) -> Optional[int]:
+        """Persiste los jugadores de `changed` (o todos si es None) en el almacenamiento.
+
+        Con escritura agrupada solo los marca y retorna el ticket del committer;
+        wait=True espera a que estén en disco.
+        """
+        players = list(self._players.values() if changed is None else changed)
+        self._mark_stale(p._id for p in players)
+        if self._committer is None:
+            self._saving = {p._id for p in players}
+            try:
+                with REPO_SECONDS.time(op="save"):
+                    self._storage.save_players([p.to_dict() for p in players], self._snapshot_dict)
+            except DuplicatePlayerError as e:
+                self._saving = set()
+                self._discard_rejected(e.player_ids)
+                raise
+            finally:
+                self._saving = set()
+            REPO_PLAYERS_SAVED.inc(len(players))
+            return None
+        with self._dirty_lock:
+            for p in players:
+                self._dirty_counter += 1
+                self._dirty_seq[p._id] = self._dirty_counter
+                self._unsaved[p._id] = p
+                self._rejected.pop(p._id, None)
+                self._index_player(p)
+        ticket = self._committer.mark_dirty(p._id for p in players)
+        if wait:
+            self._wait_saved(ticket, players)
+        return ticket
+
+    def _flush_dirty(self, player_ids: List[str]):
+        # La marca se toma antes de serializar: un cambio posterior la hace avanzar
+        with self._dirty_lock:
+            marked = [(self._unsaved[pid], self._dirty_seq[pid]) for pid in player_ids if pid in self._unsaved]
+        while marked:
+            records = [p.to_dict() for p, _ in marked]
+            try:
+                with REPO_SECONDS.time(op="save"):
+                    self._storage.save_players(records, self._snapshot_dict)
+                break
+            except DuplicatePlayerError as e:
+                rejected = set(e.player_ids) & {p._id for p, _ in marked}
+                if not rejected:
+                    raise
+                # Otro proceso se adelantó con esos alias o emails: se descartan (sus
+                # esperas reciben el error) y el resto del lote se guarda igual
+                self._discard_rejected(rejected, e)
+                marked = [(p, seq) for p, seq in marked if p._id not in rejected]
+        REPO_PLAYERS_SAVED.inc(len(marked))
+        with self._dirty_lock:
+            for p, seq in marked:
+                if self._dirty_seq.get(p._id) != seq:
+                    # Se volvió a modificar mientras se guardaba: queda para el próximo lote
+                    continue
+                del self._unsaved[p._id]
+                del self._dirty_seq[p._id]
+                if self._indexed and p._id in self._index_keys:
+                    # Ya está en el backend: sus índices vuelven a ser la fuente
+                    self._unindex_player(p._id)
+
+    def flush(self):
+        """Persiste ya los cambios pendientes de la escritura agrupada."""
+        if self._committer is not None:
+            self._committer.flush()
+
+    def _snapshot_dict(self):
+        # Copia de la vista (el backend puede modificar el dict que recibe), hecha con el
+        # lock tomado para no recorrerla mientras otro hilo la actualiza
+        with self._view_lock:
+            return dict(self._refresh_view())
+
+    def _mark_stale(self, player_ids: Iterable[str]):
+        # Con backend indexado no hay vista en memoria que mantener
+        if self._indexed:
+            return
+        with self._view_lock:
+            self._stale_view.update(player_ids)
+
+    def _serialized_roster(self) -> Dict[str, dict]:
+        """Vista {id: dict} de los jugadores en memoria, al día solo donde hizo falta."""
+        with self._view_lock:
+            return self._refresh_view()
+
+    def _refresh_view(self) -> Dict[str, dict]:
+        # Requiere _view_lock
+        stale, self._stale_view = self._stale_view, set()
+        view = self._roster_view
+        if stale:
+            self._roster_copy = None
+        for pid in stale:
+            player = self._players.get(pid)
+            if player is None:
+                view.pop(pid, None)
+            else:
+                view[pid] = player.to_dict()
+        return view
+
+    def get_all_dict(self) -> Mapping[str, Mapping]:
+        """Retorna un mapeo de solo lectura {id: registro} de todos los jugadores.
+
+        Es una foto: no cambia con altas o confirmaciones posteriores, así que se puede
+        recorrer mientras otros hilos registran. Para editar un registro, `dict(registro)`.
+        """
+        self._maybe_refresh()
+        if self._indexed:
+            data = {pdata["id"]: pdata for pdata in self._storage.iter_players()}
+            data.update({pid: p.to_dict() for pid, p in list(self._unsaved.items())})
+            return MappingProxyType(data)
+        with self._view_lock:
+            view = self._refresh_view()
+            if self._roster_copy is None:
+                self._roster_copy = MappingProxyType({pid: MappingProxyType(record)
+                                                      for pid, record in view.items()})
+            return self._roster_copy
+
+    def add_player(self, player: Player, wait: bool = False):
         """Añade un jugador confirmado y lo guarda en disco. Valida unicidad."""
-        player.set_uniqueness_validator(UniquenessValidator(self.get_all_dict()))
-        
+        self._maybe_refresh()
+        with self._lock:
+            self._check_new_player(player)
+            self._register(player)
+            ticket = self._save_players([player])
+        if wait and ticket is not None:
+            # Fuera del lock: otros hilos pueden sumarse al mismo lote
+            self._wait_saved(ticket, [player])
+
+    def add_players(self, players: Iterable[Player], wait: bool = False):
+        """Añade varios jugadores confirmados con una sola escritura. Valida unicidad;
+        si alguno falla no se añade ninguno.
+
+        Con escritura agrupada, si al escribir otro proceso ya tenía el alias o email de
+        alguno, solo se descartan esos: wait=True lanza DuplicatePlayerError con sus ids.
+        """
+        self._maybe_refresh()
+        added = []
+        with self._lock:
+            try:
+                for player in players:
+                    # Se registran de a uno para que el lote también se valide contra sí mismo
+                    self._check_new_player(player)
+                    added.append(self._register(player))
+                ticket = self._save_players(added)
+            except ValueError:
+                for player in added:
+                    self._forget(player._id)
+                raise
+        if wait and ticket is not None:
+            self._wait_saved(ticket, added)
+
+    def _check_new_player(self, player: Player):
+        player.set_uniqueness_validator(self._uniqueness_validator)
+
         if not player._uniqueness_validator.is_alias_unique(player.alias):
             raise ValueError("Alias ya en uso")
         if not player._uniqueness_validator.is_email_unique(player.email):
             raise ValueError("Email ya registrado")
-            
-        self._players[player._id] = player
-        self._save_players()
 
     def get_player_by_alias(self, alias) -> Optional[Player]:
-        """Busca un jugador confirmado por alias."""
-        for p in self._players.values():
-            if p.alias == alias:
-                return p
-        return None
+        """Busca un jugador confirmado por alias (sin distinguir mayúsculas)."""
+        self._maybe_refresh()
+        player_id = self._find_alias_owner(UniquenessValidator.normalize(alias))
+        return self._get_player(player_id) if player_id else None
 
     def get_player_by_email(self, email) -> Optional[Player]:
         """Busca un jugador confirmado por email."""
-        email_lower = email.lower()
-        for p in self._players.values():
-            if p.email.lower() == email_lower:
-                return p
-        return None
-    
+        self._maybe_refresh()
+        player_id = self._find_email_owner(UniquenessValidator.normalize(email))
+        return self._get_player(player_id) if player_id else None
+
+    def search_players(self, prefix: str, limit: int = 20, offset: int = 0) -> List[Player]:
+        """Jugadores cuyo alias o nombre (o una palabra del nombre) empieza por prefix,
+        sin distinguir mayúsculas, en orden alfabético. offset/limit paginan el resultado."""
+        self._maybe_refresh()
+        if not self._indexed:
+            ids = self._prefix_index.search(prefix, limit, offset)
+        else:
+            with self._dirty_lock:
+                unsaved = list(self._unsaved.values())
+            if unsaved:
+                ids = self._search_with_unsaved(prefix, limit, offset, unsaved)
+            else:
+                ids = self._storage.search_prefix(prefix, limit, offset)
+        players = (self._get_player(player_id) for player_id in ids)
+        return [player for player in players if player is not None]
+
+    def _search_with_unsaved(self, prefix: str, limit: int, offset: int,
+                             unsaved: List[Player]) -> List[str]:
+        """search_players() con un backend indexado y jugadores aún no persistidos
+        (escritura agrupada): el backend no los ve o tiene una versión vieja, así que se
+        mezclan sus coincidencias con las del backend en vez de forzar una escritura."""
+        prefix = (prefix or "").lower()
+        unsaved_ids = {p._id for p in unsaved}
+        keys: Dict[str, str] = {}
+
+        def match_key(player: Player) -> Optional[str]:
+            # Mismo orden que los índices: el menor término que coincide
+            terms = [t for t in search_terms(player.alias, player._full_name) if t.startswith(prefix)]
+            return min(terms) if terms else None
+
+        for player in unsaved:
+            key = match_key(player)
+            if key is not None:
+                keys[player._id] = key
+        # Se piden de más por si algunos resultados son versiones viejas de no guardados
+        for player_id in self._storage.search_prefix(prefix, offset + limit + len(unsaved_ids)):
+            if player_id in unsaved_ids:
+                continue
+            player = self._get_player(player_id)
+            key = match_key(player) if player is not None else None
+            if key is not None:
+                keys[player_id] = key
+        ordered = sorted(keys, key=lambda player_id: (keys[player_id], player_id))
+        return ordered[offset:offset + limit]
+
     def get_player_by_id(self, player_id) -> Optional[Player]:
         """Busca un jugador por ID."""
-        return self._players.get(player_id)
-    
+        self._maybe_refresh()
+        return self._get_player(player_id)
+
+    def _get_player(self, player_id) -> Optional[Player]:
+        player = self._players.get(player_id)
+        if player is None and self._indexed:
+            player = self._unsaved.get(player_id)
+            if player is not None:
+                self._players[player_id] = player
+            else:
+                pdata = self._storage.get_player(player_id)
+                if pdata:
+                    player = self._register(Player.from_dict(pdata))
+        return player
+
     # ---------------------------- PENDIENTES ------------------------------
     def add_pending_player(self, jugador_data: dict):
         """Añade un jugador a la lista de pendientes (aún no confirmado)."""
         self.validate_alias_email(jugador_data["alias"], jugador_data["email"])
-        
-        Path(self.PENDING_FILE).parent.mkdir(exist_ok=True, parents=True)
-        
-        pendientes = []
-        if self.PENDING_FILE.exists(): 
-            with open(self.PENDING_FILE, "r", encoding="utf-8") as f:
-                try:
-                    pendientes = json.load(f)
-                except json.JSONDecodeError:
-                    pass
-
-        pendientes.append(jugador_data)
-        
-        with open(self.PENDING_FILE, "w", encoding="utf-8") as f: 
-            json.dump(pendientes, f, indent=2, ensure_ascii=False)
+        self._storage.add_pending(jugador_data)
 
     def get_pending_player_by_token(self, token: str) -> Optional[dict]:
         """Busca un jugador pendiente por token de confirmación."""
-        if self.PENDING_FILE.exists():
-            with open(self.PENDING_FILE, "r", encoding="utf-8") as f:
-                try:
-                    for j in json.load(f):
-                        if j.get("token") == token: 
-                            return j
-                except json.JSONDecodeError:
-                    return None 
-        return None
+        return self._storage.get_pending(token)
 
     def confirm_pending_player(self, jugador_data: dict):
         """Confirma un jugador pendiente, lo añade a la lista de jugadores y lo quita de pendientes."""
-        pendientes = []
-        if self.PENDING_FILE.exists():
-            with open(self.PENDING_FILE, "r", encoding="utf-8") as f:
-                try:
-                    pendientes = [j for j in json.load(f) if j.get("token") != jugador_data["token"]]
-                except json.JSONDecodeError:
-                    pass 
-            
-            with open(self.PENDING_FILE, "w", encoding="utf-8") as f:
-                json.dump(pendientes, f, indent=2, ensure_ascii=False)
-            
-        from ..core.player import Player
-        
-        password = jugador_data.get("password") or "Temp123!" 
-        
-        nuevo = Player(
-            alias=jugador_data["alias"],
-            full_name=jugador_data["full_name"],
-            email=jugador_data["email"],
-            password=password,
-            profile_picture=jugador_data.get("profile_picture", ""),
-            spaceship_image=jugador_data.get("spaceship_image", ""),
-            favorite_music=jugador_data.get("favorite_music", [])
-        )
-        self.add_player(nuevo)
+        with REPO_SECONDS.time(op="confirm"):
+            confirmation = self.start_confirmation(jugador_data)
+            if confirmation is not None:
+                confirmation.finish()
+
+    def start_confirmation(self, jugador_data: dict) -> Optional[PendingConfirmation]:
+        """Primera parte de confirm_pending_player(), para esperar la escritura sin ocupar
+        un hilo: con escritura agrupada valida y registra el jugador en el próximo lote y
+        retorna la confirmación en curso (se espera su `saved` y se llama a finish()).
+        Sin escritura agrupada confirma todo y retorna None."""
+        self._maybe_refresh()
+        if jugador_data.get("password_hash"):
+            # El registro ya trae el jugador armado (con la contraseña hasheada): solo se mueve
+            nuevo = Player.from_dict(jugador_data)
+        else:
+            # Pendientes antiguos con la contraseña en texto plano
+            nuevo = Player(
+                alias=jugador_data["alias"],
+                full_name=jugador_data["full_name"],
+                email=jugador_data["email"],
+                password=jugador_data.get("password") or "Temp123!",
+                profile_picture=jugador_data.get("profile_picture", ""),
+                spaceship_image=jugador_data.get("spaceship_image", ""),
+                favorite_music=jugador_data.get("favorite_music", [])
+            )
+        if self._committer is None:
+            with self._lock:
+                self._check_new_player(nuevo)
+                # El backend quita el pendiente y guarda el jugador juntos (en una
+                # transacción si puede)
+                self._storage.confirm_pending(jugador_data["token"], nuevo.to_dict(),
+                                              self._snapshot_with(nuevo))
+                self._register(nuevo)
+            REPO_PLAYERS_SAVED.inc()
+            return None
+        # Escritura agrupada: el jugador entra al próximo lote y se espera fuera del
+        # lock, así varias confirmaciones comparten la misma escritura. El pendiente
+        # se quita solo cuando el jugador ya está en disco (si algo falla antes, el
+        # enlace sigue sirviendo).
+        with self._lock:
+            self._check_new_player(nuevo)
+            self._register(nuevo)
+            ticket = self._save_players([nuevo])
+        return PendingConfirmation(self, nuevo, jugador_data["token"], ticket, self._committer.future(ticket))
+
+    def _finish_confirmation(self, player: Player, token: str, ticket: int) -> Player:
+        try:
+            self._wait_saved(ticket, [player])
+        except Exception:
+            with self._lock:
+                self._forget_unsaved(player._id)
+            raise
+        self._storage.remove_pending(token)
+        return player
+
+    def _forget_unsaved(self, player_id: str):
+        # Deshace un alta que no se pudo persistir
+        with self._dirty_lock:
+            self._unsaved.pop(player_id, None)
+            self._dirty_seq.pop(player_id, None)
+        self._forget(player_id)
+
+    def _snapshot_with(self, player: Player):
+        def snapshot():
+            data = self._snapshot_dict()
+            data[player._id] = player.to_dict()
+            return data
+        return snapshot
 
     def validate_alias_email(self, alias: str, email: str):
         """Valida que el alias y el email no estén ya en uso por jugadores confirmados."""
-        if self.get_player_by_alias(alias):
+        self._maybe_refresh()
+        if not self._uniqueness_validator.is_alias_unique(alias):
             raise ValueError(f"Alias '{alias}' ya en uso")
-        if self.get_player_by_email(email):
+        if not self._uniqueness_validator.is_email_unique(email):
             raise ValueError(f"Email '{email}' ya registrado")
-    
-    def update_password(self, email, new_password):
-        """Busca un jugador por email, actualiza su contraseña y guarda en disco."""
+
+    def request_password_reset(self, email) -> Optional[str]:
+        """Genera un código de recuperación para el email, o None si no hay jugador con él.
+
+        Lanza ValueError si el email superó el límite de solicitudes, exista o no la
+        cuenta (si no, el error revelaría cuáles existen).
+        """
+        if self.get_player_by_email(email) is None:
+            self.recovery_codes.count_request(email)
+            return None
+        return self.recovery_codes.issue(email)
+
+    def update_password(self, email, new_password, wait: bool = False, code: Optional[str] = None):
+        """Busca un jugador por email, actualiza su contraseña y guarda en disco.
+
+        Con code, solo la cambia si es el código de recuperación vigente del email
+        (y lo consume).
+        """
+        if code is not None and not self.recovery_codes.verify(email, code):
+            return False
         player = self.get_player_by_email(email)
         if player:
             player.set_password(new_password)
-            self._save_players()
+            self._save_players([player], wait)
+            self.sessions.revoke_player(player._id)
+            self.recovery_codes.discard(email)
             return True
         return False
-    
-    def update_player_info(self, player: Player):
+
+    def update_player_info(self, player: Player, wait: bool = False):
         """Actualiza la información de un jugador existente y lo guarda en disco."""
-        if player._id in self._players:
+        if self._get_player(player._id) is None:
+            return False
+        with self._lock:
             self._players[player._id] = player
-            self._save_players()
-            return True
-        return False
+            self._mark_stale((player._id,))
+            self._index_player(player)
+            self._index_prefixes(player)
+            ticket = self._save_players([player], wait=wait and self._committer is None)
+        if wait and ticket is not None:
+            self._wait_saved(ticket, [player])
+        return True
 
     def check_password(self, player: Player, password: str) -> bool:
-        """Verifica si la contraseña proporcionada es correcta para el jugador dado."""
-        return player.verify_password(password)
-    
+        """Verifica si la contraseña proporcionada es correcta para el jugador dado.
+
+        Si al verificar se rehasheó la contraseña (costo de bcrypt desactualizado),
+        el hash nuevo se guarda.
+        """
+        old_hash = player._password_hash
+        ok = player.verify_password(password)
+        if ok and player._password_hash != old_hash:
+            self.update_player_info(player)
+        return ok
+
+    def create_session(self, player: Player, password: str) -> Optional[str]:
+        """Verifica la contraseña (bcrypt) y, si es correcta, retorna un token de sesión."""
+        if not self.check_password(player, password):
+            return None
+        return self.sessions.issue(player._id)
+
+    def get_player_by_session(self, token: str) -> Optional[Player]:
+        """Retorna el jugador de una sesión activa, o None si el token no es válido."""
+        player_id = self.sessions.validate(token)
+        return self.get_player_by_id(player_id) if player_id else None
+
+    def end_session(self, token: str):
+        """Cierra la sesión del token."""
+        self.sessions.revoke(token)
+
     def reload_players(self):
-        """Fuerza la recarga de jugadores desde el archivo players.json."""
-        self._players = {} 
+        """Fuerza la recarga de jugadores desde el almacenamiento."""
+        self.flush()
+        self._clear_players()
         self._load_players()
+
+    def compact(self):
+        """Reorganiza el almacenamiento (en modo journal, vuelca el log a players.json)."""
+        self._storage.compact(self._snapshot_dict)
+
+    def close(self):
+        """Persiste lo pendiente y cierra el almacenamiento (espera compactaciones en curso)."""
+        if self._committer is not None:
+            self._committer.close()
+            atexit.unregister(self.flush)
+        self._storage.close()
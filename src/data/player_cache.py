@@ -0,0 +1,28 @@
+from collections import OrderedDict
+from typing import Optional
+
+
+class PlayerCache(OrderedDict):
+    """Caché LRU acotada de jugadores hidratados (id -> Player).
+
+    get() marca el jugador como usado recientemente y al superar maxsize se
+    descartan los menos usados. Con maxsize None no tiene límite.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def get(self, key, default=None):
+        try:
+            self.move_to_end(key)
+        except KeyError:
+            return default
+        return self[key]
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self) > self.maxsize:
+                self.popitem(last=False)
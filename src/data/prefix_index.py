@@ -0,0 +1,151 @@
+import threading
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from itertools import islice
+from typing import Dict, List, Optional, Set, Tuple
+
+_SEP = "\x00"  # separa término e id; ordena antes que cualquier carácter
+
+
+def search_terms(alias: Optional[str], full_name: Optional[str]) -> Tuple[str, ...]:
+    """Términos indexados de un jugador: el alias, el nombre completo y cada palabra
+    del nombre desde la segunda ("ana maría pérez", "maría pérez", "pérez"), en minúsculas."""
+    terms = []
+    if alias:
+        terms.append(alias.lower())
+    words = (full_name or "").lower().split()
+    for i in range(len(words)):
+        terms.append(" ".join(words[i:]))
+    return tuple(dict.fromkeys(terms))
+
+
+class PrefixIndex:
+    """Índice ordenado de términos -> id de jugador para búsquedas por prefijo.
+
+    Las entradas son cadenas "término\\0id" en bloques ordenados de hasta
+    2 * block_size (como una lista ordenada por bloques): insertar o quitar cuesta
+    una búsqueda binaria sobre el máximo de cada bloque más un insort dentro de un
+    bloque, sin mover el arreglo completo. Buscar un prefijo es una búsqueda binaria y
+    recorrer solo las entradas que coinciden.
+
+    bulk() difiere los cambios para ordenar todo de una vez (carga inicial, recargas).
+    """
+
+    def __init__(self, block_size: int = 512):
+        self.block_size = block_size
+        self._blocks: List[List[str]] = []
+        self._maxes: List[str] = []  # última entrada de cada bloque
+        self._terms: Dict[str, Tuple[str, ...]] = {}  # id -> términos indexados
+        self._lock = threading.RLock()
+        self._bulk: Optional[Set[str]] = None
+
+    # ------------------------------ ESCRITURA -----------------------------
+    def update(self, player_id: str, alias: Optional[str], full_name: Optional[str]):
+        """Indexa (o reindexa) un jugador con su alias y nombre actuales."""
+        terms = search_terms(alias, full_name)
+        with self._lock:
+            old = self._terms.get(player_id, ())
+            if old == terms:
+                return
+            for term in old:
+                if term not in terms:
+                    self._discard(term + _SEP + player_id)
+            for term in terms:
+                if term not in old:
+                    self._add(term + _SEP + player_id)
+            self._terms[player_id] = terms
+
+    def remove(self, player_id: str):
+        with self._lock:
+            for term in self._terms.pop(player_id, ()):
+                self._discard(term + _SEP + player_id)
+
+    def clear(self):
+        with self._lock:
+            self._blocks, self._maxes, self._terms = [], [], {}
+
+    @contextmanager
+    def bulk(self):
+        """Acumula las altas del bloque with y ordena todo junto al salir."""
+        with self._lock:
+            self._bulk = {entry for block in self._blocks for entry in block}
+            try:
+                yield self
+            finally:
+                entries, self._bulk = sorted(self._bulk), None
+                size = self.block_size
+                self._blocks = [entries[i:i + size] for i in range(0, len(entries), size)]
+                self._maxes = [block[-1] for block in self._blocks]
+
+    def _add(self, entry: str):
+        if self._bulk is not None:
+            self._bulk.add(entry)
+            return
+        if not self._blocks:
+            self._blocks.append([entry])
+            self._maxes.append(entry)
+            return
+        pos = min(bisect_left(self._maxes, entry), len(self._blocks) - 1)
+        block = self._blocks[pos]
+        insort(block, entry)
+        self._maxes[pos] = block[-1]
+        if len(block) > 2 * self.block_size:
+            half = len(block) // 2
+            self._blocks[pos:pos + 1] = [block[:half], block[half:]]
+            self._maxes[pos:pos + 1] = [block[half - 1], block[-1]]
+
+    def _discard(self, entry: str):
+        if self._bulk is not None:
+            self._bulk.discard(entry)
+            return
+        pos = bisect_left(self._maxes, entry)
+        if pos == len(self._blocks):
+            return
+        block = self._blocks[pos]
+        i = bisect_left(block, entry)
+        if i == len(block) or block[i] != entry:
+            return
+        del block[i]
+        if block:
+            self._maxes[pos] = block[-1]
+        else:
+            del self._blocks[pos]
+            del self._maxes[pos]
+
+    # ------------------------------ CONSULTA ------------------------------
+    def search(self, prefix: str, limit: int = 20, offset: int = 0) -> List[str]:
+        """Ids cuyos términos empiezan por prefix (sin distinguir mayúsculas), en orden
+        alfabético del término, sin repetir jugadores. offset/limit paginan el resultado."""
+        prefix = (prefix or "").lower()
+        found: List[str] = []
+        seen = set()
+        skipped = 0
+        if limit <= 0:
+            return found
+        with self._lock:
+            pos = bisect_left(self._maxes, prefix)
+            start = bisect_left(self._blocks[pos], prefix) if pos < len(self._blocks) else 0
+            while pos < len(self._blocks):
+                for entry in islice(self._blocks[pos], start, None):
+                    if not entry.startswith(prefix):
+                        return found
+                    player_id = entry[entry.index(_SEP) + 1:]
+                    if player_id in seen:
+                        continue
+                    seen.add(player_id)
+                    if skipped < offset:
+                        skipped += 1
+                        continue
+                    found.append(player_id)
+                    if len(found) >= limit:
+                        return found
+                start = 0
+                pos += 1
+        return found
+
+    def __contains__(self, player_id: str) -> bool:
+        return player_id in self._terms
+
+    def __len__(self):
+        """Cantidad de entradas (términos) indexadas."""
+        return sum(len(block) for block in self._blocks)
@@ -0,0 +1,72 @@
+import bisect
+from typing import Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class BoundedRanking(Generic[T]):
+    """Las mejores `capacity` entradas ordenadas de mayor a menor score.
+
+    Mantiene en paralelo la lista de -score (ascendente) para ubicar posiciones con
+    bisect en O(log K). Con scores iguales la entrada más antigua queda primero.
+    Las entradas solo necesitan un atributo `score`.
+    """
+
+    def __init__(self, capacity: int, entries: Optional[List[T]] = None):
+        self.capacity = capacity
+        self._entries: List[T] = []
+        self._neg_scores: List[int] = []
+        self._view: Optional[Tuple[T, ...]] = None
+        if entries:
+            ordered = sorted(entries, key=lambda e: e.score, reverse=True)[:capacity]
+            self._entries = ordered
+            self._neg_scores = [-e.score for e in ordered]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def position(self, score: int) -> int:
+        """Índice (0-based) que ocuparía un score nuevo: después de los iguales o mayores."""
+        return bisect.bisect_right(self._neg_scores, -score)
+
+    def rank_for_score(self, score: int) -> Optional[int]:
+        """Posición (1-based) que tendría el score, o None si no entra."""
+        position = self.position(score)
+        return position + 1 if position < self.capacity else None
+
+    def cutoff(self) -> Optional[int]:
+        """Score a superar para entrar, o None si todavía hay lugar."""
+        if len(self._entries) < self.capacity:
+            return None
+        return self._entries[-1].score
+
+    def add(self, entry: T) -> Optional[int]:
+        """Inserta la entrada si entra. Retorna su índice (0-based) o None."""
+        position = self.position(entry.score)
+        if position >= self.capacity:
+            return None
+        self._entries.insert(position, entry)
+        self._neg_scores.insert(position, -entry.score)
+        if len(self._entries) > self.capacity:
+            self._entries.pop()
+            self._neg_scores.pop()
+        self._view = None
+        return position
+
+    def remove(self, entry: T) -> bool:
+        """Quita esa entrada (por identidad) si está en el ranking."""
+        lo = bisect.bisect_left(self._neg_scores, -entry.score)
+        hi = bisect.bisect_right(self._neg_scores, -entry.score)
+        for i in range(lo, hi):
+            if self._entries[i] is entry:
+                del self._entries[i]
+                del self._neg_scores[i]
+                self._view = None
+                return True
+        return False
+
+    def entries(self) -> Tuple[T, ...]:
+        """Las entradas en orden; la tupla se reutiliza mientras no haya cambios."""
+        if self._view is None:
+            self._view = tuple(self._entries)
+        return self._view
@@ -0,0 +1,119 @@
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from ..core.validators import UniquenessValidator
+from .timer_wheel import TimerWheel
+
+
+class RecoveryCodeStore:
+    """Códigos temporales de recuperación de contraseña, en memoria.
+
+    issue() genera un código de `digits` cifras para un email y lo guarda (solo su
+    SHA-256) en un dict por email normalizado, así que verificarlo es O(1). Los
+    códigos vencen a los ttl_seconds (5 minutos, como dice el correo) y se borran con
+    una TimerWheel: cada llamada avanza la rueda y solo toca los que vencen, nunca
+    recorre todos. Un código admite max_attempts intentos y se consume al usarlo.
+
+    Límite por email: como mucho max_requests solicitudes cada rate_window segundos. Las
+    solicitudes de más se rechazan sin generar código ni enviar correo, y sus
+    contadores también vencen con la rueda. Las solicitudes para emails sin cuenta se
+    cuentan con count_request(), así el límite no revela si la cuenta existe.
+    """
+
+    def __init__(self, ttl_seconds: float = 5 * 60, digits: int = 6, max_attempts: int = 5,
+                 max_requests: int = 3, rate_window: float = 15 * 60,
+                 clock: Callable[[], float] = time.time):
+        self.ttl_seconds = ttl_seconds
+        self.digits = digits
+        self.max_attempts = max_attempts
+        self.max_requests = max_requests
+        self.rate_window = rate_window
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._wheel = TimerWheel(clock())
+
+        # email -> [hash del código, vencimiento, intentos fallidos]
+        self._codes: Dict[str, list] = {}
+        # email -> [solicitudes en la ventana, fin de la ventana]
+        self._requests: Dict[str, list] = {}
+
+    @staticmethod
+    def _digest(code: str) -> bytes:
+        return hashlib.sha256(code.encode("utf-8")).digest()
+
+    def _expire(self, now: float):
+        # Requiere el lock
+        for kind, email in self._wheel.advance(now):
+            if kind == "code":
+                self._codes.pop(email, None)
+            else:
+                self._requests.pop(email, None)
+
+    def _count_request(self, key: str, now: float):
+        # Requiere el lock
+        self._expire(now)
+        window = self._requests.get(key)
+        if window is None:
+            window = self._requests[key] = [0, now + self.rate_window]
+            self._wheel.schedule(("rate", key), window[1])
+        if window[0] >= self.max_requests:
+            raise ValueError("Demasiadas solicitudes de recuperación. Intente más tarde.")
+        window[0] += 1
+
+    def count_request(self, email: str):
+        """Cuenta una solicitud sin generar código. Lanza ValueError si supera el límite."""
+        with self._lock:
+            self._count_request(UniquenessValidator.normalize(email), self._clock())
+
+    def issue(self, email: str) -> str:
+        """Genera un código nuevo para el email (reemplaza al anterior) y lo retorna.
+
+        Cuenta como solicitud: lanza ValueError si el email superó el límite."""
+        key = UniquenessValidator.normalize(email)
+        now = self._clock()
+        with self._lock:
+            self._count_request(key, now)
+            code = f"{secrets.randbelow(10 ** self.digits):0{self.digits}d}"
+            expires_at = now + self.ttl_seconds
+            self._codes[key] = [self._digest(code), expires_at, 0]
+            self._wheel.schedule(("code", key), expires_at)
+        return code
+
+    def verify(self, email: str, code: str, consume: bool = True) -> bool:
+        """Comprueba el código del email. Si es correcto y consume=True, lo invalida."""
+        key = UniquenessValidator.normalize(email)
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            entry = self._codes.get(key)
+            if entry is None or entry[1] <= now:
+                return False
+            if not hmac.compare_digest(entry[0], self._digest(str(code))):
+                entry[2] += 1
+                if entry[2] >= self.max_attempts:
+                    self._discard(key)
+                return False
+            if consume:
+                self._discard(key)
+            return True
+
+    def _discard(self, key: str):
+        # Requiere el lock
+        self._codes.pop(key, None)
+        self._wheel.cancel(("code", key))
+
+    def discard(self, email: str):
+        """Invalida el código pendiente del email, si hay."""
+        with self._lock:
+            self._discard(UniquenessValidator.normalize(email))
+
+    def evict_expired(self):
+        with self._lock:
+            self._expire(self._clock())
+
+    def __len__(self):
+        return len(self._codes)
@@ -0,0 +1,142 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Set, Tuple
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class SessionStore:
+    """Sesiones firmadas con HMAC para no repetir bcrypt en cada llamada.
+
+    Un token es "<datos>.<firma>", con datos = id de sesión, id de jugador y
+    vencimiento, y firma = HMAC-SHA256 con la clave secreta. validate() comprueba la
+    firma y el vencimiento y que la sesión siga activa, todo en memoria.
+
+    Las sesiones viven en este proceso: un OrderedDict en orden de vencimiento (el
+    ttl es fijo, así que es el orden de creación) del que se quitan las vencidas por
+    el principio, más un índice jugador -> sesiones para revocarlas todas juntas
+    (p. ej. al cambiar la contraseña). La clave sale de GALACTATEC_SESSION_SECRET o,
+    si no está, se genera al arrancar; rotate_secret() la cambia.
+
+    Ojo con varios procesos (workers del servidor): cada uno tiene sus propias
+    sesiones, así que un token solo vale en el proceso que lo emitió y una revocación
+    (logout, cambio de contraseña) no llega a los demás. Para compartirlas hace falta
+    un almacén común o enrutar cada jugador siempre al mismo worker.
+    """
+
+    def __init__(self, ttl_seconds: float = 12 * 3600, secret: Optional[bytes] = None,
+                 clock: Callable[[], float] = time.time):
+        self.ttl_seconds = ttl_seconds
+        if secret is None:
+            env_secret = os.environ.get("GALACTATEC_SESSION_SECRET")
+            secret = env_secret.encode("utf-8") if env_secret else secrets.token_bytes(32)
+        self._secret = secret
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        # id de sesión -> (id de jugador, vencimiento), los que vencen antes primero
+        self._sessions: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._by_player: Dict[str, Set[str]] = {}
+
+    def rotate_secret(self, secret: Optional[bytes] = None):
+        """Cambia la clave de firma (por una nueva al azar si no se da). Los tokens
+        firmados con la anterior dejan de validar, así que todas las sesiones se cierran."""
+        with self._lock:
+            self._secret = secret if secret is not None else secrets.token_bytes(32)
+            self._sessions.clear()
+            self._by_player.clear()
+
+    def _sign(self, payload: bytes) -> bytes:
+        return hmac.new(self._secret, payload, hashlib.sha256).digest()
+
+    def issue(self, player_id: str) -> str:
+        """Abre una sesión para el jugador y retorna su token."""
+        now = self._clock()
+        session_id = secrets.token_urlsafe(16)
+        expires_at = now + self.ttl_seconds
+        payload = f"{session_id}:{player_id}:{int(expires_at)}".encode("utf-8")
+        with self._lock:
+            self._evict_expired(now)
+            self._sessions[session_id] = (player_id, expires_at)
+            self._by_player.setdefault(player_id, set()).add(session_id)
+        return f"{_b64(payload)}.{_b64(self._sign(payload))}"
+
+    def validate(self, token: str) -> Optional[str]:
+        """Retorna el id del jugador si el token es válido y la sesión sigue activa."""
+        try:
+            payload_b64, signature_b64 = token.split(".")
+            payload = _unb64(payload_b64)
+            signature = _unb64(signature_b64)
+        except (AttributeError, ValueError):
+            return None
+        if not hmac.compare_digest(signature, self._sign(payload)):
+            return None
+        try:
+            session_id, player_id, expires_at = payload.decode("utf-8").rsplit(":", 2)
+            expires_at = int(expires_at)
+        except ValueError:
+            return None
+
+        now = self._clock()
+        if expires_at <= now:
+            return None
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or session[0] != player_id or session[1] <= now:
+                return None
+        return player_id
+
+    def revoke(self, token: str):
+        """Cierra la sesión del token (si es válido)."""
+        try:
+            payload = _unb64(token.split(".")[0])
+            session_id = payload.decode("utf-8").split(":", 1)[0]
+        except (AttributeError, ValueError):
+            return
+        with self._lock:
+            self._remove(session_id)
+
+    def revoke_player(self, player_id: str) -> int:
+        """Cierra todas las sesiones del jugador. Retorna cuántas había."""
+        with self._lock:
+            session_ids = self._by_player.pop(player_id, set())
+            for session_id in session_ids:
+                self._sessions.pop(session_id, None)
+            return len(session_ids)
+
+    def _remove(self, session_id: str):
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return
+        player_sessions = self._by_player.get(session[0])
+        if player_sessions is not None:
+            player_sessions.discard(session_id)
+            if not player_sessions:
+                del self._by_player[session[0]]
+
+    def _evict_expired(self, now: float):
+        # Orden de vencimiento: basta con mirar el principio
+        while self._sessions:
+            session_id, (_, expires_at) = next(iter(self._sessions.items()))
+            if expires_at > now:
+                break
+            self._remove(session_id)
+
+    def evict_expired(self):
+        with self._lock:
+            self._evict_expired(self._clock())
+
+    def __len__(self):
+        return len(self._sessions)
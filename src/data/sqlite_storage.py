@@ -0,0 +1,212 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from .storage import DuplicatePlayerError, IndexedPlayerStorage, SnapshotProvider
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id              TEXT PRIMARY KEY,
+    alias           TEXT NOT NULL,
+    full_name       TEXT NOT NULL DEFAULT '',
+    email           TEXT NOT NULL,
+    password_hash   TEXT NOT NULL DEFAULT '',
+    profile_picture TEXT NOT NULL DEFAULT '',
+    spaceship_image TEXT NOT NULL DEFAULT '',
+    favorite_music  TEXT NOT NULL DEFAULT '[]'
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_players_alias ON players (lower(alias));
+CREATE UNIQUE INDEX IF NOT EXISTS idx_players_email ON players (lower(email));
+CREATE INDEX IF NOT EXISTS idx_players_full_name ON players (lower(full_name));
+
+CREATE TABLE IF NOT EXISTS pending_players (
+    token      TEXT PRIMARY KEY,
+    alias      TEXT NOT NULL,
+    email      TEXT NOT NULL,
+    data       TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pending_alias ON pending_players (lower(alias));
+CREATE INDEX IF NOT EXISTS idx_pending_email ON pending_players (lower(email));
+CREATE INDEX IF NOT EXISTS idx_pending_created ON pending_players (created_at);
+"""
+
+PLAYER_COLUMNS = ("id", "alias", "full_name", "email", "password_hash",
+                  "profile_picture", "spaceship_image", "favorite_music")
+
+UPSERT_PLAYER = (
+    f"INSERT INTO players ({', '.join(PLAYER_COLUMNS)}) VALUES ({', '.join('?' * len(PLAYER_COLUMNS))}) "
+    "ON CONFLICT(id) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in PLAYER_COLUMNS[1:])
+)
+
+
+class SQLitePlayerStorage(IndexedPlayerStorage):
+    """Backend SQLite embebido: búsquedas por índice y escrituras incrementales.
+
+    Los alias y emails se indexan en minúsculas (igual que los índices de
+    PlayerRepository) con índices únicos, y confirmar un pendiente mueve el
+    registro a players dentro de una sola transacción. Los pendientes siguen las
+    mismas reglas que PendingRegistrationStore: uno por alias/email y caducan
+    pasados pending_ttl segundos.
+    """
+
+    def __init__(self, db_path="data/players.db", pending_ttl: Optional[float] = 24 * 3600):
+        current_dir = Path(__file__).parent.parent.parent
+        self.db_path = current_dir / db_path
+        self.pending_ttl = pending_ttl
+        self.db_path.parent.mkdir(exist_ok=True, parents=True)
+
+        # Una conexión compartida por hilos, serializada con un lock
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._data_version = self._read_data_version()
+
+    # ------------------------------ FILAS ---------------------------------
+    @staticmethod
+    def _to_row(record: dict) -> tuple:
+        return (
+            record["id"],
+            record.get("alias", ""),
+            record.get("full_name", ""),
+            record.get("email", ""),
+            record.get("password_hash", ""),
+            record.get("profile_picture", ""),
+            record.get("spaceship_image", ""),
+            json.dumps(record.get("favorite_music", []), ensure_ascii=False),
+        )
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> dict:
+        record = dict(row)
+        record["favorite_music"] = json.loads(record["favorite_music"] or "[]")
+        return record
+
+    def _upsert(self, records: List[dict]):
+        try:
+            self._conn.executemany(UPSERT_PLAYER, [self._to_row(r) for r in records])
+        except sqlite3.IntegrityError as e:
+            # Los que chocan con filas de otros jugadores (la transacción se revierte entera)
+            ids = {r["id"] for r in records}
+            conflicts = []
+            for r in records:
+                owners = {self.find_alias_owner(r.get("alias", "").lower()),
+                          self.find_email_owner(r.get("email", "").lower())}
+                if owners - ids - {None}:
+                    conflicts.append(r["id"])
+            raise DuplicatePlayerError(f"Alias o email ya registrado: {e}", conflicts) from e
+
+    # ----------------------------- JUGADORES ------------------------------
+    def load_players(self) -> Dict[str, dict]:
+        return {record["id"]: record for record in self.iter_players()}
+
+    def iter_players(self) -> Iterator[dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM players").fetchall()
+        return (self._from_row(row) for row in rows)
+
+    def save_players(self, changed: List[dict], snapshot: SnapshotProvider):
+        with self._lock, self._conn:
+            self._upsert(changed)
+
+    def get_player(self, player_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM players WHERE id = ?", (player_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def find_alias_owner(self, alias_key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT id FROM players WHERE lower(alias) = ?", (alias_key,)).fetchone()
+        return row["id"] if row else None
+
+    def find_email_owner(self, email_key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT id FROM players WHERE lower(email) = ?", (email_key,)).fetchone()
+        return row["id"] if row else None
+
+    def search_prefix(self, prefix: str, limit: int, offset: int = 0) -> List[str]:
+        # Rangos sobre los índices de lower(alias) y lower(full_name). A diferencia del
+        # índice en memoria, el nombre solo se busca desde su primera palabra.
+        low = (prefix or "").lower()
+        high = low + "\U0010ffff"
+        with self._lock:
+            rows = []
+            for column in ("alias", "full_name"):
+                rows.extend(self._conn.execute(
+                    f"SELECT lower({column}) AS term, id FROM players "
+                    f"WHERE lower({column}) >= ? AND lower({column}) < ? "
+                    f"ORDER BY lower({column}) LIMIT ?", (low, high, offset + limit)).fetchall())
+        ids, seen = [], set()
+        for term, player_id in sorted((row["term"], row["id"]) for row in rows):
+            if player_id not in seen:
+                seen.add(player_id)
+                ids.append(player_id)
+        return ids[offset:offset + limit]
+
+    def count_players(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM players").fetchone()[0]
+
+    # ----------------------------- PENDIENTES -----------------------------
+    def _expiry_cutoff(self) -> float:
+        return time.time() - self.pending_ttl if self.pending_ttl else float("-inf")
+
+    def add_pending(self, record: dict):
+        record = dict(record)
+        record.setdefault("created_at", time.time())
+        with self._lock, self._conn:
+            # Un pendiente por alias/email, y de paso se purgan los caducados
+            self._conn.execute(
+                "DELETE FROM pending_players WHERE lower(alias) = ? OR lower(email) = ? OR created_at <= ?",
+                (record.get("alias", "").lower(), record.get("email", "").lower(), self._expiry_cutoff()),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pending_players (token, alias, email, data, created_at) VALUES (?, ?, ?, ?, ?)",
+                (record["token"], record.get("alias", ""), record.get("email", ""),
+                 json.dumps(record, ensure_ascii=False), record["created_at"]),
+            )
+
+    def get_pending(self, token: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM pending_players WHERE token = ? AND created_at > ?",
+                (token, self._expiry_cutoff()),
+            ).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def remove_pending(self, token: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM pending_players WHERE token = ?", (token,))
+
+    def confirm_pending(self, token: str, player_record: dict, snapshot: SnapshotProvider):
+        with self._lock, self._conn:
+            deleted = self._conn.execute("DELETE FROM pending_players WHERE token = ?", (token,)).rowcount
+            if not deleted:
+                raise ValueError("Token inválido o jugador no encontrado")
+            self._upsert([player_record])
+
+    # ----------------------- CAMBIOS DE OTROS PROCESOS ---------------------
+    def _read_data_version(self) -> int:
+        # Cambia solo cuando otra conexión confirma una transacción
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def poll_changes(self) -> bool:
+        with self._lock:
+            version = self._read_data_version()
+            if version == self._data_version:
+                return False
+            self._data_version = version
+        self._notify(True, {})
+        return True
+
+    # ------------------------------- CICLO --------------------------------
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,275 @@
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from ..core.telemetry import get_logger, log_event, payload_logging_enabled
+from . import binary_snapshot
+from .file_lock import FileLock, file_signature
+from .journal import ChangeListener, JournalStore
+from .pending_store import PendingRegistrationStore
+
+# Proveedor del estado completo de jugadores serializados ({id: dict}), lo usan los
+# backends que necesitan reescribir todo (JSON) o compactar (journal).
+SnapshotProvider = Callable[[], Dict[str, dict]]
+# Validación que corre el backend justo antes de escribir jugadores (ver set_write_check)
+WriteCheck = Callable[[List[dict]], None]
+
+logger = get_logger("data.storage")
+
+
+class DuplicatePlayerError(ValueError):
+    """El alias o el email de algún jugador ya lo tiene otro (p. ej. registrado por otro
+    proceso). player_ids son los jugadores del guardado que están en conflicto."""
+
+    def __init__(self, message: str, player_ids: List[str]):
+        super().__init__(message)
+        self.player_ids = list(player_ids)
+
+
+class PlayerStorage(ABC):
+    """Interfaz de almacenamiento detrás de PlayerRepository.
+
+    Hay dos tipos de backend:
+      - en memoria (indexed = False): el repositorio carga todo con load_players()
+        y mantiene sus propios índices; el backend solo persiste.
+      - indexado (IndexedPlayerStorage, indexed = True): el backend responde las
+        búsquedas por id, alias y email, y el repositorio solo hidrata los jugadores
+        que se consultan.
+
+    Si otro proceso modifica el almacenamiento, el backend lo detecta (en
+    poll_changes() o antes de escribir) y se lo avisa al listener registrado con
+    set_change_listener(): (completo, registros) como en JournalStore. Los backends
+    indexados avisan (True, {}) para que el repositorio descarte lo que tenga hidratado.
+
+    La unicidad de alias y email entre procesos se comprueba al escribir: con el lock de
+    escritura tomado y ya incorporados los cambios ajenos, el backend llama a la función
+    de set_write_check() con los registros a guardar; si lanza DuplicatePlayerError no se
+    escribe nada. SQLite no la usa: sus índices únicos lanzan el mismo error.
+    """
+
+    indexed = False
+    _listener: Optional[ChangeListener] = None
+    _write_check: Optional[WriteCheck] = None
+
+    # ----------------------------- JUGADORES ------------------------------
+    @abstractmethod
+    def load_players(self) -> Dict[str, dict]:
+        """Retorna todos los jugadores serializados ({id: dict})."""
+
+    @abstractmethod
+    def save_players(self, changed: List[dict], snapshot: SnapshotProvider):
+        """Persiste los jugadores modificados (snapshot da el estado completo si hace falta)."""
+
+    def iter_players(self) -> Iterator[dict]:
+        return iter(self.load_players().values())
+
+    # ----------------------------- PENDIENTES -----------------------------
+    @abstractmethod
+    def add_pending(self, record: dict):
+        """Guarda un registro pendiente de confirmación."""
+
+    @abstractmethod
+    def get_pending(self, token: str) -> Optional[dict]:
+        """Busca un registro pendiente por token."""
+
+    @abstractmethod
+    def remove_pending(self, token: str):
+        """Elimina el registro pendiente con ese token."""
+
+    def confirm_pending(self, token: str, player_record: dict, snapshot: SnapshotProvider):
+        """Guarda el jugador confirmado y quita el pendiente.
+
+        Si el guardado falla (p. ej. otro proceso ya registró el alias) el pendiente queda.
+        Los backends con transacciones lo sobrescriben para hacerlo de forma atómica.
+        """
+        self.save_players([player_record], snapshot)
+        self.remove_pending(token)
+
+    # ----------------------- CAMBIOS DE OTROS PROCESOS ---------------------
+    def set_change_listener(self, listener: Optional[ChangeListener]):
+        self._listener = listener
+
+    def _notify(self, full: bool, records: Dict[str, Optional[dict]]):
+        if self._listener is not None:
+            self._listener(full, records)
+
+    def set_write_check(self, check: Optional[WriteCheck]):
+        self._write_check = check
+
+    def _check_write(self, records: List[dict]):
+        # Con el lock de escritura tomado y después de poll_changes()
+        if self._write_check is not None:
+            self._write_check(records)
+
+    def poll_changes(self) -> bool:
+        """Detecta cambios hechos por otros procesos y los avisa. Retorna True si había."""
+        return False
+
+    # ------------------------------- CICLO --------------------------------
+    def compact(self, snapshot: SnapshotProvider):
+        """Reorganiza el almacenamiento si el backend lo necesita."""
+
+    def close(self):
+        """Libera archivos o conexiones abiertas."""
+
+
+class IndexedPlayerStorage(PlayerStorage):
+    """Backend que responde él mismo las búsquedas por id, alias y email."""
+
+    indexed = True
+
+    @abstractmethod
+    def get_player(self, player_id: str) -> Optional[dict]:
+        """Retorna el jugador serializado con ese id, o None."""
+
+    @abstractmethod
+    def find_alias_owner(self, alias_key: str) -> Optional[str]:
+        """Retorna el id del jugador con ese alias normalizado, o None."""
+
+    @abstractmethod
+    def find_email_owner(self, email_key: str) -> Optional[str]:
+        """Retorna el id del jugador con ese email normalizado, o None."""
+
+    @abstractmethod
+    def search_prefix(self, prefix: str, limit: int, offset: int = 0) -> List[str]:
+        """Ids de los jugadores cuyo alias o nombre empieza por prefix, ordenados por el
+        menor término que coincide (ver PlayerRepository.search_players). Debe usar un
+        índice: se llama en cada búsqueda."""
+
+
+class JsonPlayerStorage(PlayerStorage):
+    """players.json (dict por id, reescrito completo) y pendientes en PendingRegistrationStore.
+
+    Las reescrituras se hacen con players.json.lock tomado y, si otro proceso cambió el
+    archivo desde la última lectura, primero se incorporan sus cambios.
+    """
+
+    def __init__(self, players_path: Path, pending_path: Path,
+                 pending_ttl: Optional[float] = 24 * 3600):
+        self.players_path = Path(players_path)
+        self.pending_path = Path(pending_path)
+        self.pending = PendingRegistrationStore(self.pending_path, ttl_seconds=pending_ttl)
+        self._file_lock = FileLock(self.players_path.with_name(self.players_path.name + ".lock"))
+        self._signature = None  # firma de players.json en la última lectura/escritura
+
+    # ----------------------------- JUGADORES ------------------------------
+    def load_players(self) -> Dict[str, dict]:
+        with self._file_lock:
+            signature = file_signature(self.players_path)
+            data = self._read_players_file() if self.players_path.exists() else {}
+            # Solo tras leerlo bien: si falla, el próximo guardado lo vuelve a intentar
+            # (y falla) en lugar de reescribir encima
+            self._signature = signature
+            return data
+
+    def _read_players_file(self) -> Dict[str, dict]:
+        with open(self.players_path, "r", encoding="utf-8") as f:
+            try:
+                return json.load(f) or {}
+            except json.JSONDecodeError:
+                log_event(logger, logging.WARNING, "Archivo players.json vacío o mal formado. "
+                          "Inicializando sin jugadores.", path=str(self.players_path))
+                return {}
+
+    def _write_players_file(self, f, data: Dict[str, dict]):
+        f.write(json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8"))
+
+    def poll_changes(self) -> bool:
+        if file_signature(self.players_path) == self._signature:
+            return False
+        with self._file_lock:
+            if file_signature(self.players_path) == self._signature:
+                return False
+            self._notify(True, self.load_players())
+            return True
+
+    def save_players(self, changed: List[dict], snapshot: SnapshotProvider):
+        self.players_path.parent.mkdir(exist_ok=True, parents=True)
+        with self._file_lock:
+            # Si otro proceso escribió, sus cambios entran al estado antes de reescribir
+            self.poll_changes()
+            self._check_write(changed)
+            data = snapshot()
+            data.update({record["id"]: record for record in changed})
+
+            # Escritura atómica: los lectores nunca ven el archivo a medias
+            tmp_path = self.players_path.with_name(self.players_path.name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                self._write_players_file(f, data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.players_path)
+            self._signature = file_signature(self.players_path)
+
+        log_event(logger, logging.DEBUG, "Jugadores guardados", path=str(self.players_path),
+                  players=len(data), changed=len(changed))
+        if payload_logging_enabled(logger):
+            log_event(logger, logging.DEBUG, "Contenido guardado", path=str(self.players_path), data=data)
+
+    # ----------------------------- PENDIENTES -----------------------------
+    def add_pending(self, record: dict):
+        self.pending.add(record)
+
+    def get_pending(self, token: str) -> Optional[dict]:
+        return self.pending.get(token)
+
+    def remove_pending(self, token: str):
+        self.pending.pop(token)
+
+    def close(self):
+        self.pending.close()
+
+
+class BinaryPlayerStorage(JsonPlayerStorage):
+    """Como JsonPlayerStorage, pero el archivo de jugadores usa el formato binario
+    compacto de binary_snapshot en lugar de JSON indentado."""
+
+    def _read_players_file(self) -> Dict[str, dict]:
+        if self.players_path.stat().st_size == 0:
+            return {}
+        # Un archivo inválido (p. ej. el players.json de siempre) no se trata como roster
+        # vacío: el próximo guardado lo reemplazaría y se perderían todos los jugadores.
+        try:
+            kind, records = binary_snapshot.read_snapshot(self.players_path)
+        except ValueError as exc:
+            raise ValueError(f"{self.players_path} no es un snapshot binario de jugadores ({exc}). "
+                             "Si es JSON, conviértalo con: python -m src.data.binary_snapshot "
+                             "import players <json> <bin>") from exc
+        if kind != binary_snapshot.KIND_PLAYERS:
+            raise ValueError(f"{self.players_path} no es un snapshot binario de jugadores")
+        return {record["id"]: record for record in records}
+
+    def _write_players_file(self, f, data: Dict[str, dict]):
+        f.write(binary_snapshot.dumps(binary_snapshot.KIND_PLAYERS, data.values()))
+
+
+class JournalPlayerStorage(JsonPlayerStorage):
+    """Jugadores en snapshot + log append-only (JournalStore); pendientes como en JSON."""
+
+    def __init__(self, players_path: Path, pending_path: Path, compact_threshold: int = 1000,
+                 pending_ttl: Optional[float] = 24 * 3600):
+        super().__init__(players_path, pending_path, pending_ttl)
+        self.journal = JournalStore(self.players_path, compact_threshold=compact_threshold,
+                                    on_changes=self._notify)
+
+    def load_players(self) -> Dict[str, dict]:
+        return self.journal.load()
+
+    def poll_changes(self) -> bool:
+        # Solo se leen las líneas nuevas del log (o todo si otro proceso compactó)
+        return self.journal.poll()
+
+    def save_players(self, changed: List[dict], snapshot: SnapshotProvider):
+        self.journal.append((("put", record["id"], record) for record in changed),
+                            before_write=lambda: self._check_write(changed))
+        self.journal.maybe_compact(snapshot)
+
+    def compact(self, snapshot: SnapshotProvider):
+        self.journal.compact(snapshot)
+
+    def close(self):
+        super().close()
+        self.journal.close()
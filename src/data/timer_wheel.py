@@ -0,0 +1,106 @@
+import math
+from typing import Dict, Hashable, List, Tuple
+
+
+class TimerWheel:
+    """Rueda de temporizadores jerárquica para vencimientos masivos.
+
+    El tiempo avanza en ticks de `resolution` segundos. El nivel 0 tiene una ranura
+    por tick (slots ticks), el nivel 1 una por cada vuelta del nivel 0, y así. Un
+    temporizador se guarda en la ranura del nivel que cubre su vencimiento y, cuando
+    ese nivel gira, baja (cascada) al nivel inferior hasta vencer en el nivel 0.
+
+    schedule() y cancel() son O(1) y advance() solo recorre las ranuras de los ticks
+    transcurridos, sin revisar todos los temporizadores. Los vencimientos más allá del
+    último nivel quedan en su última ranura y se reprograman al bajar.
+    No es thread-safe: el llamador sincroniza.
+    """
+
+    def __init__(self, now: float, resolution: float = 1.0, slots: int = 64, levels: int = 4):
+        if slots & (slots - 1):
+            raise ValueError("slots debe ser una potencia de 2")
+        self.resolution = resolution
+        self._bits = slots.bit_length() - 1
+        self._mask = slots - 1
+        self._levels: List[List[Dict[Hashable, int]]] = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._tick = self._to_tick(now)
+        # clave -> (nivel, ranura, tick de vencimiento)
+        self._timers: Dict[Hashable, Tuple[int, int, int]] = {}
+
+    def _to_tick(self, when: float) -> int:
+        return math.floor(when / self.resolution)
+
+    def schedule(self, key: Hashable, when: float):
+        """Programa (o reprograma) el vencimiento de key en el instante when."""
+        self.cancel(key)
+        self._place(key, max(math.ceil(when / self.resolution), self._tick + 1))
+
+    def _place(self, key: Hashable, deadline: int):
+        delta = deadline - self._tick
+        last = len(self._levels) - 1
+        level = 0
+        while level < last and delta >= 1 << (self._bits * (level + 1)):
+            level += 1
+        if level == last and delta >= 1 << (self._bits * (level + 1)):
+            # Más allá del horizonte: la ranura anterior a la actual del último nivel
+            slot = ((self._tick >> (self._bits * level)) - 1) & self._mask
+        else:
+            slot = (deadline >> (self._bits * level)) & self._mask
+        self._levels[level][slot][key] = deadline
+        self._timers[key] = (level, slot, deadline)
+
+    def cancel(self, key: Hashable) -> bool:
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        level, slot, _ = timer
+        self._levels[level][slot].pop(key, None)
+        return True
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Avanza hasta now y retorna las claves vencidas (ya quitadas de la rueda)."""
+        target = self._to_tick(now)
+        expired = []
+        while self._tick < target:
+            if not self._timers:
+                self._tick = target
+                break
+            self._tick += 1
+            # Al completar una vuelta de un nivel se baja la ranura actual del siguiente,
+            # empezando por el más alto para que lo que baja no se salte una vuelta
+            top = 0
+            while top + 1 < len(self._levels) and (self._tick >> (self._bits * top)) & self._mask == 0:
+                top += 1
+            for level in range(top, 0, -1):
+                self._cascade(level, expired)
+            self._expire_slot(self._tick & self._mask, expired)
+        return expired
+
+    def _cascade(self, level: int, expired: List[Hashable]):
+        slot = (self._tick >> (self._bits * level)) & self._mask
+        timers = self._levels[level][slot]
+        self._levels[level][slot] = {}
+        for key, deadline in timers.items():
+            if deadline <= self._tick:
+                del self._timers[key]
+                expired.append(key)
+            else:
+                self._place(key, deadline)
+
+    def _expire_slot(self, slot: int, expired: List[Hashable]):
+        timers = self._levels[0][slot]
+        if not timers:
+            return
+        self._levels[0][slot] = {}
+        for key, deadline in timers.items():
+            if deadline <= self._tick:
+                del self._timers[key]
+                expired.append(key)
+            else:
+                self._place(key, deadline)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    def __len__(self):
+        return len(self._timers)
@@ -0,0 +1,113 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+
+from services import asgi_app, server
+from services.bootstrap import PLAYER_STORAGES, AppServices
+from services.player_service import PlayerService
+from src.data.persistence import PlayerRepository
+
+
+@pytest.fixture(autouse=True)
+def local_email(monkeypatch):
+    monkeypatch.setenv("EMAIL_SENDER", "local")
+    monkeypatch.delenv("PLAYER_COMMIT_DELAY", raising=False)
+
+
+def _pendiente(n):
+    return {"id": str(uuid.uuid4()), "alias": f"Piloto{n}", "full_name": f"Piloto {n}",
+            "email": f"p{n}@example.com", "password_hash": "hash", "token": f"token-{n}",
+            "confirmed": False}
+
+
+@pytest.mark.parametrize("storage", PLAYER_STORAGES)
+def test_services_build_every_storage_under_data_dir(tmp_path, storage):
+    services = AppServices(tmp_path, storage)
+    services.repo.add_pending_player(_pendiente(1))
+    assert services.player_service.confirmar_jugador("token-1").alias == "Piloto1"
+    services.close()
+
+    reopened = AppServices(tmp_path, storage)
+    assert reopened.repo.get_player_by_alias("Piloto1") is not None
+    assert reopened.repo.get_pending_player_by_token("token-1") is None
+    reopened.close()
+
+
+def test_unknown_storage_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        AppServices(tmp_path, "yaml")
+
+
+@pytest.mark.parametrize("commit_delay", [None, "0.02"])
+def test_concurrent_async_confirmations(tmp_path, monkeypatch, commit_delay):
+    if commit_delay:
+        monkeypatch.setenv("PLAYER_COMMIT_DELAY", commit_delay)
+    services = AppServices(tmp_path, "journal")
+    for n in range(30):
+        services.repo.add_pending_player(_pendiente(n))
+    # El mismo token dos veces: solo una confirmación puede ganar
+    tokens = [f"token-{n}" for n in range(30)] + ["token-0"]
+
+    async def confirmar_todos():
+        return await asyncio.gather(*(services.player_service.confirmar_jugador_async(t) for t in tokens),
+                                    return_exceptions=True)
+
+    results = asyncio.run(confirmar_todos())
+    services.close()
+
+    assert sum(isinstance(r, ValueError) for r in results) == 1
+    reopened = PlayerRepository(tmp_path / "players.json", pending_file_path=tmp_path / "pending_players.json",
+                                journal=True)
+    assert sorted(p["alias"] for p in reopened.get_all_dict().values()) == sorted(f"Piloto{n}" for n in range(30))
+    assert all(reopened.get_pending_player_by_token(t) is None for t in tokens)
+    reopened.close()
+
+
+def test_async_confirmations_do_not_hold_pool_threads(tmp_path, monkeypatch):
+    monkeypatch.setenv("PLAYER_COMMIT_DELAY", "0.2")
+    services = AppServices(tmp_path, "json")
+    service = PlayerService(services.repo, services.email_outbox, repo_workers=1)
+    for n in range(20):
+        services.repo.add_pending_player(_pendiente(n))
+
+    async def confirmar_todos():
+        return await asyncio.gather(*(service.confirmar_jugador_async(f"token-{n}") for n in range(20)))
+
+    start = time.perf_counter()
+    players = asyncio.run(confirmar_todos())
+    # Con un hilo esperando cada lote serían 20 * 0.2 s; esperando en el event loop, un lote
+    assert time.perf_counter() - start < 2
+    assert sorted(p.alias for p in players) == sorted(f"Piloto{n}" for n in range(20))
+    assert all(services.repo.get_pending_player_by_token(f"token-{n}") is None for n in range(20))
+    service.close()
+    services.close()
+
+
+def test_flask_and_asgi_apps_share_the_wiring(tmp_path):
+    services = AppServices(tmp_path, "json", scores=True)
+    client = server.create_app(services).test_client()
+    services.repo.add_pending_player(_pendiente(1))
+    assert client.get("/confirmar?token=token-1").status_code == 200
+    # El registro por HTTP es solo de la prueba de carga
+    assert client.post("/registro", json={"alias": "x"}).status_code == 404
+    assert client.get("/metrics").status_code == 200
+    app = asgi_app.create_app(services)
+    assert app.services is services
+
+    sent = []
+    messages = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+
+    async def receive():
+        return next(messages)
+
+    async def send(message):
+        sent.append(message["type"])
+
+    asyncio.run(app({"type": "lifespan"}, receive, send))
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+    # El cierre del lifespan persistió todo
+    reopened = PlayerRepository(tmp_path / "players.json", pending_file_path=tmp_path / "pending_players.json")
+    assert reopened.get_player_by_alias("Piloto1") is not None
+    reopened.close()
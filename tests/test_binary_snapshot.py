@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from src.data import binary_snapshot
+from src.data.hall_of_fame import HallOfFameEntry, HallOfFameRepository
+from src.data.storage import BinaryPlayerStorage
+
+
+def test_players_round_trip():
+    record = {"id": "p1", "alias": "Piloto", "full_name": "Piloto Uno", "email": "p@example.com",
+              "password_hash": "h", "profile_picture": None, "spaceship_image": "",
+              "favorite_music": ["a", "ñ"], "extra": 1}
+    kind, records = binary_snapshot.loads(binary_snapshot.dumps(binary_snapshot.KIND_PLAYERS, [record]))
+    assert kind == binary_snapshot.KIND_PLAYERS
+    assert records == [record]
+
+
+def test_binary_storage_refuses_json_players_file(tmp_path):
+    players = tmp_path / "players.json"
+    content = json.dumps({"p1": {"id": "p1", "alias": "Piloto"}})
+    players.write_text(content, encoding="utf-8")
+    storage = BinaryPlayerStorage(players, tmp_path / "pending_players.json")
+
+    with pytest.raises(ValueError):
+        storage.load_players()
+    with pytest.raises(ValueError):
+        storage.save_players([{"id": "p2", "alias": "Otro"}], dict)
+    assert players.read_text(encoding="utf-8") == content
+    storage.close()
+
+
+def test_binary_hall_of_fame_defaults_to_bin_file():
+    assert HallOfFameRepository(binary=True)._file_path.name == "hall_of_fame.bin"
+
+
+def test_binary_hall_of_fame_validates_before_inserting(tmp_path):
+    repo = HallOfFameRepository(tmp_path / "hall_of_fame.bin", binary=True)
+    repo.add_entry(HallOfFameEntry("ana", 10, 0))
+
+    for bad in (HallOfFameEntry("bo", 50, 300), HallOfFameEntry("cy", 60, 1, date="ayer")):
+        with pytest.raises(ValueError):
+            repo.add_entry(bad)
+        with pytest.raises(ValueError):
+            repo.add_entries([HallOfFameEntry("dd", 70, 0), bad])
+
+    assert [e.player_name for e in repo.get_top()] == ["ana"]
+    assert [e.player_name for e in HallOfFameRepository(tmp_path / "hall_of_fame.bin", binary=True).get_top()] == ["ana"]
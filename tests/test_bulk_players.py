@@ -0,0 +1,94 @@
+import json
+
+import bcrypt
+import pytest
+
+from src.core.player import Player
+from src.data.bulk_players import export_players, import_players, read_records
+from src.data.persistence import PlayerRepository
+
+HASH = bcrypt.hashpw(b"Clave123!", bcrypt.gensalt(4)).decode("utf-8")
+
+
+def _line(n, password_hash=HASH):
+    return json.dumps({"alias": f"Piloto{n}", "full_name": f"Piloto {n}", "email": f"p{n}@example.com",
+                       "password_hash": password_hash})
+
+
+def _repo(tmp_path):
+    return PlayerRepository(tmp_path / "players.json", pending_file_path=tmp_path / "pending_players.json")
+
+
+def test_malformed_lines_are_rejected_without_aborting(tmp_path):
+    source = tmp_path / "jugadores.jsonl"
+    source.write_text("\n".join([_line(1), '{"alias": "roto"', _line(2), "[1, 2]", "", _line(3)]) + "\n",
+                      encoding="utf-8")
+    repo = _repo(tmp_path)
+
+    summary = import_players(repo, source, batch_size=1)
+
+    assert summary["imported"] == 3
+    assert sorted(summary["rejected"]) == [2, 4]
+    assert {p["alias"] for p in repo.get_all_dict().values()} == {"Piloto1", "Piloto2", "Piloto3"}
+    repo.close()
+
+
+def test_read_records_without_report_raises(tmp_path):
+    source = tmp_path / "jugadores.jsonl"
+    source.write_text(_line(1) + "\n" + "no es json\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(read_records(source))
+
+
+def test_export_round_trip(tmp_path):
+    source = tmp_path / "jugadores.jsonl"
+    source.write_text(_line(1) + "\n" + _line(2) + "\n", encoding="utf-8")
+    repo = _repo(tmp_path)
+    import_players(repo, source)
+
+    assert export_players(repo, tmp_path / "salida.csv") == 2
+    other = PlayerRepository(tmp_path / "otro.json", pending_file_path=tmp_path / "otro_pending.json")
+    assert import_players(other, tmp_path / "salida.csv")["imported"] == 2
+    repo.close()
+    other.close()
+
+
+def test_invalid_password_hashes_are_rejected(tmp_path):
+    source = tmp_path / "jugadores.jsonl"
+    lines = [_line(1), _line(2, "hash"), _line(3, HASH.replace("$04$", "$99$")),
+             _line(4, HASH.replace("$2b$", "$2y$")), _line(5, "$1$md5$abc")]
+    source.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    repo = _repo(tmp_path)
+
+    summary = import_players(repo, source)
+
+    assert summary["imported"] == 2
+    assert sorted(summary["rejected"]) == [2, 3, 5]
+    assert all("password_hash" in errors for errors in summary["rejected"].values())
+    repo.close()
+
+
+# Otro hilo (el mismo repositorio) u otro proceso (otro repositorio sobre los mismos datos)
+@pytest.mark.parametrize("same_repo", [True, False])
+def test_players_registered_during_import_are_reported(tmp_path, same_repo):
+    source = tmp_path / "jugadores.jsonl"
+    source.write_text("\n".join(_line(n) for n in range(1, 5)) + "\n", encoding="utf-8")
+    repo = _repo(tmp_path)
+    other = repo if same_repo else _repo(tmp_path)
+    add_players = repo.add_players
+
+    def racing_add_players(players, wait=False):
+        # Se registra Piloto2 entre la validación y el guardado
+        if other.get_player_by_alias("piloto2") is None:
+            other.add_player(Player.from_dict({"id": "otro", "alias": "PILOTO2", "full_name": "Otro",
+                                              "email": "otro@example.com", "password_hash": HASH}))
+        add_players(players, wait)
+
+    repo.add_players = racing_add_players
+    summary = import_players(repo, source)
+
+    assert summary["imported"] == 3
+    assert list(summary["rejected"]) == [2]
+    assert sorted(p["alias"] for p in repo.get_all_dict().values()) == ["PILOTO2", "Piloto1", "Piloto3", "Piloto4"]
+    repo.close()
+    other.close()
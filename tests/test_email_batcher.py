@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+from services.email_batcher import EmailBatcher
+
+
+class RejectingSender:
+    """Como Brevo: la llamada falla entera si algún destinatario es rechazado."""
+
+    def __init__(self, rejected=()):
+        self.rejected = set(rejected)
+        self.calls = []
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def enviar_lote(self, tipo, mensajes):
+        with self._lock:
+            self.calls.append(list(mensajes))
+            if any(destinatario in self.rejected for destinatario, _ in mensajes):
+                raise ValueError("destinatario rechazado")
+            self.sent.extend(mensajes)
+
+
+def test_failed_batch_only_fails_rejected_messages():
+    sender = RejectingSender(rejected={"malo@example.com"})
+    batcher = EmailBatcher(sender, window=10, max_batch=3)
+    futures = [batcher.submit("confirmacion", to, f"token-{to}")
+               for to in ("ana@example.com", "malo@example.com", "bo@example.com")]
+
+    assert futures[0].result(timeout=5) is None
+    assert futures[2].result(timeout=5) is None
+    with pytest.raises(ValueError):
+        futures[1].result(timeout=5)
+    batcher.close()
+
+    assert sorted(to for to, _ in sender.sent) == ["ana@example.com", "bo@example.com"]
+    # Un lote de tres que falla y un reintento por correo
+    assert [len(call) for call in sender.calls] == [3, 1, 1, 1]
+    stats = batcher.stats()
+    assert stats["split_batches"] == 1
+    assert stats["failed_batches"] == 2
+
+
+def test_failed_single_message_batch_is_not_resent():
+    sender = RejectingSender(rejected={"malo@example.com"})
+    batcher = EmailBatcher(sender, window=0.01)
+    with pytest.raises(ValueError):
+        batcher.enviar_correo_confirmacion("malo@example.com", "token")
+    batcher.close()
+    assert len(sender.calls) == 1
+    assert batcher.stats()["split_batches"] == 0
@@ -0,0 +1,126 @@
+import pytest
+
+from services.bootstrap import AppServices
+from services.email_outbox import EmailOutbox
+from services.email_sender import LocalEmailSender
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class AlwaysFails:
+    def enviar_correo_confirmacion(self, destinatario, token):
+        raise ConnectionError("sin red")
+
+    def enviar_codigo_recuperacion(self, destinatario, codigo):
+        raise ConnectionError("sin red")
+
+
+def _deliver_all(outbox):
+    # Sin hilos de entrega (start=False): un intento por mensaje pendiente
+    for message in [m for m in outbox._messages.values() if m["status"] == "pending"]:
+        outbox._deliver(message)
+
+
+def test_retries_until_delivered(tmp_path):
+    sender = LocalEmailSender(fallos=2)
+    outbox = EmailOutbox(sender, tmp_path / "outbox.json", base_delay=0.01, max_delay=0.02)
+    outbox.enviar_correo_confirmacion("ana@example.com", "token-1")
+    assert outbox.wait_idle(timeout=5)
+    outbox.close()
+    assert len(sender.enviados) == 1
+
+
+def test_dead_recovery_codes_are_redacted(tmp_path):
+    clock = FakeClock()
+    outbox = EmailOutbox(AlwaysFails(), tmp_path / "outbox.json", max_attempts=1, clock=clock, start=False)
+    outbox.enviar_codigo_recuperacion("ana@example.com", "123456")
+    confirmation_id = outbox.enviar_correo_confirmacion("bo@example.com", "token-secreto")
+    _deliver_all(outbox)
+
+    dead = {m["kind"]: m for m in outbox.dead_letters()}
+    assert dead["recuperacion"]["args"] is None
+    assert not outbox.retry_dead(dead["recuperacion"]["id"])
+    assert dead["confirmacion"]["args"] == ["token-secreto"]
+    outbox.close()
+    # Ni el snapshot ni el log guardan ya el código
+    on_disk = "".join(p.read_text(encoding="utf-8") for p in tmp_path.glob("outbox.json*")
+                      if not p.name.endswith(".lock"))
+    assert "123456" not in on_disk
+    assert "token-secreto" in on_disk
+
+    reopened = EmailOutbox(AlwaysFails(), tmp_path / "outbox.json", clock=clock, start=False)
+    assert reopened.retry_dead(confirmation_id)
+    assert reopened.pending_count() == 1
+    reopened.close()
+
+
+def test_dead_letters_expire_after_ttl(tmp_path):
+    clock = FakeClock()
+    outbox = EmailOutbox(AlwaysFails(), tmp_path / "outbox.json", max_attempts=1, clock=clock,
+                         start=False, dead_ttl=3600)
+    outbox.enviar_correo_confirmacion("bo@example.com", "token-secreto")
+    _deliver_all(outbox)
+
+    clock.now += 3599
+    assert outbox.expire_dead() == 0
+    clock.now += 1
+    assert outbox.expire_dead() == 1
+    assert outbox.dead_letters() == []
+    outbox.close()
+    assert not any("token-secreto" in p.read_text(encoding="utf-8") for p in tmp_path.glob("outbox.json*")
+                   if not p.name.endswith(".lock"))
+
+    reopened = EmailOutbox(AlwaysFails(), tmp_path / "outbox.json", clock=clock, start=False)
+    assert reopened.dead_letters() == []
+    reopened.close()
+
+
+def test_outbox_file_has_a_single_owner(tmp_path):
+    outbox = EmailOutbox(LocalEmailSender(), tmp_path / "outbox.json", start=False)
+    with pytest.raises(RuntimeError):
+        EmailOutbox(LocalEmailSender(), tmp_path / "outbox.json", start=False)
+    outbox.close()
+    outbox.close()
+
+    EmailOutbox(LocalEmailSender(), tmp_path / "outbox.json", start=False).close()
+
+
+def test_each_worker_gets_its_own_outbox_and_adopts_orphans(tmp_path):
+    first = EmailOutbox.open_for_worker(AlwaysFails(), tmp_path / "outbox.json", start=False)
+    second = EmailOutbox.open_for_worker(AlwaysFails(), tmp_path / "outbox.json", start=False)
+    assert (first.path.name, second.path.name) == ("outbox.json", "outbox.1.json")
+    second.enviar_correo_confirmacion("bo@example.com", "token-1")
+    # El archivo de un worker activo no se toca
+    assert first.adopt_orphans() == 0
+
+    second.close()
+    assert first.adopt_orphans() == 1
+    assert first.pending_count() == 1
+    assert first.adopt_orphans() == 0
+    first.close()
+
+    # Lo adoptado ya es del primer archivo: un worker nuevo lo vuelve a tener
+    reopened = EmailOutbox.open_for_worker(LocalEmailSender(), tmp_path / "outbox.json", start=False)
+    assert reopened.path.name == "outbox.json"
+    assert reopened.pending_count() == 1
+    _deliver_all(reopened)
+    assert reopened.sender.enviados and reopened.pending_count() == 0
+    orphan = EmailOutbox(LocalEmailSender(), tmp_path / "outbox.1.json", start=False)
+    assert orphan.pending_count() == 0
+    orphan.close()
+    reopened.close()
+
+
+def test_two_app_services_share_a_data_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("EMAIL_SENDER", "local")
+    first = AppServices(tmp_path, "json")
+    second = AppServices(tmp_path, "json")
+    assert first.email_outbox.path != second.email_outbox.path
+    second.close()
+    first.close()
@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+from src.core.player import Player
+from src.data.group_commit import GroupCommitter
+from src.data.persistence import PlayerRepository
+
+
+def _player(alias="Piloto"):
+    return Player.from_dict({"id": "p1", "alias": alias, "full_name": "Piloto Uno",
+                             "email": "piloto@example.com", "password_hash": ""})
+
+
+def _repo(tmp_path, **kwargs):
+    return PlayerRepository(tmp_path / "players.json", pending_file_path=tmp_path / "pending_players.json",
+                            journal=True, **kwargs)
+
+
+def test_wait_returns_once_ticket_is_flushed():
+    flushed = []
+    committer = GroupCommitter(flushed.append, delay=0.01)
+    ticket = committer.mark_dirty(["a", "b"])
+    assert committer.wait(ticket, timeout=5)
+    assert sorted(key for batch in flushed for key in batch) == ["a", "b"]
+    committer.close()
+
+
+def test_future_resolves_with_the_batch():
+    calls = []
+
+    def flush_fn(keys):
+        calls.append(keys)
+        if len(calls) == 1:
+            raise OSError("disco lleno")
+
+    # Sin reintentos: el primer fallo ya llega a las esperas del lote
+    committer = GroupCommitter(flush_fn, delay=60, max_retries=0)
+    failed = committer.future(committer.mark_dirty(["a"]))
+    with pytest.raises(OSError):
+        committer.flush()
+    assert isinstance(failed.exception(timeout=5), OSError)
+
+    saved = committer.future(committer.mark_dirty(["b"]))
+    committer.flush()
+    assert saved.result(timeout=5) is None
+    # Un ticket ya persistido da un Future resuelto
+    assert committer.future(1).done()
+    committer.close()
+
+
+def test_failure_only_reaches_its_own_batch():
+    calls = []
+
+    def flush_fn(keys):
+        calls.append(keys)
+        if len(calls) == 1:
+            raise OSError("disco lleno")
+
+    committer = GroupCommitter(flush_fn, delay=0.01, max_retries=0)
+    first = committer.mark_dirty(["a"])
+    with pytest.raises(OSError):
+        committer.wait(first, timeout=5)
+    # El lote siguiente no hereda el error del anterior (y reintenta "a")
+    second = committer.mark_dirty(["b"])
+    assert committer.wait(second, timeout=5)
+    assert sorted(calls[1]) == ["a", "b"]
+    with pytest.raises(OSError):
+        committer.wait(first)
+    assert committer.future(second).result(timeout=5) is None
+    committer.close()
+
+
+def test_persistent_failure_backs_off_then_fails_waiters():
+    times = []
+
+    def flush_fn(keys):
+        times.append(time.monotonic())
+        raise OSError("disco lleno")
+
+    committer = GroupCommitter(flush_fn, delay=0.01, max_retries=3, retry_delay=0.05)
+    waiter = committer.future(committer.mark_dirty(["a"]))
+    assert isinstance(waiter.exception(timeout=5), OSError)
+    assert len(times) == 4
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    for gap, backoff in zip(gaps, (0.05, 0.1, 0.2)):
+        assert gap >= backoff
+    # Agotados los reintentos no sigue golpeando el disco hasta un cambio nuevo
+    time.sleep(0.3)
+    assert len(times) == 4
+    retry = committer.future(committer.mark_dirty(["b"]))
+    assert isinstance(retry.exception(timeout=5), OSError)
+    assert len(times) == 8
+    committer.close()
+
+
+def test_update_during_flush_is_not_lost(tmp_path):
+    repo = _repo(tmp_path, commit_delay=0.01)
+    player = _player()
+    repo.add_player(player, wait=True)
+
+    started, release = threading.Event(), threading.Event()
+    save_players = repo.storage.save_players
+
+    def slow_save(changed, snapshot):
+        started.set()
+        release.wait(5)
+        save_players(changed, snapshot)
+
+    repo.storage.save_players = slow_save
+    player.alias = "PrimerAlias"
+    repo.update_player_info(player)
+    assert started.wait(5)
+    # El mismo objeto se vuelve a modificar mientras el primer guardado sigue en curso
+    player.alias = "SegundoAlias"
+    repo.update_player_info(player)
+    release.set()
+    repo.flush()
+    repo.close()
+
+    reopened = _repo(tmp_path)
+    assert reopened.get_player_by_id("p1").alias == "SegundoAlias"
+    reopened.close()
@@ -0,0 +1,91 @@
+import json
+
+from src.data.journal import JournalStore
+
+
+def _store(tmp_path, **kwargs):
+    kwargs.setdefault("fsync", False)
+    kwargs.setdefault("background_compaction", False)
+    return JournalStore(tmp_path / "players.json", **kwargs)
+
+
+def test_replay_rebuilds_state_from_log(tmp_path):
+    store = _store(tmp_path)
+    store.load()
+    store.append([("put", "a", {"id": "a", "n": 1}), ("put", "b", {"id": "b", "n": 1})])
+    store.append([("put", "a", {"id": "a", "n": 2}), ("del", "b", None)])
+    store.close()
+
+    assert _store(tmp_path).load() == {"a": {"id": "a", "n": 2}}
+
+
+def test_torn_tail_is_ignored_and_truncated(tmp_path):
+    store = _store(tmp_path)
+    store.load()
+    store.append([("put", "a", {"id": "a"})])
+    store.close()
+    size = store.log_path.stat().st_size
+    with open(store.log_path, "ab") as f:
+        f.write(b'{"op":"put","id":"b","da')
+
+    reopened = _store(tmp_path)
+    assert reopened.load() == {"a": {"id": "a"}}
+    assert store.log_path.stat().st_size == size
+
+    # Lo siguiente no queda pegado a la línea rota
+    reopened.append([("put", "c", {"id": "c"})])
+    reopened.close()
+    assert set(_store(tmp_path).load()) == {"a", "c"}
+
+
+def test_compaction_writes_snapshot_and_drops_log(tmp_path):
+    store = _store(tmp_path, compact_threshold=2)
+    state = store.load()
+    ops = [("put", "a", {"id": "a"}), ("put", "b", {"id": "b"})]
+    store.append(ops)
+    for _, key, record in ops:
+        state[key] = record
+    assert store.needs_compaction()
+
+    store.maybe_compact(lambda: dict(state))
+
+    assert not store.log_path.exists()
+    assert not store.rotated_log_path.exists()
+    with open(store.snapshot_path, encoding="utf-8") as f:
+        assert json.load(f) == state
+    store.append([("del", "a", None)])
+    store.close()
+    assert _store(tmp_path).load() == {"b": {"id": "b"}}
+
+
+def test_interrupted_compaction_replays_rotated_log_first(tmp_path):
+    store = _store(tmp_path)
+    store.load()
+    store.append([("put", "a", {"id": "a", "n": 1})])
+    store.close()
+    # Compactación cortada tras rotar el log: lo nuevo va a un log nuevo
+    store.log_path.rename(store.rotated_log_path)
+    with open(store.log_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"op": "put", "id": "a", "data": {"id": "a", "n": 2}}) + "\n")
+
+    assert _store(tmp_path).load() == {"a": {"id": "a", "n": 2}}
+
+
+def test_poll_delivers_changes_from_another_writer(tmp_path):
+    seen = []
+    reader = _store(tmp_path, on_changes=lambda full, records: seen.append((full, records)))
+    reader.load()
+    writer = _store(tmp_path)
+    writer.load()
+
+    writer.append([("put", "a", {"id": "a"}), ("del", "b", None)])
+    assert reader.poll()
+    assert seen == [(False, {"a": {"id": "a"}, "b": None})]
+    assert not reader.poll()
+
+    # Si el otro compacta, se recarga todo
+    writer.compact(lambda: {"a": {"id": "a"}, "z": {"id": "z"}})
+    assert reader.poll()
+    assert seen[-1] == (True, {"a": {"id": "a"}, "z": {"id": "z"}})
+    reader.close()
+    writer.close()
@@ -0,0 +1,92 @@
+from datetime import datetime
+
+from src.data.hall_of_fame import HallOfFameEntry
+from src.data.leaderboard import LeaderboardEngine
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _entry(name, score, difficulty=0, date="2025-11-14 10:00:00"):
+    return HallOfFameEntry(name, score, difficulty, date)
+
+
+def _names(entries):
+    return [entry.player_name for entry in entries]
+
+
+def _engine(tmp_path, **kwargs):
+    return LeaderboardEngine(tmp_path / "score_history.jsonl", fsync=False, **kwargs)
+
+
+def test_ranking_per_difficulty(tmp_path):
+    engine = _engine(tmp_path, board_size=2)
+    placed = engine.submit_many([_entry("ana", 10, 0), _entry("bo", 30, 1), _entry("cy", 20, 0),
+                                 _entry("di", 5, 0)])
+    assert _names(engine.top_by_difficulty(0)) == ["cy", "ana"]
+    assert _names(engine.top_by_difficulty(1)) == ["bo"]
+    assert _names(engine.top_global()) == ["bo", "cy"]
+    # di no entra en ningún ranking de dificultad ni global
+    assert ("difficulty", 0) not in placed[3] and ("global",) not in placed[3]
+    assert engine.get_rank_for_score(("difficulty", 2), 1) == 1
+    engine.close()
+
+
+def test_player_best_score(tmp_path):
+    engine = _engine(tmp_path)
+    engine.submit(_entry("Ana", 10))
+    engine.submit(_entry("ANA", 50))
+    engine.submit(_entry("ana", 20))
+    engine.submit(_entry("bo", 30))
+    assert engine.get_player_best("ana").score == 50
+    # Un solo puesto por jugador, con su mejor score
+    assert [(e.player_name, e.score) for e in engine.top_players()] == [("ANA", 50), ("bo", 30)]
+    assert engine.get_player_best("nadie") is None
+    engine.close()
+
+
+def test_ties_keep_the_oldest_first(tmp_path):
+    engine = _engine(tmp_path, board_size=2)
+    engine.submit_many([_entry("ana", 10), _entry("bo", 10), _entry("cy", 10)])
+    assert _names(engine.top_global()) == ["ana", "bo"]
+    # Un empate con el último no entra
+    assert engine.get_rank_for_score(("global",), 10) is None
+    assert engine.get_rank_for_score(("global",), 11) == 1
+    engine.close()
+
+
+def test_period_rollover(tmp_path):
+    clock = FakeClock(datetime(2025, 11, 16, 12, 0))  # domingo, semana 2025-W46
+    engine = _engine(tmp_path, daily_retention=2, clock=clock)
+    engine.submit(_entry("ana", 10, date="2025-11-16 09:00:00"))
+    assert _names(engine.top_daily()) == ["ana"]
+    assert _names(engine.top_weekly()) == ["ana"]
+
+    # Lunes: día y semana nuevos empiezan vacíos
+    clock.now = datetime(2025, 11, 17, 8, 0)
+    assert engine.top_daily() == () and engine.top_weekly() == ()
+    engine.submit(_entry("bo", 5, date="2025-11-17 08:00:00"))
+    assert _names(engine.top_daily()) == ["bo"]
+    assert _names(engine.top_weekly("2025-W46")) == ["ana"]
+
+    # Con retención de 2 días, el tercero descarta el más viejo y un score atrasado no lo revive
+    engine.submit(_entry("cy", 7, date="2025-11-18 08:00:00"))
+    assert engine.top_daily("2025-11-16") == ()
+    assert engine.submit(_entry("di", 99, date="2025-11-16 10:00:00")).get(("daily", "2025-11-16")) is None
+    assert _names(engine.top_global()) == ["di", "ana", "cy", "bo"]
+    engine.close()
+
+
+def test_history_is_replayed_on_start(tmp_path):
+    engine = _engine(tmp_path)
+    engine.submit_many([_entry("ana", 10, 1), _entry("bo", 20, 1)])
+    engine.close()
+    reopened = _engine(tmp_path)
+    assert reopened.total_scores == 2
+    assert _names(reopened.top_by_difficulty(1)) == ["bo", "ana"]
+    reopened.close()
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from src.core.password_hasher import PasswordHasher, hash_rounds
+
+
+@pytest.fixture
+def hasher():
+    # Sin pool (max_workers=0): todo corre en el hilo del test
+    hasher = PasswordHasher(rounds=5, max_workers=0)
+    yield hasher
+    hasher.close()
+
+
+def test_hash_and_verify(hasher):
+    hashed = hasher.hash("Clave123!")
+    assert hash_rounds(hashed) == 5
+    assert hasher.verify("Clave123!", hashed)
+    assert not hasher.verify("otra", hashed)
+    assert asyncio.run(hasher.verify_async("Clave123!", hashed))
+
+
+def test_rehash_on_upgrade(hasher):
+    old = PasswordHasher(rounds=4, max_workers=0).hash("Clave123!")
+    assert hasher.needs_rehash(old)
+    ok, new_hash = hasher.verify_and_update("Clave123!", old)
+    assert ok and hash_rounds(new_hash) == 5
+    assert hasher.verify("Clave123!", new_hash)
+    # Contraseña incorrecta: no se rehashea
+    assert hasher.verify_and_update("otra", old) == (False, None)
+
+
+def test_no_rehash_on_downgrade(hasher):
+    stronger = PasswordHasher(rounds=6, max_workers=0).hash("Clave123!")
+    assert not hasher.needs_rehash(stronger)
+    assert hasher.verify_and_update("Clave123!", stronger) == (True, None)
+    assert hasher.verify_and_update("Clave123!", hasher.hash("Clave123!")) == (True, None)
+
+
+def test_max_workers_zero_runs_inline(hasher):
+    future = hasher.submit_hash("Clave123!")
+    # Sin pool el Future ya viene resuelto y no se crea ningún executor
+    assert future.done()
+    assert hasher._pool() is None
+    failed = hasher.submit_verify("Clave123!", "no-es-un-hash")
+    assert failed.done() and isinstance(failed.exception(), ValueError)
+
+
+def test_rounds_out_of_range():
+    with pytest.raises(ValueError):
+        PasswordHasher(rounds=3)
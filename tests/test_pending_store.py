@@ -0,0 +1,66 @@
+import json
+
+from src.data.pending_store import PendingRegistrationStore
+
+
+def _pending(token, alias, created_at=None):
+    record = {"alias": alias, "email": f"{alias}@example.com", "token": token}
+    if created_at is not None:
+        record["created_at"] = created_at
+    return record
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_open_without_expired_records_does_not_rewrite_file(tmp_path):
+    path = tmp_path / "pending_players.json"
+    # Registros antiguos: sin created_at y con alias repetido
+    content = json.dumps([_pending("t1", "ana"), _pending("t2", "ana"), _pending("t3", "bo")], indent=2)
+    path.write_text(content, encoding="utf-8")
+
+    store = PendingRegistrationStore(path, sweep_interval=None)
+
+    assert path.read_text(encoding="utf-8") == content
+    assert store.get("t1") is None
+    assert store.get("t2")["alias"] == "ana"
+    assert len(store) == 2
+    store.close()
+
+
+def test_open_rewrites_file_only_when_records_expired(tmp_path):
+    path = tmp_path / "pending_players.json"
+    clock = FakeClock(10_000.0)
+    path.write_text(json.dumps([_pending("old", "ana", created_at=0.0),
+                                _pending("new", "bo", created_at=9_999.0)]), encoding="utf-8")
+
+    store = PendingRegistrationStore(path, ttl_seconds=100, sweep_interval=None, clock=clock)
+    store.close()
+
+    assert [r["token"] for r in json.loads(path.read_text(encoding="utf-8"))] == ["new"]
+
+
+def test_sweep_removes_only_expired_records(tmp_path):
+    clock = FakeClock()
+    store = PendingRegistrationStore(tmp_path / "pending_players.json", ttl_seconds=100,
+                                     sweep_interval=None, clock=clock)
+    store.add(_pending("a", "ana"))
+    clock.now += 60
+    store.add(_pending("b", "bo"))
+
+    clock.now += 50
+    assert store.get("a") is None
+    assert store.evict_expired() == 1
+    assert store.get("b") is not None
+    assert store.evict_expired() == 0
+    store.close()
+
+    reopened = PendingRegistrationStore(tmp_path / "pending_players.json", ttl_seconds=100,
+                                        sweep_interval=None, clock=clock)
+    assert [r["token"] for r in reopened.records()] == ["b"]
+    reopened.close()
@@ -0,0 +1,66 @@
+from src.core.player import Player
+from src.data.lazy_storage import LazyJsonPlayerStorage
+from src.data.persistence import PlayerRepository
+
+
+def _player(n, alias=None, full_name=None):
+    return Player.from_dict({"id": f"p{n:03d}", "alias": alias or f"Piloto{n:03d}",
+                             "full_name": full_name or f"Nombre {n:03d}",
+                             "email": f"p{n}@example.com", "password_hash": ""})
+
+
+def _ids(players):
+    return [p._id for p in players]
+
+
+def test_lazy_search_uses_index_without_decoding(tmp_path):
+    repo = PlayerRepository(tmp_path / "players.json", pending_file_path=tmp_path / "pending_players.json")
+    repo.add_players([_player(n) for n in range(50)] + [_player(99, "Zeta", "Ana Zamora")])
+    repo.close()
+
+    storage = LazyJsonPlayerStorage(tmp_path / "players.json", tmp_path / "pending_players.json")
+
+    def fail(player_id):
+        raise AssertionError("search_prefix no debe decodificar registros")
+
+    get_player, storage.get_player = storage.get_player, fail
+    assert storage.search_prefix("piloto01", 5) == [f"p{n:03d}" for n in range(10, 15)]
+    assert storage.search_prefix("zam", 5) == ["p099"]
+    storage.get_player = get_player
+
+    # Guardar reindexa: el alias viejo ya no aparece
+    storage.save_players([dict(get_player("p099"), alias="Omega")], dict)
+    assert storage.search_prefix("zeta", 5) == []
+    assert storage.search_prefix("omega", 5) == ["p099"]
+    storage.close()
+
+
+def test_search_merges_unsaved_players_without_flushing(tmp_path):
+    repo = PlayerRepository(tmp_path / "players.json", pending_file_path=tmp_path / "pending_players.json",
+                            lazy=True, commit_delay=60)
+    repo.add_players([_player(n) for n in range(0, 40, 2)])
+    repo.flush()
+    saves = []
+    save_players = repo.storage.save_players
+    repo.storage.save_players = lambda changed, snapshot: (saves.append(len(changed)),
+                                                           save_players(changed, snapshot))
+
+    # Altas nuevas y un renombre, todavía sin escribir
+    repo.add_players([_player(n) for n in range(1, 40, 2)])
+    renamed = repo.get_player_by_id("p004")
+    renamed.alias = "Zulu"
+    repo.update_player_info(renamed)
+
+    first = repo.search_players("piloto", limit=10)
+    second = repo.search_players("piloto", limit=10, offset=10)
+    assert saves == []
+    expected = [f"p{n:03d}" for n in range(40) if n != 4]
+    assert _ids(first) + _ids(second) == expected[:20]
+    assert _ids(repo.search_players("zu")) == ["p004"]
+    assert _ids(repo.search_players("nombre 004")) == ["p004"]
+
+    repo.close()
+    reopened = PlayerRepository(tmp_path / "players.json", pending_file_path=tmp_path / "pending_players.json",
+                                lazy=True)
+    assert _ids(reopened.search_players("piloto", limit=40)) == expected
+    reopened.close()
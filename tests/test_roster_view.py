@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from src.core.player import Player
+from src.data.persistence import PlayerRepository
+
+
+def _player(n):
+    return Player.from_dict({"id": f"p{n}", "alias": f"Piloto{n}", "full_name": f"Piloto {n}",
+                             "email": f"p{n}@example.com", "password_hash": ""})
+
+
+def test_snapshot_copy_waits_for_view_updates(tmp_path):
+    repo = PlayerRepository(tmp_path / "players.json", pending_file_path=tmp_path / "pending_players.json")
+    for n in range(100):
+        repo._register(_player(n))
+    result = []
+
+    # Mientras otro hilo actualiza la vista (con el lock), la copia espera
+    with repo._view_lock:
+        copier = threading.Thread(target=lambda: result.append(repo._snapshot_dict()))
+        copier.start()
+        copier.join(0.1)
+        assert copier.is_alive()
+        repo._players["p0"].alias = "Cambiado"
+        repo._stale_view.add("p0")
+    copier.join(5)
+
+    assert len(result[0]) == 100
+    assert result[0]["p0"]["alias"] == "Cambiado"
+    repo.close()
+
+
+def test_get_all_dict_reflects_updates(tmp_path):
+    repo = PlayerRepository(tmp_path / "players.json", pending_file_path=tmp_path / "pending_players.json")
+    player = _player(1)
+    repo.add_player(player)
+    assert repo.get_all_dict()["p1"]["alias"] == "Piloto1"
+    player.alias = "Renombrado"
+    repo.update_player_info(player)
+    assert repo.get_all_dict()["p1"]["alias"] == "Renombrado"
+    assert repo._snapshot_dict() == repo.get_all_dict()
+    repo.close()
+
+
+def test_get_all_dict_is_a_read_only_snapshot(tmp_path):
+    repo = PlayerRepository(tmp_path / "players.json", pending_file_path=tmp_path / "pending_players.json")
+    repo.add_player(_player(1))
+    roster = repo.get_all_dict()
+    with pytest.raises(TypeError):
+        roster["p9"] = {}
+    with pytest.raises(TypeError):
+        roster["p1"]["alias"] = "Otro"
+    # Sin cambios se reutiliza la misma foto
+    assert repo.get_all_dict() is roster
+
+    player = repo.get_player_by_id("p1")
+    player.alias = "Renombrado"
+    repo.update_player_info(player)
+    repo.add_player(_player(2))
+    # La foto anterior no cambia; la nueva sí
+    assert list(roster) == ["p1"] and roster["p1"]["alias"] == "Piloto1"
+    assert repo.get_all_dict()["p1"]["alias"] == "Renombrado"
+    assert len(repo.get_all_dict()) == 2
+    repo.close()
+
+
+def test_get_all_dict_can_be_iterated_while_registering(tmp_path):
+    repo = PlayerRepository(tmp_path / "players.json", pending_file_path=tmp_path / "pending_players.json")
+    repo.add_players([_player(n) for n in range(200)])
+    stop = threading.Event()
+
+    def registrar():
+        n = 200
+        while not stop.is_set() and n < 400:
+            repo.add_player(_player(n))
+            n += 1
+
+    writer = threading.Thread(target=registrar)
+    writer.start()
+    try:
+        for _ in range(50):
+            roster = repo.get_all_dict()
+            size = len(roster)
+            assert sum(1 for _ in roster.items()) == size
+    finally:
+        stop.set()
+        writer.join(10)
+    repo.close()
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from services import server
+from services.bootstrap import AppServices
+from services.score_service import ScoreService
+from src.data.hall_of_fame import HallOfFameRepository
+from src.data.leaderboard import LeaderboardEngine
+
+
+def _score(name, score, difficulty=0):
+    return {"player_name": name, "score": score, "difficulty": difficulty}
+
+
+class FailOnce:
+    """Envuelve una función para que la primera llamada falle."""
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.failed = False
+
+    def __call__(self, *args):
+        if not self.failed:
+            self.failed = True
+            raise OSError("disco lleno")
+        return self.fn(*args)
+
+
+def test_failed_save_is_retried_without_reinserting(tmp_path):
+    leaderboard = LeaderboardEngine(tmp_path / "score_history.jsonl", fsync=False)
+    hall_of_fame = HallOfFameRepository(tmp_path / "hall_of_fame.json", leaderboard=leaderboard)
+    service = ScoreService(hall_of_fame, flush_interval=60)
+    hall_of_fame._save_entries = FailOnce(hall_of_fame._save_entries)
+
+    service.submit([_score("ana", 10), _score("bo", 20)])
+    with pytest.raises(OSError):
+        service.flush()
+    assert service.pending_count() == 0
+    assert hall_of_fame.unsaved
+
+    assert service.flush() == 0
+    service.close()
+    assert not hall_of_fame.unsaved
+    saved = json.loads((tmp_path / "hall_of_fame.json").read_text(encoding="utf-8"))
+    assert [entry["player_name"] for entry in saved] == ["bo", "ana"]
+    assert len((tmp_path / "score_history.jsonl").read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_batch_is_requeued_when_it_never_reached_the_ranking(tmp_path):
+    leaderboard = LeaderboardEngine(tmp_path / "score_history.jsonl", fsync=False)
+    hall_of_fame = HallOfFameRepository(tmp_path / "hall_of_fame.json", leaderboard=leaderboard)
+    service = ScoreService(hall_of_fame, flush_interval=60)
+    leaderboard.submit_many = FailOnce(leaderboard.submit_many)
+
+    service.submit([_score("ana", 10)])
+    with pytest.raises(OSError):
+        service.flush()
+    assert service.pending_count() == 1
+    assert service.flush() == 1
+    service.close()
+    assert [entry.player_name for entry in hall_of_fame.get_top()] == ["ana"]
+
+
+def test_hall_of_fame_revalidation(tmp_path, monkeypatch):
+    monkeypatch.setenv("EMAIL_SENDER", "local")
+    services = AppServices(tmp_path, "json", scores=True)
+    client = server.create_app(services).test_client()
+    services.score_service.submit([_score("ana", 10)])
+    services.score_service.flush()
+
+    first = client.get("/salon-de-la-fama")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "no-cache"
+    assert [entry["player_name"] for entry in first.get_json()] == ["ana"]
+
+    revalidated = client.get("/salon-de-la-fama", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
+
+    # Un score nuevo en el top cambia el ETag
+    assert client.post("/puntajes", json=_score("bo", 50)).status_code == 202
+    services.score_service.flush()
+    changed = client.get("/salon-de-la-fama", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert [entry["player_name"] for entry in changed.get_json()] == ["bo", "ana"]
+
+    assert client.get("/salon-de-la-fama?limit=0").status_code == 400
+    services.close()
+
+
+def test_app_services_feed_the_leaderboard(tmp_path, monkeypatch):
+    monkeypatch.setenv("EMAIL_SENDER", "local")
+    services = AppServices(tmp_path, "json", scores=True)
+    services.score_service.submit([_score("ana", 10, 2), _score("bo", 5, 2)])
+    services.score_service.flush()
+    assert [entry.player_name for entry in services.leaderboard.top_by_difficulty(2)] == ["ana", "bo"]
+    services.close()
+    assert len((tmp_path / "score_history.jsonl").read_text(encoding="utf-8").splitlines()) == 2
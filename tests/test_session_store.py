@@ -0,0 +1,71 @@
+import pytest
+
+from src.data.session_store import SessionStore, _b64, _unb64
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def store(clock):
+    return SessionStore(ttl_seconds=60, secret=b"clave", clock=clock)
+
+
+def test_valid_token(store):
+    token = store.issue("p1")
+    assert store.validate(token) == "p1"
+
+
+def test_tampered_signature_or_payload(store):
+    token = store.issue("p1")
+    payload, signature = token.split(".")
+    forged = bytes([_unb64(signature)[0] ^ 1]) + _unb64(signature)[1:]
+    assert store.validate(f"{payload}.{_b64(forged)}") is None
+    # Otro jugador con la firma original
+    other = _b64(_unb64(payload).replace(b":p1:", b":p2:"))
+    assert store.validate(f"{other}.{signature}") is None
+
+
+def test_expired_token(store, clock):
+    token = store.issue("p1")
+    clock.now += 59
+    assert store.validate(token) == "p1"
+    clock.now += 1
+    assert store.validate(token) is None
+    store.evict_expired()
+    assert len(store) == 0
+
+
+def test_revoked_tokens(store):
+    first, second, other = store.issue("p1"), store.issue("p1"), store.issue("p2")
+    store.revoke(first)
+    assert store.validate(first) is None
+    assert store.validate(second) == "p1"
+    assert store.revoke_player("p1") == 1
+    assert store.validate(second) is None
+    assert store.validate(other) == "p2"
+
+
+@pytest.mark.parametrize("token", [None, "", "sin-separador", "a.b.c", "%%%.$$$", "YQ.YQ", "!!.!!"])
+def test_malformed_tokens(store, token):
+    assert store.validate(token) is None
+    store.revoke(token)  # no lanza
+
+
+def test_secret_rotation(store):
+    token = store.issue("p1")
+    store.rotate_secret(b"otra-clave")
+    assert store.validate(token) is None
+    assert store.validate(store.issue("p1")) == "p1"
+    # Otro proceso con otra clave no acepta el token (ni conoce la sesión)
+    assert SessionStore(secret=b"clave").validate(token) is None
@@ -0,0 +1,158 @@
+import json
+import logging
+import uuid
+
+import pytest
+
+from services.bootstrap import PLAYER_STORAGES, AppServices, build_repository
+from src.core.player import Player
+from src.data.lazy_storage import LazyJsonPlayerStorage
+from src.data.migrate_to_sqlite import logger as migrate_logger, migrate
+from src.data.sqlite_storage import SQLitePlayerStorage
+from src.data.storage import DuplicatePlayerError, IndexedPlayerStorage, JsonPlayerStorage
+
+
+def _record(n):
+    return {"id": f"id-{n}", "alias": f"Piloto{n}", "full_name": f"Piloto {n}", "email": f"p{n}@example.com",
+            "password_hash": "", "profile_picture": "", "spaceship_image": "", "favorite_music": []}
+
+
+def test_indexed_backends_must_implement_lookups():
+    class Incomplete(IndexedPlayerStorage):
+        def load_players(self):
+            return {}
+
+        def save_players(self, changed, snapshot):
+            pass
+
+        def add_pending(self, record):
+            pass
+
+        def get_pending(self, token):
+            return None
+
+        def remove_pending(self, token):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+    assert issubclass(SQLitePlayerStorage, IndexedPlayerStorage)
+    assert issubclass(LazyJsonPlayerStorage, IndexedPlayerStorage)
+    assert not JsonPlayerStorage.indexed
+
+
+def test_migration_leaves_sources_untouched(tmp_path):
+    players = tmp_path / "players.json"
+    players.write_text(json.dumps({"id-1": _record(1)}), encoding="utf-8")
+    log = tmp_path / "players.json.log"
+    torn = json.dumps({"op": "put", "id": "id-2", "data": _record(2)}) + "\n" + '{"op":"put","id":"id-3"'
+    log.write_text(torn, encoding="utf-8")
+    pending = tmp_path / "pending_players.json"
+    pending.write_text("[]", encoding="utf-8")
+    before = sorted(p.name for p in tmp_path.iterdir())
+
+    summary = migrate(players, pending, tmp_path / "players.db")
+
+    assert summary["players"] == 2
+    assert log.read_text(encoding="utf-8") == torn
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(before + ["players.db"])
+
+
+class _Records(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_migration_logs_skipped_duplicates(tmp_path, capsys):
+    players = tmp_path / "players.json"
+    duplicate = dict(_record(2), alias="PILOTO1")
+    players.write_text(json.dumps([_record(1), duplicate]), encoding="utf-8")
+    pending = tmp_path / "pending_players.json"
+    pending.write_text("[]", encoding="utf-8")
+    handler = _Records()
+    migrate_logger.addHandler(handler)
+    try:
+        summary = migrate(players, pending, tmp_path / "players.db")
+    finally:
+        migrate_logger.removeHandler(handler)
+
+    assert summary["skipped_players"] == 1
+    # Se avisa por el log, no por stdout
+    assert capsys.readouterr().out == ""
+    assert [(r.levelno, r.fields["player_id"]) for r in handler.records] == [(logging.WARNING, "id-2")]
+
+
+def _player(alias, email):
+    return Player.from_dict({"id": str(uuid.uuid4()), "alias": alias, "full_name": "Piloto",
+                             "email": email, "password_hash": ""})
+
+
+@pytest.mark.parametrize("storage", PLAYER_STORAGES)
+def test_uniqueness_is_checked_again_on_write(tmp_path, storage):
+    # Dos procesos sobre los mismos datos: el segundo no leyó el alta del primero
+    first = build_repository(tmp_path, storage, refresh_interval=None)
+    second = build_repository(tmp_path, storage, refresh_interval=None)
+    first.add_player(_player("piloto", "a@example.com"))
+    with pytest.raises(ValueError):
+        second.add_player(_player("PILOTO", "b@example.com"))
+    with pytest.raises(ValueError):
+        second.add_player(_player("otro", "A@example.com"))
+    second.add_player(_player("libre", "c@example.com"))
+
+    assert second.get_player_by_alias("piloto")._id == first.get_player_by_alias("piloto")._id
+    first.close()
+    second.close()
+    reopened = build_repository(tmp_path, storage)
+    assert sorted(p["alias"] for p in reopened.get_all_dict().values()) == ["libre", "piloto"]
+    reopened.close()
+
+
+# SQLite no entra: la validación en memoria ya consulta la base al día
+@pytest.mark.parametrize("storage", ["json", "journal", "lazy"])
+def test_group_commit_discards_only_conflicting_players(tmp_path, storage):
+    first = build_repository(tmp_path, storage, refresh_interval=None)
+    second = build_repository(tmp_path, storage, commit_delay=0.01, refresh_interval=None)
+    first.add_player(_player("piloto", "a@example.com"))
+    second.add_players([_player("PILOTO", "b@example.com"), _player("libre", "c@example.com")])
+    second.flush()
+    assert second.get_player_by_alias("libre") is not None
+    assert second.get_player_by_email("b@example.com") is None
+
+    # Quien espera el guardado recibe el error con los ids rechazados
+    first.add_player(_player("nuevo", "d@example.com"))
+    rejected = _player("Nuevo", "e@example.com")
+    with pytest.raises(DuplicatePlayerError) as error:
+        second.add_players([rejected, _player("otro", "f@example.com")], wait=True)
+    assert error.value.player_ids == [rejected._id]
+    first.close()
+    second.close()
+    reopened = build_repository(tmp_path, storage)
+    assert sorted(p["alias"] for p in reopened.get_all_dict().values()) == ["libre", "nuevo", "otro", "piloto"]
+    reopened.close()
+
+
+def test_rejected_confirmation_keeps_the_pending_record(tmp_path):
+    first = build_repository(tmp_path, "json", refresh_interval=None)
+    second = build_repository(tmp_path, "json", refresh_interval=None)
+    second.add_pending_player(dict(_player("PILOTO", "b@example.com").to_dict(), token="t1"))
+    first.add_player(_player("piloto", "a@example.com"))
+    with pytest.raises(ValueError):
+        second.confirm_pending_player(second.get_pending_player_by_token("t1"))
+    assert second.get_pending_player_by_token("t1") is not None
+    first.close()
+    second.close()
+
+
+def test_services_see_other_workers_registrations(tmp_path, monkeypatch):
+    monkeypatch.setenv("EMAIL_SENDER", "local")
+    monkeypatch.setenv("PLAYER_REFRESH_INTERVAL", "0")
+    services = AppServices(tmp_path, "json")
+    other = build_repository(tmp_path, "json")
+    other.add_player(_player("piloto", "a@example.com"))
+    assert services.repo.get_player_by_alias("PILOTO") is not None
+    other.close()
+    services.close()
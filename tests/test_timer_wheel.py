@@ -0,0 +1,129 @@
+import math
+import random
+
+import pytest
+
+from src.core.player import Player
+from src.data.persistence import PlayerRepository
+from src.data.recovery_codes import RecoveryCodeStore
+from src.data.timer_wheel import TimerWheel
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_timers_expire_never_early_and_at_most_one_tick_late(seed):
+    rng = random.Random(seed)
+    resolution = 0.5
+    # Rueda chica (horizonte de 8**3 ticks) para pasar por cascadas y por más allá del horizonte
+    wheel = TimerWheel(0.0, resolution=resolution, slots=8, levels=3)
+    deadlines = {}  # clave -> (vencimiento pedido, instante en que vence en la rueda)
+    now = 0.0
+
+    def schedule(key, when):
+        # Lo ya vencido al programar vence en el tick siguiente
+        due = max(math.ceil(when / resolution), math.floor(now / resolution) + 1) * resolution
+        deadlines[key] = (when, due)
+        wheel.schedule(key, when)
+
+    for key in range(300):
+        schedule(key, rng.uniform(-5, 1500 * resolution))
+    # Algunos se cancelan y otros se reprograman
+    for key in rng.sample(range(300), 40):
+        wheel.cancel(key)
+        del deadlines[key]
+    for key in rng.sample(sorted(deadlines), 40):
+        schedule(key, rng.uniform(0, 1500 * resolution))
+
+    next_key = 300
+    while deadlines:
+        previous, now = now, now + rng.uniform(0, 40 * resolution)
+        for key in wheel.advance(now):
+            when, due = deadlines.pop(key)
+            assert when <= now
+            # Ya debía haber vencido en el avance anterior si este pasó su tick
+            assert previous < due
+        for when, due in deadlines.values():
+            assert now < due
+        # También se programan timers con la rueda ya girada
+        if next_key < 600:
+            schedule(next_key, now + rng.uniform(-1, 1500 * resolution))
+            next_key += 1
+    assert len(wheel) == 0
+
+
+def test_cascade_from_upper_level_keeps_exact_tick():
+    wheel = TimerWheel(0.0, resolution=1.0, slots=8, levels=2)
+    wheel.schedule("a", 19)  # nivel 1: baja a nivel 0 al completar la vuelta del tick 16
+    assert wheel.advance(18) == []
+    assert wheel.advance(19) == ["a"]
+
+
+def test_cancelled_timer_never_expires():
+    wheel = TimerWheel(0.0, resolution=1.0, slots=8, levels=2)
+    wheel.schedule("a", 5)
+    assert wheel.cancel("a")
+    assert not wheel.cancel("a")
+    assert wheel.advance(100) == []
+
+
+def test_recovery_code_expires_after_ttl():
+    clock = FakeClock()
+    store = RecoveryCodeStore(ttl_seconds=300, clock=clock)
+    code = store.issue("Ana@example.com")
+    clock.now += 299
+    assert store.verify("ana@example.com", code, consume=False)
+    clock.now += 1
+    assert not store.verify("ana@example.com", code)
+    assert len(store) == 0
+
+
+def test_recovery_code_is_discarded_after_max_attempts():
+    clock = FakeClock()
+    store = RecoveryCodeStore(max_attempts=3, clock=clock)
+    code = store.issue("ana@example.com")
+    wrong = "000000" if code != "000000" else "111111"
+    for _ in range(3):
+        assert not store.verify("ana@example.com", wrong)
+    assert not store.verify("ana@example.com", code)
+
+
+def test_recovery_code_is_consumed_once():
+    store = RecoveryCodeStore(clock=FakeClock())
+    code = store.issue("ana@example.com")
+    assert store.verify("ana@example.com", code)
+    assert not store.verify("ana@example.com", code)
+
+
+def test_recovery_requests_are_rate_limited_per_window():
+    clock = FakeClock()
+    store = RecoveryCodeStore(max_requests=2, rate_window=900, clock=clock)
+    store.issue("ana@example.com")
+    store.issue("ANA@example.com")
+    with pytest.raises(ValueError):
+        store.issue("ana@example.com")
+    # Otro email no comparte el límite
+    store.issue("bo@example.com")
+
+    clock.now += 900
+    store.issue("ana@example.com")
+
+
+def test_rate_limit_does_not_reveal_accounts(tmp_path):
+    repo = PlayerRepository(tmp_path / "players.json", pending_file_path=tmp_path / "pending_players.json")
+    repo.recovery_codes = RecoveryCodeStore(max_requests=2, clock=FakeClock())
+    repo.add_player(Player.from_dict({"id": "p1", "alias": "Ana", "full_name": "Ana",
+                                      "email": "ana@example.com", "password_hash": ""}))
+    for email in ("ana@example.com", "nadie@example.com"):
+        results = [repo.request_password_reset(email) for _ in range(2)]
+        assert all(results) if email.startswith("ana") else results == [None, None]
+        # La solicitud de más falla igual con y sin cuenta
+        with pytest.raises(ValueError):
+            repo.request_password_reset(email.upper())
+    repo.close()